@@ -1,8 +1,147 @@
 from django.contrib import admin
-from .models import Customer, Barber, Service, Appointment, Queue
+from django.db import transaction
+from . import catalog_cache, slot_cache, working_calendar
+from .models import Customer, Barber, BarberWorkingHours, CalendarException, Service, Appointment, Queue
+from .positions import pending_days, rebuild_positions, release_positions, take_position
+from .timetable import drop_service_timetables, refresh_timetables
+from .views_appointment import lock_booking_date
+from .views_calendar import calendar_changed, sync_legacy_fields
+
+
+class WorkingCalendarAdmin(admin.ModelAdmin):
+    """
+    Recompiles the working calendars after changes made in the admin.
+    """
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        working_calendar.invalidate()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        working_calendar.invalidate()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        working_calendar.invalidate()
+
+
+class BarberWorkingHoursInline(admin.TabularInline):
+    model = BarberWorkingHours
+    extra = 0
+
+
+class BarberAdmin(WorkingCalendarAdmin):
+    """
+    Barbers with their weekly hours. Once a barber has weekly hours, the
+    fields they replaced only summarize them and can't be edited. Every
+    change refreshes the barber catalog.
+    """
+    inlines = [BarberWorkingHoursInline]
+    legacy_fields = ('available_days', 'working_hours_start', 'working_hours_end')
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None and obj.working_hours.exists():
+            return self.legacy_fields
+        return ()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        catalog_cache.invalidate('barbers')
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        sync_legacy_fields(form.instance.id)
+        calendar_changed(barber_id=form.instance.id)
+
+    # Their appointments are deleted with them: renumber the dates where they
+    # had pending ones, as delete_barber does
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Barber.objects.filter(id=obj.id))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            days = sorted({day for barber_id in queryset.values_list('id', flat=True) for day in pending_days(barber_id)})
+            for day in days:
+                lock_booking_date(day)
+            super().delete_queryset(request, queryset)
+            rebuild_positions(days)
+            catalog_cache.invalidate('barbers')
+
+
+class ServiceAdmin(admin.ModelAdmin):
+    """
+    Refreshes the service catalog and the timetables listing a service
+    after it is changed in the admin.
+    """
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        drop_service_timetables(obj.id)
+        catalog_cache.invalidate('services')
+
+    def delete_model(self, request, obj):
+        drop_service_timetables(obj.id)
+        super().delete_model(request, obj)
+        catalog_cache.invalidate('services')
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for service_id in queryset.values_list('id', flat=True):
+                drop_service_timetables(service_id)
+            super().delete_queryset(request, queryset)
+            catalog_cache.invalidate('services')
+
+
+class AppointmentAdmin(admin.ModelAdmin):
+    """
+    Appointments changed in the admin keep the positions and counters of
+    their dates, and the timetables and cached slots of their barber-days,
+    up to date, as they do through the API.
+    """
+    readonly_fields = ('position',)
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            before = None
+            if change:
+                before = Appointment.objects.select_for_update().values_list(
+                    'appointment_date', 'barber_id', 'position', 'status'
+                ).get(id=obj.id)
+            for day in sorted({obj.appointment_date} | ({before[0]} if before else set())):
+                lock_booking_date(day)
+
+            was_pending = before is not None and before[3] == 'pending'
+            moved = was_pending and before[:2] != (obj.appointment_date, obj.barber_id)
+            # Like a booking or a reschedule, it goes to the back of its date
+            if obj.status == 'pending' and (not was_pending or moved):
+                obj.position = take_position(obj.appointment_date, obj.barber_id)
+            super().save_model(request, obj, form, change)
+            if was_pending and (obj.status != 'pending' or moved):
+                release_positions([before[:3]])
+            touched = {(obj.barber_id, obj.appointment_date)} | ({(before[1], before[0])} if before else set())
+            refresh_timetables(touched)
+            slot_cache.invalidate(touched)
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Appointment.objects.filter(id=obj.id))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            locked = list(
+                queryset.select_for_update().order_by('id')
+                .values_list('appointment_date', 'barber_id', 'position', 'status')
+            )
+            for day in sorted({row[0] for row in locked}):
+                lock_booking_date(day)
+            super().delete_queryset(request, queryset)
+            release_positions(row[:3] for row in locked if row[3] == 'pending')
+            touched = [(barber_id, day) for day, barber_id, _, _ in locked]
+            refresh_timetables(touched)
+            slot_cache.invalidate(touched)
+
 
 admin.site.register(Customer)
-admin.site.register(Barber)
-admin.site.register(Service)
-admin.site.register(Appointment)
-admin.site.register(Queue)
\ No newline at end of file
+admin.site.register(Barber, BarberAdmin)
+admin.site.register(Service, ServiceAdmin)
+admin.site.register(Appointment, AppointmentAdmin)
+admin.site.register(Queue)
+admin.site.register(CalendarException, WorkingCalendarAdmin)
@@ -0,0 +1,130 @@
+"""
+Retention of finished appointments and queue entries.
+
+Completed and canceled rows whose day is older than settings.ARCHIVE_AFTER_DAYS
+are moved out of the live Appointment and Queue tables, either into the
+ArchivedAppointment / ArchivedQueue tables or into gzip-compressed NDJSON
+files, by the archive_records command. Each batch is its own short
+transaction, so the live tables are never locked for long; a batch going to
+a file is written to disk before its rows are deleted. Read endpoints
+look at the live tables only, unless called with ?include_archived=1.
+"""
+import gzip
+import os
+import tempfile
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .exports import DATASETS, ndjson_bytes
+from .models import Appointment, ArchivedAppointment, ArchivedQueue, BarberDayTimetable, Queue
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 180
+DEFAULT_BATCH_SIZE = 1000
+
+ARCHIVED_STATUSES = ('completed', 'canceled')
+
+# Per dataset: live model, archive model and the day retention is measured by
+ARCHIVES = {
+    'appointments': {'model': Appointment, 'archive': ArchivedAppointment, 'date_field': 'appointment_date'},
+    'queue': {'model': Queue, 'archive': ArchivedQueue, 'date_field': 'ticket_day'},
+}
+
+
+def include_archived(params):
+    """
+    Whether a request opted in to archived rows with ?include_archived=1.
+    """
+    return params.get('include_archived') in ('1', 'true')
+
+
+def archive_cutoff(days=None):
+    """
+    Rows of days before the returned date are due for archiving.
+    """
+    if days is None:
+        days = getattr(settings, 'ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    return timezone.localdate() - timedelta(days=days)
+
+
+def expired_rows(dataset, cutoff):
+    config = ARCHIVES[dataset]
+    return config['model'].objects.filter(
+        status__in=ARCHIVED_STATUSES, **{f"{config['date_field']}__lt": cutoff}
+    )
+
+
+def archive_batch(dataset, cutoff, batch_size=DEFAULT_BATCH_SIZE, directory=None):
+    """
+    Moves up to batch_size expired rows into the archive table, or into a
+    file of their own in 'directory' when given (see write_archive_file), and
+    deletes them from the live table, in one transaction. Returns the number
+    of rows moved.
+    """
+    config = ARCHIVES[dataset]
+    model, archive = config['model'], config['archive']
+    with transaction.atomic():
+        # Rows someone is editing right now are left for the next run
+        ids = list(
+            expired_rows(dataset, cutoff).select_for_update(skip_locked=True)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        rows = model.objects.filter(id__in=ids).order_by('id')
+        if directory is not None:
+            write_archive_file(directory, dataset, ids, ndjson_bytes(DATASETS[dataset]['rows'].data(rows)))
+        else:
+            columns = [field.attname for field in archive._meta.concrete_fields]
+            # ignore_conflicts makes a batch safe to repeat after a failed run
+            archive.objects.bulk_create(
+                [archive(**values) for values in rows.values(*columns)], ignore_conflicts=True
+            )
+        model.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def archive_file_name(dataset, ids):
+    """
+    <dataset>-<first id>-<last id>.ndjson.gz, zero-padded so the files of a
+    dataset sort in id order.
+    """
+    return f"{dataset}-{ids[0]:012d}-{ids[-1]:012d}.ndjson.gz"
+
+
+def write_archive_file(directory, dataset, ids, data):
+    """
+    Stores a batch's NDJSON rows gzip-compressed in 'directory', durably:
+    they are written to a temporary file, fsynced and renamed into place
+    before the caller deletes them. A batch repeated after a failed delete
+    has the same ids, so it replaces its own file. Returns the file's path.
+    """
+    path = os.path.join(directory, archive_file_name(dataset, ids))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=f".{dataset}-", suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as raw:
+            with gzip.GzipFile(os.path.basename(path), 'wb', fileobj=raw) as compressed:
+                compressed.write(data)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+    if os.name == 'posix':
+        # Make the rename itself survive a crash
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
+    return path
+
+
+def prune_timetables(cutoff):
+    """
+    Drops the stored timetables of days before cutoff, which still list the
+    archived appointments. Returns the number removed.
+    """
+    return BarberDayTimetable.objects.filter(day__lt=cutoff).delete()[0]
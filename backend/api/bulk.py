@@ -0,0 +1,35 @@
+"""
+Helpers for the bulk status transition endpoints.
+"""
+from django.db import transaction
+
+MAX_BULK_IDS = 500
+
+
+def parse_ids(data):
+    """
+    Returns the de-duplicated list of ids in data['ids'], or raises ValueError.
+    """
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("'ids' must be a non-empty list")
+    if len(ids) > MAX_BULK_IDS:
+        raise ValueError(f"At most {MAX_BULK_IDS} ids per request")
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise ValueError("'ids' must contain integers")
+    return list(dict.fromkeys(ids))
+
+
+def bulk_set_status(model, ids, new_status):
+    """
+    Sets 'status' on the given rows with a single UPDATE (no per-row save).
+    Returns one {"id": ..., "status": ...} result per id, with status
+    "not_found" for ids that don't exist.
+    """
+    with transaction.atomic():
+        found = set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+        model.objects.filter(id__in=found).update(status=new_status)
+    return [
+        {"id": i, "status": new_status if i in found else "not_found"}
+        for i in ids
+    ]
@@ -0,0 +1,104 @@
+"""
+Versioned cache of the serialized barber and service catalogs.
+
+Each catalog is cached under a key that includes its current version; writes
+bump the version instead of deleting keys, so a stale payload can never be
+read back. Every payload carries an ETag for conditional GETs.
+"""
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+CATALOG_TIMEOUT = 60 * 60
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def version_key(name):
+    return f"catalog:{name}:version"
+
+
+def get_version(name):
+    return get_cache().get_or_set(version_key(name), time.time_ns(), timeout=None)
+
+
+def invalidate(name):
+    """
+    Moves the catalog to a new version once the current transaction commits.
+    """
+    transaction.on_commit(
+        lambda: get_cache().set(version_key(name), time.time_ns(), timeout=None)
+    )
+
+
+def make_payload(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return data, hashlib.sha1(body.encode()).hexdigest()
+
+
+def get_timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', CATALOG_TIMEOUT)
+
+
+def get_payload(name, build):
+    """
+    Returns (data, etag) for the catalog, calling build() to serialize it
+    only when the current version is not cached yet.
+    """
+    cache = get_cache()
+    key = f"catalog:{name}:{get_version(name)}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = make_payload(build())
+        cache.set(key, payload, timeout=get_timeout())
+    return payload
+
+
+async def aget_payload(name, abuild):
+    """
+    Async get_payload, for async views; abuild is a coroutine function.
+    """
+    cache = get_cache()
+    version = await cache.aget_or_set(version_key(name), time.time_ns(), timeout=None)
+    key = f"catalog:{name}:{version}"
+    payload = await cache.aget(key)
+    if payload is None:
+        payload = make_payload(await abuild())
+        await cache.aset(key, payload, timeout=get_timeout())
+    return payload
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match', '')
+    candidates = {value.strip().removeprefix('W/') for value in if_none_match.split(',')}
+    return f'"{etag}"' in candidates or '*' in candidates
+
+
+def conditional_response(request, data, etag):
+    """
+    200 with a cached payload, or 304 when the client already has it.
+    """
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, status=status.HTTP_200_OK)
+    response['ETag'] = f'"{etag}"'
+    # Clients may keep the catalog but must revalidate it on each use
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def catalog_response(request, name, build):
+    """
+    200 with the cached catalog, or 304 when the client already has it.
+    """
+    data, etag = get_payload(name, build)
+    return conditional_response(request, data, etag)
@@ -0,0 +1,46 @@
+"""
+System checks for settings the api relies on.
+"""
+from django.conf import settings
+from django.core import checks
+
+# Backends whose entries only the writing process sees
+PROCESS_LOCAL_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+# Backends that store nothing, so every read misses
+NON_STORING_BACKENDS = ('django.core.cache.backends.dummy.DummyCache',)
+
+
+def cache_backend(alias):
+    return settings.CACHES.get(alias, {}).get('BACKEND')
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    The catalogs, the available slots and the working calendar versions
+    (CATALOG_CACHE_ALIAS) and the replica pins (REPLICA_PIN_CACHE_ALIAS)
+    must be seen by every worker: a write invalidates them in the cache of
+    its own process only otherwise, and the others keep serving stale data.
+    A single-process setup can silence api.E001 and api.E002.
+    """
+    hint = "Set CACHE_URL to a Redis or Memcached server shared by all workers."
+    problems = []
+
+    alias = getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')
+    if cache_backend(alias) in PROCESS_LOCAL_BACKENDS:
+        problems.append(checks.Error(
+            f"CATALOG_CACHE_ALIAS uses the '{alias}' cache, which is local to each process, so "
+            "workers serve catalogs, slots and calendars other workers have changed.",
+            hint=hint, id='api.E001',
+        ))
+
+    # Pins only matter when there is a replica to read from
+    if getattr(settings, 'READ_REPLICA_ALIAS', 'replica') in settings.DATABASES:
+        alias = getattr(settings, 'REPLICA_PIN_CACHE_ALIAS', 'default')
+        if cache_backend(alias) in PROCESS_LOCAL_BACKENDS + NON_STORING_BACKENDS:
+            problems.append(checks.Error(
+                f"REPLICA_PIN_CACHE_ALIAS uses the '{alias}' cache, which doesn't share pins between "
+                "processes, so clients can read from the replica right after their own writes.",
+                hint=hint, id='api.E002',
+            ))
+    return problems
@@ -0,0 +1,115 @@
+"""
+Read-replica routing for the read-only polling endpoints.
+
+Views marked with @reads_from_replica run their queries against the
+READ_REPLICA_ALIAS database; everything else, and every write, uses
+'default'. A client that has just written (any non-GET request) keeps
+reading from 'default' for REPLICA_PIN_SECONDS, so it sees its own booking
+or check-in even while the replica lags behind. Without a replica entry in
+DATABASES, all reads go to 'default'.
+"""
+import hashlib
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_PIN_SECONDS = 5
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Database the current request's reads go to; None means 'default'
+read_alias = ContextVar('read_alias', default=None)
+
+
+def reads_from_replica(view):
+    """
+    Marks a read-only view as safe to serve from the replica.
+    """
+    view.reads_from_replica = True
+    return view
+
+
+def replica_alias():
+    """
+    The configured replica alias, or None when there is no replica.
+    """
+    alias = getattr(settings, 'READ_REPLICA_ALIAS', None)
+    return alias if alias in settings.DATABASES else None
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the alias chosen for the current request, and all writes
+    and migrations to 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = read_alias.get()
+        # Inside a transaction, read what the transaction has written
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as 'default'
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Chooses the read database for each request: the replica for views marked
+    with @reads_from_replica, unless the client wrote within the last
+    REPLICA_PIN_SECONDS. Clients are told apart by their Authorization header,
+    or by address for anonymous ones; pins are kept in the
+    REPLICA_PIN_CACHE_ALIAS cache, which must be shared between workers.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.alias = replica_alias()
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+        self.cache = caches[getattr(settings, 'REPLICA_PIN_CACHE_ALIAS', 'default')]
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_alias.set(None)
+        if self.alias and request.method not in SAFE_METHODS:
+            self.cache.set(self.pin_key(request), True, timeout=self.pin_seconds)
+        return response
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_alias.set(None)
+        if self.alias and request.method not in SAFE_METHODS:
+            await self.cache.aset(self.pin_key(request), True, timeout=self.pin_seconds)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            self.alias
+            and request.method in SAFE_METHODS
+            and getattr(view_func, 'reads_from_replica', False)
+            and not self.cache.get(self.pin_key(request))
+        ):
+            read_alias.set(self.alias)
+        return None
+
+    def pin_key(self, request):
+        client = request.headers.get('Authorization') or request.META.get('REMOTE_ADDR', '')
+        return f"replica-pin:{hashlib.sha1(client.encode()).hexdigest()}"
@@ -0,0 +1,122 @@
+"""
+Queue change events, pushed to clients over Server-Sent Events.
+
+Each change publishes one event saying where an entry joined or left the
+pending queue; clients shift their own position from it instead of polling.
+The broker is chosen with settings.QUEUE_EVENTS_BACKEND.
+"""
+import asyncio
+import json
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'api.events.InMemoryBroker'
+
+
+class InMemoryBroker:
+    """
+    Fans events out to subscribers living in this process.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+
+    def publish(self, event):
+        # Called from sync views running in worker threads, so hand the event
+        # over to each subscriber's own event loop
+        for loop, queue in list(self._subscribers):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def subscribe(self):
+        queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        self._subscribers.add(subscriber)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(subscriber)
+
+
+class RedisBroker:
+    """
+    Fans events out through a Redis pub/sub channel shared by all workers.
+    """
+    channel = 'barberqueue:queue-events'
+
+    def __init__(self):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise ImproperlyConfigured("RedisBroker requires the 'redis' package") from exc
+        url = getattr(settings, 'QUEUE_EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+        self._client = redis.Redis.from_url(url)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+
+    def publish(self, event):
+        self._client.publish(self.channel, json.dumps(event))
+
+    async def subscribe(self):
+        pubsub = self._async_client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    yield json.loads(message['data'])
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await pubsub.close()
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        backend = getattr(settings, 'QUEUE_EVENTS_BACKEND', DEFAULT_BACKEND)
+        _broker = import_string(backend)()
+    return _broker
+
+
+def publish_queue_event(event_type, entry_id, position):
+    """
+    Publishes a queue change once the surrounding transaction commits.
+    'position' is where the entry joined or left the pending queue (0 when
+    the change did not touch the pending queue, which is not broadcast).
+    """
+    if not position:
+        return
+    event = {"type": event_type, "id": entry_id, "position": position}
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_queue_events(heartbeat=15):
+    """
+    Yields queue events as SSE messages, with a keep-alive comment whenever
+    nothing happened for 'heartbeat' seconds.
+    """
+    events = get_broker().subscribe()
+    next_event = asyncio.ensure_future(anext(events))
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_event}, timeout=heartbeat)
+            if not done:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(next_event.result())
+            next_event = asyncio.ensure_future(anext(events))
+    finally:
+        next_event.cancel()
+        try:
+            await next_event
+        except (asyncio.CancelledError, StopAsyncIteration):
+            pass
+        await events.aclose()
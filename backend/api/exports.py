@@ -0,0 +1,115 @@
+"""
+Streaming CSV / NDJSON export of appointment and queue history.
+
+Rows are read through a server-side cursor (.iterator(chunk_size)) and
+encoded one chunk at a time, so memory use stays flat however many rows an
+export covers. Used by the export endpoints and the export_history command.
+"""
+import csv
+import heapq
+import io
+from datetime import date
+from itertools import islice
+from .models import ArchivedQueue, Queue
+from .renderers import FastJSONRenderer
+from .row_serializers import RowSerializer, appointment_rows, archived_appointment_rows
+
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Per dataset: row serializers of the live and archive tables, the date its
+# range filter applies to, the barber column (None if it has none) and an
+# indexed export order
+DATASETS = {
+    'appointments': {
+        'rows': appointment_rows,
+        'archive_rows': archived_appointment_rows,
+        'date_field': 'appointment_date',
+        'barber_field': 'barber_id',
+        'order_by': ('appointment_date', 'appointment_time', 'id'),
+    },
+    'queue': {
+        'rows': RowSerializer(Queue),
+        'archive_rows': RowSerializer(ArchivedQueue),
+        'date_field': 'ticket_day',
+        'barber_field': None,
+        'order_by': ('ticket_day', 'ticket_number'),
+    },
+}
+
+
+def export_queryset(dataset, params, archived=False):
+    """
+    Rows of 'dataset' matching the start / end (YYYY-MM-DD, inclusive),
+    barber and status (comma-separated) filters in params, from the archive
+    table when 'archived'. Raises ValueError with a client-facing message.
+    """
+    config = DATASETS[dataset]
+    model = config['archive_rows' if archived else 'rows'].model
+    queryset = model.objects.order_by(*config['order_by'])
+
+    for param, lookup in (('start', 'gte'), ('end', 'lte')):
+        value = params.get(param)
+        if value:
+            try:
+                day = date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"Invalid {param} date")
+            queryset = queryset.filter(**{f"{config['date_field']}__{lookup}": day})
+
+    barber = params.get('barber')
+    if barber:
+        if config['barber_field'] is None:
+            raise ValueError(f"{dataset} can't be filtered by barber")
+        try:
+            queryset = queryset.filter(**{config['barber_field']: int(barber)})
+        except ValueError:
+            raise ValueError("Invalid barber")
+
+    statuses = [value for value in params.get('status', '').split(',') if value]
+    if statuses:
+        valid_statuses = {choice for choice, _ in model.STATUS_CHOICES}
+        if any(value not in valid_statuses for value in statuses):
+            raise ValueError("Invalid status")
+        queryset = queryset.filter(status__in=statuses)
+    return queryset
+
+
+def stream_export(dataset, queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE, archived_queryset=None):
+    """
+    Yields the export as encoded byte chunks, one per 'chunk_size' rows,
+    with fields formatted as in the JSON API. Rows of archived_queryset, if
+    given, are merged in export order.
+    """
+    config = DATASETS[dataset]
+    rows = config['rows']
+    if export_format == 'csv':
+        yield csv_bytes([rows.names])
+
+    cursor = rows.values(queryset).iterator(chunk_size=chunk_size)
+    if archived_queryset is not None:
+        # Both tables have the same columns, so the row layouts match
+        order = [rows.index[name] for name in config['order_by']]
+        archived = config['archive_rows'].values(archived_queryset).iterator(chunk_size=chunk_size)
+        cursor = heapq.merge(cursor, archived, key=lambda row: [row[i] for i in order])
+    while batch := list(islice(cursor, chunk_size)):
+        items = rows.serialize(batch)
+        if export_format == 'csv':
+            yield csv_bytes(item.values() for item in items)
+        else:
+            yield ndjson_bytes(items)
+
+
+def csv_bytes(records):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(records)
+    return buffer.getvalue().encode()
+
+
+def ndjson_bytes(items):
+    render = FastJSONRenderer().render
+    return b''.join(render(item) + b'\n' for item in items)
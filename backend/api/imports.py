@@ -0,0 +1,311 @@
+"""
+Bulk import of barbers, services and appointments from CSV, JSON or NDJSON.
+
+Records are read and validated as a stream, in chunks: each record goes
+through the matching ModelSerializer's validation (one serializer instance
+per import, not per row), valid rows of a chunk are inserted with a single
+bulk_create, and invalid ones (including NDJSON lines that aren't valid
+JSON) are reported with their row number. Barber and
+service references are resolved from lookup maps loaded once per import, by
+id or by name, so a shop's barbers and services can be imported first and
+its bookings referenced by name afterwards.
+"""
+import codecs
+import csv
+import json
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+from itertools import islice
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from . import catalog_cache, slot_cache, working_calendar
+from .models import Appointment, AppointmentBarberDayCounter, AppointmentDayCounter, Barber, Service
+from .serializers import AppointmentSerializer, BarberSerializer, ServiceSerializer
+from .slots import BookedIntervals, booking_interval
+from .timetable import refresh_timetables
+from .views_appointment import lock_booking_date
+
+IMPORT_FORMATS = ('csv', 'json', 'ndjson')
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+ACTIVE_STATUSES = ('pending', 'scheduled')
+
+
+class MalformedRecord:
+    """
+    Stands in for an NDJSON line that isn't valid JSON, so it is reported as
+    a failed row and the lines after it are still imported.
+    """
+    def __init__(self, error):
+        self.error = error
+
+
+def read_records(stream, import_format):
+    """
+    Yields the records of a binary stream as dicts. CSV and NDJSON are read
+    line by line; a JSON document must be an array of objects and is loaded
+    into memory whole, so large imports should use CSV or NDJSON.
+    """
+    text = codecs.getreader('utf-8-sig')(stream)
+    if import_format == 'csv':
+        for record in csv.DictReader(text):
+            # Empty cells mean "not given", so model defaults apply
+            yield {key: value for key, value in record.items() if key and value != ''}
+    elif import_format == 'ndjson':
+        for line in text:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield MalformedRecord(exc)
+    else:
+        records = json.load(text)
+        if not isinstance(records, list):
+            raise ValueError("A JSON import must be an array of objects")
+        yield from records
+
+
+class LookupField(serializers.Field):
+    """
+    Resolves a reference given as an id or a name through one of the lookup
+    maps in the serializer context, without a query per row.
+    """
+    default_error_messages = {'does_not_exist': 'No {name} matches "{value}".'}
+
+    def __init__(self, lookup, **kwargs):
+        self.lookup = lookup
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return self.context['lookups'][self.lookup][str(data).strip()]
+        except KeyError:
+            self.fail('does_not_exist', name=self.lookup.rstrip('s'), value=data)
+
+    def to_representation(self, value):
+        return value
+
+
+class AppointmentImportSerializer(AppointmentSerializer):
+    barber = LookupField('barbers', source='barber_id')
+    service = LookupField('services', source='service_id', required=False, allow_null=True)
+    # Defaults to the date of appointment_time
+    appointment_date = serializers.DateField(required=False)
+
+    class Meta(AppointmentSerializer.Meta):
+        # Double bookings are checked per chunk against preloaded bookings
+        validators = []
+
+    def validate(self, attrs):
+        if 'appointment_date' not in attrs:
+            attrs['appointment_date'] = timezone.localtime(attrs['appointment_time']).date()
+        return attrs
+
+
+class RowImporter:
+    """
+    Imports one dataset; subclasses set the model and serializer and may
+    check or prepare each chunk before it is inserted.
+    """
+    model = None
+    serializer_class = None
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.serializer = self.serializer_class(context={'lookups': self.load_lookups()})
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def load_lookups(self):
+        return {}
+
+    def run(self, records, chunk_size=DEFAULT_CHUNK_SIZE):
+        numbered = enumerate(records, start=1)
+        while chunk := list(islice(numbered, chunk_size)):
+            self.import_chunk(chunk)
+        return self.report()
+
+    def import_chunk(self, chunk):
+        valid = []
+        for row, record in chunk:
+            if isinstance(record, MalformedRecord):
+                self.add_error(row, {"non_field_errors": [f"Invalid JSON: {record.error}"]})
+                continue
+            if not isinstance(record, dict):
+                self.add_error(row, {"non_field_errors": ["Expected an object"]})
+                continue
+            try:
+                valid.append((row, self.serializer.run_validation(record)))
+            except serializers.ValidationError as exc:
+                self.add_error(row, exc.detail)
+
+        with transaction.atomic():
+            instances = self.prepare(valid)
+            if not self.dry_run:
+                self.model.objects.bulk_create(instances)
+                self.inserted(instances)
+        self.imported += len(instances)
+
+    def prepare(self, valid):
+        """
+        Model instances to insert for the validated (row, data) pairs.
+        Runs in the chunk's transaction.
+        """
+        return [self.model(**data) for _, data in valid]
+
+    def inserted(self, instances):
+        """
+        Called in the chunk's transaction once the instances are stored.
+        """
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def report(self):
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+
+class BarberImporter(RowImporter):
+    model = Barber
+    serializer_class = BarberSerializer
+
+    def prepare(self, valid):
+        catalog_cache.invalidate('barbers')
+        working_calendar.invalidate()
+        return super().prepare(valid)
+
+
+class ServiceImporter(RowImporter):
+    model = Service
+    serializer_class = ServiceSerializer
+
+    def prepare(self, valid):
+        catalog_cache.invalidate('services')
+        return super().prepare(valid)
+
+
+class AppointmentImporter(RowImporter):
+    """
+    Also rejects rows overlapping an active booking of the same barber
+    (stored or earlier in the import) and numbers imported pending
+    appointments after the ones already booked on their date.
+    """
+    model = Appointment
+    serializer_class = AppointmentImportSerializer
+
+    def load_lookups(self):
+        barbers = {}
+        self.slot_durations = {}
+        for barber_id, name, slot_duration in Barber.objects.values_list('id', 'name', 'slot_duration'):
+            barbers[name] = barbers[str(barber_id)] = barber_id
+            self.slot_durations[barber_id] = slot_duration
+        services = {}
+        self.service_durations = {}
+        for service_id, name, duration in Service.objects.values_list('id', 'service_name', 'service_duration'):
+            services[name] = services[str(service_id)] = service_id
+            self.service_durations[service_id] = duration
+        return {'barbers': barbers, 'services': services}
+
+    def prepare(self, valid):
+        days = sorted({data['appointment_date'] for _, data in valid})
+        for day in days:
+            lock_booking_date(day)
+
+        booked = self.load_booked(valid)
+        instances = []
+        for row, data in valid:
+            if data.get('status', 'pending') in ACTIVE_STATUSES:
+                key, interval = self.interval(data)
+                if BookedIntervals(booked[key]).overlaps(*interval):
+                    self.add_error(row, {"appointment_time": ["Barber is already booked at this time"]})
+                    continue
+                booked[key].append(interval)
+            instances.append(Appointment(**data))
+
+        self.take_positions([a for a in instances if a.status == 'pending'])
+        return instances
+
+    def inserted(self, instances):
+        touched = [(a.barber_id, a.appointment_date) for a in instances]
+        refresh_timetables(touched)
+        slot_cache.invalidate(touched)
+
+    def interval(self, data):
+        appointment_time = data['appointment_time']
+        if timezone.is_aware(appointment_time):
+            # Stored appointment times are read back in UTC
+            appointment_time = appointment_time.astimezone(dt_timezone.utc)
+        barber_id = data['barber_id']
+        interval = booking_interval(
+            appointment_time,
+            self.service_durations.get(data.get('service_id')),
+            self.slot_durations[barber_id]
+        )
+        return (barber_id, appointment_time.date()), interval
+
+    def load_booked(self, valid):
+        """
+        Active booking intervals of the chunk's barbers and dates, keyed by
+        (barber_id, date), from one query.
+        """
+        booked = defaultdict(list)
+        barber_ids = {data['barber_id'] for _, data in valid}
+        days = {data['appointment_date'] for _, data in valid}
+        if not barber_ids:
+            return booked
+        rows = Appointment.objects.filter(
+            barber_id__in=barber_ids, appointment_date__in=days, status__in=ACTIVE_STATUSES
+        ).values_list('barber_id', 'appointment_time', 'service__service_duration')
+        for barber_id, appointment_time, duration in rows:
+            booked[barber_id, appointment_time.date()].append(
+                booking_interval(appointment_time, duration, self.slot_durations[barber_id])
+            )
+        return booked
+
+    def take_positions(self, pending):
+        """
+        Numbers pending appointments after those already on their date, with
+        one counter update per date and per barber-date.
+        """
+        if self.dry_run:
+            return
+        by_day = defaultdict(list)
+        by_barber_day = defaultdict(int)
+        for appointment in pending:
+            by_day[appointment.appointment_date].append(appointment)
+            by_barber_day[appointment.barber_id, appointment.appointment_date] += 1
+        for (barber_id, day), count in by_barber_day.items():
+            AppointmentBarberDayCounter.add(barber_id, day, count)
+        for day, appointments in by_day.items():
+            last = AppointmentDayCounter.add(day, len(appointments))
+            for position, appointment in enumerate(appointments, start=last - len(appointments) + 1):
+                appointment.position = position
+
+
+IMPORTERS = {
+    'barbers': BarberImporter,
+    'services': ServiceImporter,
+    'appointments': AppointmentImporter,
+}
+
+
+def run_import(dataset, stream, import_format, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Imports the records in a binary stream; returns the report
+    {"imported": n, "failed": n, "errors": [{"row": n, "errors": {...}}]}.
+    When the input can't be read from some point on, the chunks imported
+    before it are kept and the report also has an "error".
+    """
+    importer = IMPORTERS[dataset](dry_run=dry_run)
+    try:
+        return importer.run(read_records(stream, import_format), chunk_size)
+    except (UnicodeDecodeError, csv.Error, json.JSONDecodeError, ValueError) as exc:
+        report = importer.report()
+        report['error'] = f"Could not read the {import_format} input: {exc}"
+        return report
@@ -0,0 +1,52 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from api.archive import (
+    ARCHIVES, DEFAULT_BATCH_SIZE, archive_batch, archive_cutoff, expired_rows, prune_timetables
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed and canceled appointments and queue entries older than "
+        "ARCHIVE_AFTER_DAYS out of the live tables, into the archive tables or into "
+        "gzip-compressed NDJSON files, in short batched transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Archive rows older than this many days (default: ARCHIVE_AFTER_DAYS)")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows moved per transaction")
+        parser.add_argument('--pause', type=float, default=0, help="Seconds to sleep between batches")
+        parser.add_argument('--only', nargs='+', choices=sorted(ARCHIVES), default=sorted(ARCHIVES))
+        parser.add_argument(
+            '--to-dir', metavar='DIR',
+            help="Write each batch to DIR/<dataset>-<first id>-<last id>.ndjson.gz instead of the archive tables"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would be moved")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive")
+        cutoff = archive_cutoff(options['days'])
+        destination = f"files in {options['to_dir']}" if options['to_dir'] else "archive tables"
+        self.stdout.write(f"Archiving completed and canceled rows before {cutoff} to {destination}")
+
+        for dataset in options['only']:
+            if options['dry_run']:
+                count = expired_rows(dataset, cutoff).count()
+                self.stdout.write(f"{dataset}: {count} rows would be archived")
+                continue
+
+            if options['to_dir']:
+                os.makedirs(options['to_dir'], exist_ok=True)
+            start = time.perf_counter()
+            moved = 0
+            while batch := archive_batch(dataset, cutoff, options['batch_size'], options['to_dir']):
+                moved += batch
+                if options['pause']:
+                    time.sleep(options['pause'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{dataset}: archived {moved} rows in {time.perf_counter() - start:.1f}s"
+            ))
+            if dataset == 'appointments':
+                self.stdout.write(f"Dropped {prune_timetables(cutoff)} stored timetables of archived days")
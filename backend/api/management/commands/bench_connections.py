@@ -0,0 +1,121 @@
+import io
+import json
+import random
+from wsgiref.util import setup_testing_defaults
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from .benchmark_api import Command as BenchmarkCommand
+
+# Connection handling modes: (name, CONN_MAX_AGE, use the psycopg pool)
+MODES = [
+    ('per-request', 0, False),
+    ('persistent', 600, False),
+    ('pool', 0, True),
+]
+
+
+def supports_pool():
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Compare requests per second of the hot endpoints with a new database "
+        "connection per request, with persistent connections (CONN_MAX_AGE), and "
+        "with psycopg 3's connection pool (PostgreSQL only), through Django's WSGI "
+        "handler. Seeds the same data as benchmark_api; the difference is largest "
+        "against a networked PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--modes', nargs='+', choices=[mode[0] for mode in MODES], default=[mode[0] for mode in MODES])
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        settings_dict = connection.settings_dict
+        original = (settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'], dict(settings_dict['OPTIONS']))
+        opened = []
+
+        def counter(**kwargs):
+            opened.append(1)
+
+        connection_created.connect(counter)
+
+        self.cleanup()
+        try:
+            seeded = self.seed(options)
+            results = {}
+            with override_settings(REQUEST_STATS_SAMPLE_RATE=0.0):
+                for mode, max_age, pool in MODES:
+                    if mode not in options['modes']:
+                        continue
+                    if pool and not supports_pool():
+                        self.stdout.write(f"Skipping '{mode}': needs PostgreSQL with psycopg 3")
+                        continue
+                    self.use_mode(max_age, pool)
+                    for name, method, make_request in self.scenarios(seeded):
+                        if options['only'] and name not in options['only']:
+                            continue
+                        opened.clear()
+                        result = self.run_scenario(method, make_request, options['requests'], options['concurrency'])
+                        results.setdefault(name, {})[mode] = (result['throughput_rps'], result['p95_ms'], len(opened))
+            self.report_modes(results)
+        finally:
+            connection_created.disconnect(counter)
+            max_age, health_checks, db_options = original
+            self.use_mode(max_age, 'pool' in db_options)
+            settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+            settings_dict['OPTIONS'] = db_options
+            if not options['keep']:
+                self.cleanup()
+
+    def make_client(self):
+        # Unlike the test client, the WSGI handler fires request_started and
+        # request_finished, which is where Django closes or keeps connections
+        return WSGIHandler()
+
+    def send(self, handler, method, path, data):
+        path, _, query = path.partition('?')
+        body = json.dumps(data).encode() if data is not None else b''
+        environ = {
+            'REQUEST_METHOD': method.upper(), 'PATH_INFO': path, 'QUERY_STRING': query,
+            'HTTP_HOST': 'localhost', 'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body),
+        }
+        setup_testing_defaults(environ)
+        statuses = []
+        response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        try:
+            b''.join(response)
+        finally:
+            response.close()
+        return int(statuses[0].split()[0])
+
+    def use_mode(self, max_age, pool):
+        """
+        Switches the default connection's handling; every thread's connection
+        shares this settings dict, so new connections pick it up.
+        """
+        connections.close_all()
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+        settings_dict = connection.settings_dict
+        settings_dict['CONN_MAX_AGE'] = max_age
+        settings_dict['CONN_HEALTH_CHECKS'] = max_age > 0
+        settings_dict['OPTIONS'] = {key: value for key, value in settings_dict['OPTIONS'].items() if key != 'pool'}
+        if pool:
+            settings_dict['OPTIONS']['pool'] = True
+
+    def report_modes(self, results):
+        modes = sorted({mode for by_mode in results.values() for mode in by_mode}, key=[m[0] for m in MODES].index)
+        self.stdout.write(f"{'endpoint':<22} " + " ".join(f"{mode + ' req/s':>19} {'p95':>7} {'conns':>5}" for mode in modes))
+        for name, by_mode in results.items():
+            self.stdout.write(f"{name:<22} " + " ".join(
+                f"{by_mode[mode][0]:>19.1f} {by_mode[mode][1]:>7.2f} {by_mode[mode][2]:>5}" for mode in modes
+            ))
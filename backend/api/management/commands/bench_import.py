@@ -0,0 +1,93 @@
+import csv
+import io
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api.imports import run_import
+from api.models import Barber, Service
+from api.serializers import AppointmentSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark appointment imports in rows per second: run_import at several chunk "
+        "sizes against saving through AppointmentSerializer one row at a time. "
+        "Everything runs in a rolled-back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help="Appointment rows to import")
+        parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[100, 500, 2000])
+        parser.add_argument('--baseline-rows', type=int, default=1000, help="Rows saved one at a time")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'method':<24} {'rows':>7} {'seconds':>8} {'rows/s':>8}")
+        with transaction.atomic():
+            barbers, service = self.seed()
+            records = self.records(barbers, service, options['rows'])
+
+            baseline = records[:options['baseline_rows']]
+            with transaction.atomic():
+                start = time.perf_counter()
+                for record in baseline:
+                    serializer = AppointmentSerializer(data={
+                        **record, 'barber': barbers[record['barber']], 'service': service.id,
+                        'appointment_date': record['appointment_time'][:10],
+                    })
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save()
+                self.show("row by row", len(baseline), time.perf_counter() - start)
+                transaction.set_rollback(True)
+
+            body = self.csv_body(records)
+            for chunk_size in options['chunk_sizes']:
+                with transaction.atomic():
+                    start = time.perf_counter()
+                    report = run_import('appointments', io.BytesIO(body), 'csv', chunk_size)
+                    elapsed = time.perf_counter() - start
+                    if report['failed']:
+                        raise CommandError(f"{report['failed']} rows failed: {report['errors'][:3]}")
+                    self.show(f"import, chunks of {chunk_size}", report['imported'], elapsed)
+                    transaction.set_rollback(True)
+            transaction.set_rollback(True)
+
+    def seed(self):
+        barbers = {
+            f"Import bench {i}": Barber.objects.create(
+                name=f"Import bench {i}", working_hours_start=dt_time(0), working_hours_end=dt_time(23, 30)
+            ).id
+            for i in range(10)
+        }
+        service = Service.objects.create(service_name="Import bench cut", service_duration=30)
+        return barbers, service
+
+    def records(self, barbers, service, count):
+        # One booking per barber per half hour, on dates no one else uses
+        names = list(barbers)
+        start = datetime.combine(date(2998, 1, 1), dt_time(0))
+        slots_per_day = 47
+        return [
+            {
+                'customer_name': f"Import bench {i}",
+                'customer_email': "import-bench@example.com",
+                'barber': names[i % len(names)],
+                'service': service.service_name,
+                'appointment_time': (
+                    start + timedelta(days=i // (len(names) * slots_per_day),
+                                      minutes=30 * (i // len(names) % slots_per_day))
+                ).isoformat(),
+                'status': 'pending',
+            }
+            for i in range(count)
+        ]
+
+    def csv_body(self, records):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+        return buffer.getvalue().encode()
+
+    def show(self, method, rows, seconds):
+        self.stdout.write(f"{method:<24} {rows:>7} {seconds:>8.2f} {rows / seconds:>8.0f}")
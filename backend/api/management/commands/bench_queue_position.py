@@ -0,0 +1,40 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.models import Queue
+from api.views_queue import calculate_queue_position
+
+
+class Command(BaseCommand):
+    help = "Benchmark queue position lookups against growing numbers of pending entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000],
+            help="Numbers of pending queue entries to seed for each run"
+        )
+        parser.add_argument('--lookups', type=int, default=200, help="Position lookups per run")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'pending':>10} {'avg ms':>10} {'max ms':>10}")
+        for size in options['sizes']:
+            # Seed inside a transaction that is rolled back, so the real queue is untouched
+            with transaction.atomic():
+                # bulk_create skips Queue.save, so hand out tickets on a day of our own
+                Queue.objects.bulk_create(
+                    [Queue(name=f"Bench {i}", ticket_day=date.max, ticket_number=i) for i in range(1, size + 1)],
+                    batch_size=1000
+                )
+                entries = list(
+                    Queue.objects.filter(status='pending').order_by('-ticket_day', '-ticket_number')[:options['lookups']]
+                )
+                timings = []
+                for entry in entries:
+                    start = time.perf_counter()
+                    calculate_queue_position(entry)
+                    timings.append((time.perf_counter() - start) * 1000)
+                transaction.set_rollback(True)
+
+            avg = sum(timings) / len(timings)
+            self.stdout.write(f"{size:>10} {avg:>10.3f} {max(timings):>10.3f}")
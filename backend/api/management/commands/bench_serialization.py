@@ -0,0 +1,103 @@
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from api.models import Appointment, Barber, Queue, Service
+from api.renderers import FastJSONRenderer
+from api.row_serializers import appointment_rows, queue_rows
+from api.serializers import AppointmentSerializer, QueueSerializer
+from api.views_queue import queue_page_query
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark per-row cost of the list endpoints: ModelSerializer + JSONRenderer "
+        "against .values_list() rows + FastJSONRenderer, checking both give the same bytes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[100, 1000, 5000],
+            help="Numbers of rows to seed for each run"
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per path; the best one is reported")
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'endpoint':<14} {'rows':>6} {'serializer us/row':>18} {'fast us/row':>12} {'speedup':>8}"
+        )
+        for size in options['sizes']:
+            # Seed inside a transaction that is rolled back, so real data is untouched
+            with transaction.atomic():
+                day = self.seed(size)
+
+                def serializer_appointments():
+                    queryset = Appointment.objects.filter(appointment_date=day)
+                    return JSONRenderer().render(AppointmentSerializer(queryset, many=True).data)
+
+                def fast_appointments():
+                    queryset = Appointment.objects.filter(appointment_date=day)
+                    return FastJSONRenderer().render(appointment_rows.data(queryset))
+
+                def serializer_queue():
+                    page = list(queue_page_query([], None, 0))
+                    data = QueueSerializer(page, many=True).data
+                    for entry, item in zip(page, data):
+                        item['position'] = entry.position
+                    return JSONRenderer().render(data)
+
+                def fast_queue():
+                    page = queue_rows.values(queue_page_query([], None, 0))
+                    return FastJSONRenderer().render(queue_rows.serialize(page))
+
+                self.compare('appointments', size, serializer_appointments, fast_appointments, options['repeat'])
+                self.compare('queue', size, serializer_queue, fast_queue, options['repeat'])
+                transaction.set_rollback(True)
+
+    def seed(self, size):
+        barber = Barber.objects.create(name="Bench barber")
+        service = Service.objects.create(service_name="Bench cut", service_price="12.50")
+        day = date(2999, 1, 1)
+        start = timezone.make_aware(datetime.combine(day, dt_time(0, 0)))
+        Appointment.objects.bulk_create([
+            Appointment(
+                customer_name=f"Bench {i}", customer_email=f"bench{i}@example.com",
+                barber=barber, service=service if i % 2 else None,
+                appointment_time=start + timedelta(minutes=i), appointment_date=day,
+                status='pending' if i % 3 else 'completed',
+            )
+            for i in range(size)
+        ], batch_size=1000)
+        # The queue list spans every day, so empty it first (rolled back with the rest)
+        Queue.objects.all().delete()
+        Queue.objects.bulk_create([
+            Queue(
+                name=f"Bench {i}", status='pending' if i % 3 else 'completed',
+                ticket_day=day, ticket_number=i,
+            )
+            for i in range(1, size + 1)
+        ], batch_size=1000)
+        return day
+
+    def compare(self, name, size, slow, fast, repeat):
+        slow_body, slow_seconds = self.best_of(slow, repeat)
+        fast_body, fast_seconds = self.best_of(fast, repeat)
+        if slow_body != fast_body:
+            raise CommandError(f"{name}: fast path output differs from the ModelSerializer output")
+
+        slow_us = slow_seconds / size * 1e6
+        fast_us = fast_seconds / size * 1e6
+        self.stdout.write(
+            f"{name:<14} {size:>6} {slow_us:>18.2f} {fast_us:>12.2f} {slow_us / fast_us:>7.1f}x"
+        )
+
+    def best_of(self, run, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return body, best
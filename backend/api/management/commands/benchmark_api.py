@@ -0,0 +1,198 @@
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from api.models import Appointment, Barber, Queue, Service
+from api.positions import rebuild_positions
+from api.working_calendar import EVERY_DAY
+
+BENCH_PREFIX = "Bench"
+BENCH_EMAIL = "bench@example.com"
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed realistic volumes of barbers, services, appointments and queue entries, "
+        "drive the hot API endpoints through the test client and report p50/p95/p99 "
+        "latency and throughput. Run it against SQLite with "
+        "--settings=barberqueue.settings_bench (after migrating that database)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barbers', type=int, default=10)
+        parser.add_argument('--services', type=int, default=8)
+        parser.add_argument('--days', type=int, default=60, help="Days of appointment history to seed")
+        parser.add_argument('--queue', type=int, default=5000, help="Queue entries to seed (about 5%% pending)")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint")
+        parser.add_argument('--concurrency', type=int, default=1, help="Client threads per endpoint")
+        parser.add_argument('--only', nargs='+', help="Run only the named endpoints")
+        parser.add_argument('--output', help="Also write the results as JSON to this file")
+        parser.add_argument('--keep', action='store_true', help="Keep the seeded rows afterwards")
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        self.cleanup()
+        try:
+            seeded = self.seed(options)
+            results = {}
+            # Measure the endpoints, not the request sampling of the stats middleware
+            with override_settings(REQUEST_STATS_SAMPLE_RATE=0.0):
+                for name, method, make_request in self.scenarios(seeded):
+                    if options['only'] and name not in options['only']:
+                        continue
+                    results[name] = self.run_scenario(method, make_request, options['requests'], options['concurrency'])
+            self.report(results)
+            if options['output']:
+                with open(options['output'], 'w') as output:
+                    json.dump(results, output, indent=2)
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def seed(self, options):
+        start = time.perf_counter()
+        today = date.today()
+        with transaction.atomic():
+            barbers = Barber.objects.bulk_create(
+                Barber(name=f"{BENCH_PREFIX} barber {i}", working_hours_start=dt_time(9), working_hours_end=dt_time(19),
+                       slot_duration=30, available_days=EVERY_DAY)
+                for i in range(options['barbers'])
+            )
+            services = Service.objects.bulk_create(
+                Service(service_name=f"{BENCH_PREFIX} service {i}", service_duration=30, service_price=20 + i)
+                for i in range(options['services'])
+            )
+            # Past days are mostly completed; today and later stay pending/scheduled
+            appointments = []
+            for offset in range(-options['days'] + 1, 8):
+                day = today + timedelta(days=offset)
+                for barber in barbers:
+                    for slot in random.sample(range(20), 14):
+                        if offset < 0:
+                            appointment_status = random.choice(['completed'] * 8 + ['canceled'] * 2)
+                        else:
+                            appointment_status = random.choice(['pending', 'scheduled'])
+                        appointments.append(Appointment(
+                            customer_name=f"{BENCH_PREFIX} customer", customer_email=BENCH_EMAIL,
+                            barber=barber, service=random.choice(services),
+                            appointment_time=datetime.combine(day, dt_time(9), tzinfo=dt_timezone.utc) + timedelta(minutes=30 * slot),
+                            appointment_date=day, status=appointment_status, position=0
+                        ))
+            Appointment.objects.bulk_create(appointments, batch_size=2000)
+            # bulk_create skips the position counters; number the seeded dates
+            rebuild_positions({appointment.appointment_date for appointment in appointments})
+
+            # bulk_create skips Queue.save, so give the seeded entries their own ticket day
+            queue_day = date(2000, 1, 1)
+            pending_from = int(options['queue'] * 0.95)
+            Queue.objects.bulk_create(
+                (Queue(name=f"{BENCH_PREFIX} walk-in {i}", ticket_day=queue_day, ticket_number=i + 1,
+                       status='pending' if i >= pending_from else random.choice(['completed', 'canceled']))
+                 for i in range(options['queue'])),
+                batch_size=2000
+            )
+        pending_ids = list(
+            Queue.objects.filter(name__startswith=BENCH_PREFIX, status='pending').values_list('id', flat=True)
+        )
+        self.stdout.write(
+            f"Seeded {len(barbers)} barbers, {len(services)} services, {len(appointments)} appointments, "
+            f"{options['queue']} queue entries in {time.perf_counter() - start:.1f}s"
+        )
+        return {
+            'barber_ids': [barber.id for barber in barbers],
+            'service_ids': [service.id for service in services],
+            'days': [(today + timedelta(days=offset)).isoformat() for offset in range(0, 7)],
+            'pending_ids': pending_ids or [0],
+        }
+
+    def scenarios(self, seeded):
+        """
+        (name, client method, request factory) for each hot endpoint; the
+        factory returns (path, data) for one request.
+        """
+        barber_ids, days = seeded['barber_ids'], seeded['days']
+        return [
+            ("queue_check_in", 'post', lambda: ("/api/queue/", {"name": f"{BENCH_PREFIX} check-in"})),
+            ("queue_position", 'get', lambda: (f"/api/queue/search/{random.choice(seeded['pending_ids'])}/", None)),
+            ("queue_list", 'get', lambda: ("/api/queue/list/?status=pending", None)),
+            ("available_slots", 'get', lambda: (f"/api/schedule/{random.choice(barber_ids)}/{random.choice(days)}/", None)),
+            ("availability_search", 'get', lambda: (f"/api/schedule/search/?start={days[0]}&next=10", None)),
+            ("appointments_by_date", 'get', lambda: (f"/api/appointments/{random.choice(days)}/", None)),
+            ("appointments_board", 'get', lambda: (f"/api/appointments/list/?start={random.choice(days)}&expand=1", None)),
+            ("barbers_list", 'get', lambda: ("/api/barbers/list/", None)),
+            ("services_list", 'get', lambda: ("/api/services/list/", None)),
+        ]
+
+    def run_scenario(self, method, make_request, total, concurrency):
+        requests = [make_request() for _ in range(total)]
+        chunks = [requests[i::concurrency] for i in range(concurrency)]
+
+        def worker(chunk):
+            client = self.make_client()
+            timings, errors = [], 0
+            try:
+                for path, data in chunk:
+                    start = time.perf_counter()
+                    status_code = self.send(client, method, path, data)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    errors += status_code >= 500
+            finally:
+                if concurrency > 1:
+                    connection.close()
+            return timings, errors
+
+        start = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(worker, chunks))
+        else:
+            outcomes = [worker(chunks[0])]
+        elapsed = time.perf_counter() - start
+
+        timings = sorted(t for chunk_timings, _ in outcomes for t in chunk_timings)
+        return {
+            "requests": len(timings),
+            "errors": sum(errors for _, errors in outcomes),
+            "p50_ms": round(percentile(timings, 0.50), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "p99_ms": round(percentile(timings, 0.99), 3),
+            "throughput_rps": round(len(timings) / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def make_client(self):
+        return APIClient(HTTP_HOST='localhost')
+
+    def send(self, client, method, path, data):
+        """
+        Makes one request and returns its status code.
+        """
+        return getattr(client, method)(path, data, format='json').status_code
+
+    def report(self, results):
+        self.stdout.write(f"{'endpoint':<22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<22} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                f"{result['throughput_rps']:>9.1f} {result['errors']:>7}"
+            )
+
+    def cleanup(self):
+        Queue.objects.filter(name__startswith=BENCH_PREFIX).delete()
+        seeded = Appointment.objects.filter(customer_email=BENCH_EMAIL)
+        days = set(seeded.values_list('appointment_date', flat=True))
+        seeded.delete()
+        rebuild_positions(days)
+        Barber.objects.filter(name__startswith=f"{BENCH_PREFIX} barber").delete()
+        Service.objects.filter(service_name__startswith=f"{BENCH_PREFIX} service").delete()
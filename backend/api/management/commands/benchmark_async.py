@@ -0,0 +1,104 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import ThreadSensitiveContext
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory
+from django.test.utils import override_settings
+from api import views_async, views_barber, views_queue, views_schedule, views_service
+from .benchmark_api import Command as BenchmarkCommand, percentile
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Compare the sync read views on a fixed worker pool (a sync WSGI deployment) "
+        "with the async views on one event loop (ASGI) under many concurrent "
+        "connections. Seeds the same data as benchmark_api."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--workers', type=int, default=4, help="Sync worker threads")
+        parser.add_argument('--connections', type=int, default=100, help="Concurrent async connections")
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        self.cleanup()
+        try:
+            seeded = self.seed(options)
+            self.stdout.write(
+                f"{'endpoint':<18} {'sync req/s':>11} {'sync p95':>9} {'async req/s':>12} {'async p95':>10}"
+            )
+            with override_settings(REQUEST_STATS_SAMPLE_RATE=0.0):
+                for name, sync_view, async_view, make_path in self.read_scenarios(seeded):
+                    if options['only'] and name not in options['only']:
+                        continue
+                    paths = [make_path() for _ in range(options['requests'])]
+                    sync_result = self.run_sync(sync_view, paths, options['workers'])
+                    async_result = asyncio.run(self.run_async(async_view, paths, options['connections']))
+                    self.stdout.write(
+                        f"{name:<18} {sync_result[0]:>11.1f} {sync_result[1]:>9.2f} "
+                        f"{async_result[0]:>12.1f} {async_result[1]:>10.2f}"
+                    )
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def read_scenarios(self, seeded):
+        """
+        (name, sync view, async view, factory of (path, view kwargs)) per read endpoint.
+        """
+        barber_ids, days = seeded['barber_ids'], seeded['days']
+
+        def slots():
+            barber_id, day = random.choice(barber_ids), random.choice(days)
+            return f"/api/schedule/{barber_id}/{day}/", {"barber_id": barber_id, "date_str": day}
+
+        def position():
+            queue_id = random.choice(seeded['pending_ids'])
+            return f"/api/queue/search/{queue_id}/", {"queueid": queue_id}
+
+        return [
+            ("queue_position", views_queue.get_queue_position_by_id, views_async.get_queue_position_by_id, position),
+            ("queue_list", views_queue.get_all_queue_entries, views_async.get_all_queue_entries,
+             lambda: ("/api/queue/list/?status=pending", {})),
+            ("available_slots", views_schedule.get_available_slots, views_async.get_available_slots, slots),
+            ("barbers_list", views_barber.get_barbers, views_async.get_barbers, lambda: ("/api/barbers/list/", {})),
+            ("services_list", views_service.get_services, views_async.get_services, lambda: ("/api/services/list/", {})),
+        ]
+
+    def run_sync(self, view, paths, workers):
+        factory = RequestFactory(HTTP_HOST='localhost')
+
+        def call(path_kwargs):
+            path, kwargs = path_kwargs
+            start = time.perf_counter()
+            response = view(factory.get(path), **kwargs)
+            response.render()
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            timings = sorted(pool.map(call, paths))
+        elapsed = time.perf_counter() - start
+        # Threads opened their own connections; close the main one too
+        connection.close()
+        return len(timings) / elapsed, percentile(timings, 0.95)
+
+    async def run_async(self, view, paths, connections):
+        factory = AsyncRequestFactory(HTTP_HOST='localhost')
+        semaphore = asyncio.Semaphore(connections)
+
+        async def call(path, kwargs):
+            async with semaphore:
+                # Give each request its own sync thread, as the ASGI handler does
+                async with ThreadSensitiveContext():
+                    start = time.perf_counter()
+                    await view(factory.get(path), **kwargs)
+                    return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        timings = sorted(await asyncio.gather(*(call(path, kwargs) for path, kwargs in paths)))
+        elapsed = time.perf_counter() - start
+        return len(timings) / elapsed, percentile(timings, 0.95)
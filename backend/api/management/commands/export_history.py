@@ -0,0 +1,37 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from api.exports import CONTENT_TYPES, DATASETS, EXPORT_CHUNK_SIZE, export_queryset, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream appointment or queue history as CSV or NDJSON, with constant memory use."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('--format', dest='export_format', choices=sorted(CONTENT_TYPES), default='csv')
+        parser.add_argument('--start', help="First date to export (YYYY-MM-DD)")
+        parser.add_argument('--end', help="Last date to export (YYYY-MM-DD)")
+        parser.add_argument('--barber', help="Only this barber's appointments")
+        parser.add_argument('--status', default='', help="Comma-separated statuses to export")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="Rows fetched per round trip")
+        parser.add_argument('--include-archived', action='store_true', help="Also export archived rows")
+        parser.add_argument('--output', help="File to write (default: stdout)")
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export_queryset(options['dataset'], options)
+            archived_queryset = None
+            if options['include_archived']:
+                archived_queryset = export_queryset(options['dataset'], options, archived=True)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        chunks = stream_export(
+            options['dataset'], queryset, options['export_format'], options['chunk_size'], archived_queryset
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(chunks)
+        else:
+            sys.stdout.buffer.writelines(chunks)
+            sys.stdout.buffer.flush()
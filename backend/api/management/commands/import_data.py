@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from api.imports import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, IMPORTERS, run_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Import barbers, services or appointments from a CSV, JSON or NDJSON file "
+        "in validated bulk_create chunks, reporting per-row errors and rows per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help="File to import, or - for stdin")
+        parser.add_argument(
+            '--format', dest='import_format', choices=IMPORT_FORMATS,
+            help="Input format (default: from the file extension)"
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per bulk_create")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; insert nothing")
+
+    def handle(self, *args, **options):
+        import_format = options['import_format']
+        if import_format is None:
+            import_format = os.path.splitext(options['path'])[1].lstrip('.').lower()
+            if import_format not in IMPORT_FORMATS:
+                raise CommandError("Can't tell the input format; pass --format")
+
+        start = time.perf_counter()
+        try:
+            if options['path'] == '-':
+                report = self.run(options, sys.stdin.buffer, import_format)
+            else:
+                with open(options['path'], 'rb') as stream:
+                    report = self.run(options, stream, import_format)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - start
+
+        for error in report['errors']:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        if report['failed'] > len(report['errors']):
+            self.stderr.write(f"... and {report['failed'] - len(report['errors'])} more failed rows")
+        rows = report['imported'] + report['failed']
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['imported']} {options['dataset']}, {report['failed']} failed, "
+            f"in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)"
+        ))
+        if 'error' in report:
+            raise CommandError(report['error'])
+
+    def run(self, options, stream, import_format):
+        return run_import(options['dataset'], stream, import_format, options['chunk_size'], options['dry_run'])
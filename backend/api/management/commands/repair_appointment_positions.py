@@ -0,0 +1,57 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api import slot_cache, working_calendar
+from api.models import Appointment, Barber, BarberDayTimetable
+from api.positions import rebuild_positions
+from api.views_appointment import lock_booking_date
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-date and per-barber pending appointment counters and "
+        "renumber pending appointments, in one pass, if they have drifted. Stored "
+        "barber timetables and cached slots of those dates are dropped and rebuilt on "
+        "their next read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dates', nargs='+', metavar='YYYY-MM-DD',
+            help="Only repair these dates (default: every date)"
+        )
+
+    def handle(self, *args, **options):
+        days = None
+        if options['dates']:
+            try:
+                days = sorted({date.fromisoformat(value) for value in options['dates']})
+            except ValueError as exc:
+                raise CommandError(f"Invalid date: {exc}")
+
+        with transaction.atomic():
+            # Hold off bookings on the dates being renumbered
+            locked_days = days
+            if locked_days is None:
+                locked_days = sorted(set(
+                    Appointment.objects.filter(status='pending').values_list('appointment_date', flat=True)
+                ))
+            for day in locked_days:
+                lock_booking_date(day)
+            changed = rebuild_positions(days)
+            timetables = BarberDayTimetable.objects.all()
+            if days is not None:
+                timetables = timetables.filter(day__in=days)
+            dropped = timetables.delete()[0]
+            if days is not None:
+                barber_ids = list(Barber.objects.values_list('id', flat=True))
+                slot_cache.invalidate((barber_id, day) for barber_id in barber_ids for day in days)
+            else:
+                # Every cached slot list is keyed by the calendar version
+                working_calendar.invalidate()
+
+        scope = f"{len(days)} date(s)" if days is not None else "all dates"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt counters for {scope}; renumbered {changed} appointment(s); "
+            f"dropped {dropped} stored timetable(s)"
+        ))
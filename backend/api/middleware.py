@@ -0,0 +1,89 @@
+import random
+import time
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from .stats import registry
+
+
+class QueryCounter:
+    """
+    Database execute wrapper that counts queries and the time spent in them.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.queries += 1
+
+
+class RequestStatsMiddleware:
+    """
+    Records wall time, DB query count and DB time per route for a sample of
+    requests under REQUEST_STATS_PATH_PREFIX, into api.stats.registry.
+    REQUEST_STATS_SAMPLE_RATE (0.0 - 1.0) sets the share of requests measured.
+    Works in both sync (WSGI) and async (ASGI) stacks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_STATS_SAMPLE_RATE', 1.0)
+        self.path_prefix = getattr(settings, 'REQUEST_STATS_PATH_PREFIX', '/api/')
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled(request):
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            install_counter(stack, counter)
+            response = self.get_response(request)
+        self.record(request, time.perf_counter() - start, counter)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled(request):
+            return await self.get_response(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        # The async ORM runs queries in this request's sync thread, so the
+        # wrappers have to be installed on that thread's connections
+        stack = ExitStack()
+        await sync_to_async(install_counter)(stack, counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, time.perf_counter() - start, counter)
+        return response
+
+    def sampled(self, request):
+        return request.path.startswith(self.path_prefix) and random.random() < self.sample_rate
+
+    def record(self, request, duration, counter):
+        # Group by URL pattern, not by concrete path, to keep the label set small
+        match = request.resolver_match
+        route = match.route if match else 'unmatched'
+        registry.record(request.method, route, duration, counter.queries, counter.duration)
+
+
+def install_counter(stack, counter):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(counter))
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_appointment_gender_appointment_phone_no'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='queue',
+            index=models.Index(fields=['status', 'created_at'], name='queue_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_queue_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='queue',
+            index=models.Index(fields=['created_at', 'id'], name='queue_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:40
+
+import logging
+from django.db import migrations, models
+from django.db.models import Count
+
+ACTIVE_STATUSES = ['pending', 'scheduled']
+
+logger = logging.getLogger(__name__)
+
+
+def cancel_duplicate_bookings(apps, schema_editor):
+    """
+    Keep the earliest booking of each barber and start time among the active
+    ones and cancel the others, so the unique constraint can be added. Each
+    canceled booking is logged as a warning with the one that was kept.
+    """
+    Appointment = apps.get_model('api', 'Appointment')
+    active = Appointment.objects.filter(status__in=ACTIVE_STATUSES)
+    duplicated = active.values('barber_id', 'appointment_time').annotate(count=Count('id')).filter(count__gt=1)
+    canceled = []
+    for slot in duplicated.iterator():
+        ids = list(active.filter(
+            barber_id=slot['barber_id'], appointment_time=slot['appointment_time']
+        ).order_by('created_at', 'id').values_list('id', flat=True))
+        logger.warning(
+            "Barber %s is double-booked at %s: keeping appointment %s, canceling %s",
+            slot['barber_id'], slot['appointment_time'].isoformat(), ids[0], ", ".join(map(str, ids[1:]))
+        )
+        canceled.extend(ids[1:])
+    for start in range(0, len(canceled), 1000):
+        Appointment.objects.filter(id__in=canceled[start:start + 1000]).update(status='canceled')
+    if canceled:
+        logger.warning("Canceled %d duplicate active appointments", len(canceled))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_queue_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'scheduled'])), fields=('barber', 'appointment_time'), name='unique_active_barber_appointment_time'),
+        ),
+    ]
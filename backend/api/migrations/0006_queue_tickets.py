@@ -0,0 +1,76 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:05
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Entries numbered per UPDATE
+BATCH_SIZE = 1000
+
+
+def backfill_tickets(apps, schema_editor):
+    """
+    Number existing entries per day in creation order and seed the counters.
+    """
+    Queue = apps.get_model('api', 'Queue')
+    QueueTicketCounter = apps.get_model('api', 'QueueTicketCounter')
+    last_tickets = {}
+    changed = []
+    for entry in Queue.objects.order_by('created_at', 'id').iterator(chunk_size=2000):
+        day = timezone.localtime(entry.created_at).date()
+        last_tickets[day] = last_tickets.get(day, 0) + 1
+        entry.ticket_day = day
+        entry.ticket_number = last_tickets[day]
+        changed.append(entry)
+        if len(changed) == BATCH_SIZE:
+            Queue.objects.bulk_update(changed, ['ticket_day', 'ticket_number'])
+            changed.clear()
+    Queue.objects.bulk_update(changed, ['ticket_day', 'ticket_number'])
+    QueueTicketCounter.objects.bulk_create(
+        QueueTicketCounter(day=day, last_ticket=last_ticket)
+        for day, last_ticket in last_tickets.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_unique_active_barber_appointment_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueueTicketCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('last_ticket', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='queue',
+            name='queue_status_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='queue',
+            name='queue_created_id_idx',
+        ),
+        migrations.AddField(
+            model_name='queue',
+            name='ticket_day',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='queue',
+            name='ticket_number',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_tickets, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='queue',
+            index=models.Index(fields=['status', 'ticket_day', 'ticket_number'], name='queue_status_ticket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='queue',
+            constraint=models.UniqueConstraint(fields=('ticket_day', 'ticket_number'), name='unique_queue_ticket'),
+        ),
+    ]
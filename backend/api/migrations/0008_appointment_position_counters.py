@@ -0,0 +1,70 @@
+# Generated by Django 5.1.3 on 2026-10-18 21:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Appointments renumbered per UPDATE
+BATCH_SIZE = 1000
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Number pending appointments per date in booking order and seed the counters.
+    """
+    Appointment = apps.get_model('api', 'Appointment')
+    AppointmentDayCounter = apps.get_model('api', 'AppointmentDayCounter')
+    AppointmentBarberDayCounter = apps.get_model('api', 'AppointmentBarberDayCounter')
+    day_totals = {}
+    barber_totals = {}
+    changed = []
+    pending = Appointment.objects.filter(status='pending').order_by('appointment_date', 'created_at', 'id')
+    for appointment in pending.iterator(chunk_size=2000):
+        day = appointment.appointment_date
+        day_totals[day] = day_totals.get(day, 0) + 1
+        key = (appointment.barber_id, day)
+        barber_totals[key] = barber_totals.get(key, 0) + 1
+        if appointment.position != day_totals[day]:
+            appointment.position = day_totals[day]
+            changed.append(appointment)
+        if len(changed) == BATCH_SIZE:
+            Appointment.objects.bulk_update(changed, ['position'])
+            changed.clear()
+    Appointment.objects.bulk_update(changed, ['position'])
+    AppointmentDayCounter.objects.bulk_create(
+        AppointmentDayCounter(day=day, pending=total) for day, total in day_totals.items()
+    )
+    AppointmentBarberDayCounter.objects.bulk_create(
+        AppointmentBarberDayCounter(barber_id=barber_id, day=day, pending=total)
+        for (barber_id, day), total in barber_totals.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_appointment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentDayCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('pending', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AppointmentBarberDayCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('pending', models.IntegerField(default=0)),
+                ('barber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.barber')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('barber', 'day'), name='unique_barber_day_counter')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-18 21:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_appointment_position_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedQueue',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('canceled', 'Canceled'), ('completed', 'Completed')], max_length=20)),
+                ('ticket_day', models.DateField(blank=True, null=True)),
+                ('ticket_number', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ticket_day', 'ticket_number'], name='archived_queue_ticket_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('customer_name', models.CharField(max_length=100)),
+                ('customer_email', models.EmailField(max_length=254)),
+                ('phone_no', models.CharField(blank=True, max_length=20, null=True)),
+                ('gender', models.CharField(blank=True, max_length=10, null=True)),
+                ('appointment_time', models.DateTimeField()),
+                ('appointment_date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('scheduled', 'Scheduled'), ('canceled', 'Canceled'), ('completed', 'Completed')], max_length=20)),
+                ('position', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('barber', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.barber')),
+                ('service', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.service')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['appointment_date'], name='archived_appt_date_idx')],
+            },
+        ),
+    ]
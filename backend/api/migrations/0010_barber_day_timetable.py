@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-18 22:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_archive_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BarberDayTimetable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('data', models.JSONField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('barber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.barber')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('barber', 'day'), name='unique_barber_day_timetable')],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.3 on 2026-10-18 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+
+def copy_available_days(apps, schema_editor):
+    """
+    Weekly hours rows from each barber's working_hours_start/end and
+    comma-separated available_days.
+    """
+    Barber = apps.get_model('api', 'Barber')
+    BarberWorkingHours = apps.get_model('api', 'BarberWorkingHours')
+    rows = []
+    for barber in Barber.objects.all():
+        names = {name.strip().lower() for name in (barber.available_days or '').split(',')}
+        rows.extend(
+            BarberWorkingHours(
+                barber_id=barber.id, weekday=weekday,
+                start=barber.working_hours_start, end=barber.working_hours_end
+            )
+            for weekday, name in enumerate(WEEKDAYS) if name in names
+        )
+    BarberWorkingHours.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_barber_day_timetable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BarberWorkingHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField()),
+                ('start', models.TimeField()),
+                ('end', models.TimeField()),
+                ('barber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='working_hours', to='api.barber')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('barber', 'weekday'), name='unique_barber_weekday_hours')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CalendarException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('start', models.TimeField(blank=True, null=True)),
+                ('end', models.TimeField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, default='', max_length=200)),
+                ('barber', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calendar_exceptions', to='api.barber')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('barber', 'day'), name='unique_barber_calendar_exception'), models.UniqueConstraint(condition=models.Q(('barber__isnull', True)), fields=('day',), name='unique_shop_calendar_exception')],
+            },
+        ),
+        migrations.RunPython(copy_available_days, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import connection, models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
@@ -46,6 +46,49 @@ class Barber(models.Model):
     def __str__(self):
         return self.name
 
+class BarberWorkingHours(models.Model):
+    """
+    A barber's working hours on one weekday (0 = Monday). Days without a
+    row are days off; barbers without any rows work working_hours_start to
+    working_hours_end on their available_days. Compiled by api.working_calendar.
+    """
+    barber = models.ForeignKey(Barber, on_delete=models.CASCADE, related_name='working_hours')
+    weekday = models.PositiveSmallIntegerField()
+    start = models.TimeField()
+    end = models.TimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['barber', 'weekday'], name='unique_barber_weekday_hours'),
+        ]
+
+    def __str__(self):
+        return f"{self.barber_id} {self.weekday}: {self.start}-{self.end}"
+
+class CalendarException(models.Model):
+    """
+    A holiday or one-off change to the working hours on one date: closed
+    when start and end are empty, otherwise open from start to end. Applies
+    to one barber, or to the whole shop when barber is empty; a barber's own
+    exception wins over the shop's.
+    """
+    barber = models.ForeignKey(Barber, on_delete=models.CASCADE, null=True, blank=True, related_name='calendar_exceptions')
+    day = models.DateField()
+    start = models.TimeField(null=True, blank=True)
+    end = models.TimeField(null=True, blank=True)
+    note = models.CharField(max_length=200, blank=True, default='')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['barber', 'day'], name='unique_barber_calendar_exception'),
+            models.UniqueConstraint(
+                fields=['day'], condition=models.Q(barber__isnull=True), name='unique_shop_calendar_exception'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.barber_id or 'shop'} {self.day}"
+
 class Service(models.Model):
     """
     Service entity: e.g. 'Haircut', 'Shave', etc.
@@ -82,12 +125,121 @@ class Appointment(models.Model):
     position = models.IntegerField(default=0)  # You were calculating this on the fly
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Leaving the pending queue shifts the later positions of that date
+            models.Index(fields=['appointment_date', 'status'], name='appt_date_status_idx'),
+            # Slot lookups and overlap checks read one barber-day's active bookings
+            models.Index(fields=['barber', 'appointment_date', 'status'], name='appt_barber_date_status_idx'),
+        ]
+        constraints = [
+            # A barber can't have two active bookings starting at the same time
+            models.UniqueConstraint(
+                fields=['barber', 'appointment_time'],
+                condition=models.Q(status__in=['pending', 'scheduled']),
+                name='unique_active_barber_appointment_time',
+            ),
+        ]
+
     def __str__(self):
         return f"Appointment for {self.customer_name} on {self.appointment_date}"
 
+def add_to_counter(model, keys, column, delta):
+    """
+    Adds 'delta' to model's counter column in the row identified by 'keys'
+    (a dict of unique-together column values), creating the row if needed,
+    with a single upsert. Returns the new value; the row stays locked until
+    the caller's transaction ends.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = [connection.ops.quote_name(name) for name in keys]
+    column = connection.ops.quote_name(column)
+    placeholders = ", ".join(["%s"] * (len(keys) + 1))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(names)}, {column}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({', '.join(names)}) DO UPDATE SET {column} = {table}.{column} + %s "
+            f"RETURNING {column}",
+            [*keys.values(), delta, delta]
+        )
+        return cursor.fetchone()[0]
+
+class AppointmentDayCounter(models.Model):
+    """
+    Number of pending appointments on a given day, maintained by api.positions.
+    """
+    day = models.DateField(unique=True)
+    pending = models.IntegerField(default=0)
+
+    @classmethod
+    def add(cls, day, delta):
+        return add_to_counter(cls, {'day': day}, 'pending', delta)
+
+    def __str__(self):
+        return f"{self.day}: {self.pending}"
+
+class AppointmentBarberDayCounter(models.Model):
+    """
+    Number of pending appointments of one barber on a given day, maintained
+    by api.positions.
+    """
+    barber = models.ForeignKey(Barber, on_delete=models.CASCADE)
+    day = models.DateField()
+    pending = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['barber', 'day'], name='unique_barber_day_counter'),
+        ]
+
+    @classmethod
+    def add(cls, barber_id, day, delta):
+        return add_to_counter(cls, {'barber_id': barber_id, 'day': day}, 'pending', delta)
+
+    def __str__(self):
+        return f"{self.barber_id} {self.day}: {self.pending}"
+
+class BarberDayTimetable(models.Model):
+    """
+    Precomputed timetable of one barber's day (bookings and free slots) for
+    the front desk, rebuilt by api.timetable whenever an appointment of that
+    barber and day changes.
+    """
+    barber = models.ForeignKey(Barber, on_delete=models.CASCADE)
+    day = models.DateField()
+    data = models.JSONField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['barber', 'day'], name='unique_barber_day_timetable'),
+        ]
+
+    def __str__(self):
+        return f"{self.barber_id} {self.day}"
+
+class QueueTicketCounter(models.Model):
+    """
+    Last queue ticket number handed out on a given day.
+    """
+    day = models.DateField(unique=True)
+    last_ticket = models.IntegerField(default=0)
+
+    @classmethod
+    def next_ticket(cls, day):
+        """
+        Atomically takes the next ticket number for 'day' with a single upsert;
+        the counter row stays locked until the caller's transaction ends.
+        """
+        return add_to_counter(cls, {'day': day}, 'last_ticket', 1)
+
+    def __str__(self):
+        return f"{self.day}: {self.last_ticket}"
+
 class Queue(models.Model):
     """
     Queue entity, referencing a Customer (or just storing a name) plus status.
+    Entries are ordered by their ticket: (ticket_day, ticket_number).
     """
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -96,7 +248,80 @@ class Queue(models.Model):
     )
     name = models.CharField(max_length=100)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    ticket_day = models.DateField(null=True, blank=True)
+    ticket_number = models.IntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ticket_day', 'ticket_number'], name='unique_queue_ticket'),
+        ]
+        indexes = [
+            # Position lookups count pending entries with an earlier ticket
+            models.Index(fields=['status', 'ticket_day', 'ticket_number'], name='queue_status_ticket_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.ticket_number is None:
+            # Hold the day's counter row until the entry is stored, so tickets
+            # become visible in the order they were handed out
+            with transaction.atomic():
+                self.ticket_day = timezone.localdate()
+                self.ticket_number = QueueTicketCounter.next_ticket(self.ticket_day)
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} - {self.status}"
+
+class ArchivedAppointment(models.Model):
+    """
+    Completed or canceled appointment moved out of Appointment by the
+    archive_records command. Same columns and ids; the barber and service
+    references are kept without constraints so history outlives them.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    customer_name = models.CharField(max_length=100)
+    customer_email = models.EmailField()
+    barber = models.ForeignKey(
+        Barber, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    service = models.ForeignKey(
+        Service, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+', null=True, blank=True
+    )
+    phone_no = models.CharField(max_length=20, null=True, blank=True)
+    gender = models.CharField(max_length=10, null=True, blank=True)
+    appointment_time = models.DateTimeField()
+    appointment_date = models.DateField()
+    status = models.CharField(max_length=20, choices=Appointment.STATUS_CHOICES)
+    position = models.IntegerField(default=0)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['appointment_date'], name='archived_appt_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived appointment for {self.customer_name} on {self.appointment_date}"
+
+class ArchivedQueue(models.Model):
+    """
+    Completed or canceled queue entry moved out of Queue by the
+    archive_records command. Same columns and ids.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=Queue.STATUS_CHOICES)
+    ticket_day = models.DateField(null=True, blank=True)
+    ticket_number = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket_day', 'ticket_number'], name='archived_queue_ticket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.status} (archived)"
@@ -0,0 +1,116 @@
+"""
+Appointment positions, maintained incrementally.
+
+A pending appointment's position is its place among the pending
+appointments of its date, in booking order. AppointmentDayCounter holds the
+number of pending appointments per date (AppointmentBarberDayCounter per
+barber and date), so a booking takes the next position from the counter and
+appointments leaving the pending queue shift the later positions of their
+date down with one UPDATE; nothing is recounted.
+
+Callers hold lock_booking_date() for every date they touch, so counters and
+positions of a date change together.
+"""
+from collections import Counter, defaultdict
+from django.db.models import Case, F, IntegerField, Value, When
+from .models import Appointment, AppointmentBarberDayCounter, AppointmentDayCounter
+
+# Appointments renumbered per UPDATE by rebuild_positions
+BATCH_SIZE = 1000
+
+
+def take_position(day, barber_id):
+    """
+    Counts a new pending appointment in and returns its position.
+    """
+    AppointmentBarberDayCounter.add(barber_id, day, 1)
+    return AppointmentDayCounter.add(day, 1)
+
+
+def release_positions(released):
+    """
+    Counts out appointments that stopped being pending, were deleted, or
+    moved to another date. 'released' holds their former
+    (appointment_date, barber_id, position); call it once they no longer
+    hold that position.
+    """
+    by_day = defaultdict(list)
+    by_barber_day = Counter()
+    for day, barber_id, position in released:
+        by_day[day].append(position)
+        by_barber_day[barber_id, day] += 1
+
+    for (barber_id, day), count in by_barber_day.items():
+        AppointmentBarberDayCounter.add(barber_id, day, -count)
+    for day, day_positions in by_day.items():
+        AppointmentDayCounter.add(day, -len(day_positions))
+        shift_positions(day, sorted(day_positions))
+
+
+def shift_positions(day, removed):
+    """
+    Moves each pending appointment of 'day' down by the number of removed
+    positions ahead of it, in a single UPDATE.
+    """
+    # Checked from the last removed position down: the first match is the shift
+    shift = Case(
+        *[When(position__gt=position, then=Value(len(removed) - i)) for i, position in enumerate(reversed(removed))],
+        output_field=IntegerField(),
+    )
+    Appointment.objects.filter(
+        appointment_date=day, status='pending', position__gt=removed[0]
+    ).update(position=F('position') - shift)
+
+
+def rebuild_positions(days=None):
+    """
+    Recomputes the counters and renumbers the pending appointments of the
+    given dates (all dates when None) in one pass over them, keeping their
+    current order. Returns the number of appointments whose position changed.
+    """
+    pending = Appointment.objects.filter(status='pending')
+    day_counters = AppointmentDayCounter.objects.all()
+    barber_counters = AppointmentBarberDayCounter.objects.all()
+    if days is not None:
+        pending = pending.filter(appointment_date__in=days)
+        day_counters = day_counters.filter(day__in=days)
+        barber_counters = barber_counters.filter(day__in=days)
+
+    changed = []
+    renumbered = 0
+    day_totals = Counter()
+    barber_totals = Counter()
+    rows = pending.order_by('appointment_date', 'position', 'id').values_list(
+        'id', 'appointment_date', 'barber_id', 'position'
+    )
+    for appointment_id, day, barber_id, position in rows.iterator(chunk_size=2000):
+        day_totals[day] += 1
+        barber_totals[barber_id, day] += 1
+        if position != day_totals[day]:
+            changed.append(Appointment(id=appointment_id, position=day_totals[day]))
+        if len(changed) == BATCH_SIZE:
+            Appointment.objects.bulk_update(changed, ['position'])
+            renumbered += len(changed)
+            changed.clear()
+
+    Appointment.objects.bulk_update(changed, ['position'])
+    renumbered += len(changed)
+    day_counters.delete()
+    barber_counters.delete()
+    AppointmentDayCounter.objects.bulk_create(
+        AppointmentDayCounter(day=day, pending=total) for day, total in day_totals.items()
+    )
+    AppointmentBarberDayCounter.objects.bulk_create(
+        AppointmentBarberDayCounter(barber_id=barber_id, day=day, pending=total)
+        for (barber_id, day), total in barber_totals.items()
+    )
+    return renumbered
+
+
+def pending_days(barber_id):
+    """
+    Dates on which the barber has pending appointments, from the counters.
+    """
+    return list(
+        AppointmentBarberDayCounter.objects.filter(barber_id=barber_id, pending__gt=0).values_list('day', flat=True)
+    )
@@ -0,0 +1,36 @@
+"""
+JSON renderer using orjson when it is installed.
+
+orjson encodes in C and is several times faster than the json module on the
+large list responses. Output is byte-for-byte what DRF's JSONRenderer writes:
+compact separators, unescaped unicode, and DRF's own encoding of the types
+JSON has no representation for. Without orjson, or when the client asks for
+indented output, the stock renderer is used.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Dates and times go through DRF's encoder ('Z' suffix for UTC) rather
+    # than orjson's RFC 3339 output
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        # Escaped by DRF too, as they are line terminators in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
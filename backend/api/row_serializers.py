@@ -0,0 +1,179 @@
+"""
+Read-only serialization straight from database rows.
+
+The list endpoints return whole tables of `fields = '__all__'` models, and
+building a ModelSerializer field tree plus one to_representation call per
+field per row dominates their CPU time. A RowSerializer compiles a model's
+fields once into plain column converters and turns .values_list() tuples into
+exactly what the ModelSerializer would return: foreign keys as ids under the
+field name, datetimes in the current time zone with 'Z' for UTC, decimals as
+fixed-point strings.
+"""
+import decimal
+from django.db import models
+from django.db.models import FilteredRelation
+from django.utils import timezone
+from .models import Appointment, ArchivedAppointment, ArchivedQueue, Barber, Queue, Service
+
+
+def format_datetime(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    representation = value.isoformat()
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+def format_iso(value):
+    return value.isoformat()
+
+
+def decimal_formatter(field):
+    """
+    Formats like rest_framework.fields.DecimalField with its defaults.
+    """
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    context.prec = field.max_digits
+
+    def format_decimal(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return '{:f}'.format(value.quantize(exponent, context=context))
+    return format_decimal
+
+
+def column_converter(field):
+    if isinstance(field, models.DateTimeField):
+        return format_datetime
+    if isinstance(field, (models.DateField, models.TimeField)):
+        return format_iso
+    if isinstance(field, models.DecimalField):
+        return decimal_formatter(field)
+    return None
+
+
+class RowSerializer:
+    """
+    Serializes .values_list() rows of a model the way a `fields = '__all__'`
+    ModelSerializer serializes instances. 'extra' names annotations that are
+    fetched after the model fields and passed through unchanged.
+    """
+
+    def __init__(self, model, extra=()):
+        self.model = model
+        # ModelSerializer order: the primary key, other plain fields, then relations
+        fields = sorted(
+            model._meta.concrete_fields,
+            key=lambda field: (not field.primary_key, field.is_relation)
+        )
+        self.columns = [field.attname for field in fields] + list(extra)
+        self.names = [field.name for field in fields] + list(extra)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.converters = [
+            (field.name, convert) for field in fields
+            if (convert := column_converter(field)) is not None
+        ]
+
+    def values(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def get(self, row, name):
+        """
+        Raw value of one column of an unserialized row.
+        """
+        return row[self.index[name]]
+
+    def serialize(self, rows):
+        names = self.names
+        converters = self.converters
+        data = []
+        for row in rows:
+            item = dict(zip(names, row))
+            for name, convert in converters:
+                value = item[name]
+                if value is not None:
+                    item[name] = convert(value)
+            data.append(item)
+        return data
+
+    def data(self, queryset):
+        return self.serialize(self.values(queryset))
+
+
+class ExpandedRowSerializer(RowSerializer):
+    """
+    RowSerializer that replaces the ids of the relations in 'expand'
+    ({relation: [related field names]}, including the primary key) with a
+    summary of the related row, or None for a null key or a missing row
+    (archived rows keep the ids of deleted barbers and services). The
+    related columns are LEFT OUTER joined into the same .values_list() query.
+    """
+
+    def __init__(self, model, expand, extra=()):
+        # Joined under their own names, so filters on the relations don't reuse them
+        self.joins = {f"expanded_{relation}": FilteredRelation(relation) for relation in expand}
+        joined = []
+        for relation, names in expand.items():
+            related = model._meta.get_field(relation).related_model._meta
+            if related.pk.name not in names:
+                raise ValueError(f"The '{relation}' expansion must include {related.pk.name!r}")
+            joined.extend((relation, related.get_field(name)) for name in names)
+        super().__init__(
+            model, extra=list(extra) + [f"expanded_{relation}__{field.attname}" for relation, field in joined]
+        )
+        # Joined columns come last in each row and aren't top-level keys
+        width = len(self.names) - len(joined)
+        self.names = self.names[:width]
+        self.expanded = {relation: ([], None) for relation in expand}
+        for index, (relation, field) in enumerate(joined, start=width):
+            fields, pk_index = self.expanded[relation]
+            fields.append((index, field.name, column_converter(field)))
+            if field.primary_key:
+                pk_index = index
+            self.expanded[relation] = (fields, pk_index)
+
+    def values(self, queryset):
+        queryset = super().values(queryset.alias(**self.joins))
+        # Django joins non-null keys with INNER JOIN, which would drop rows
+        # whose related row is gone
+        query = queryset.query
+        for alias, join in list(query.alias_map.items()):
+            if getattr(join, 'filtered_relation', None) is not None and join.filtered_relation.alias in self.joins:
+                query.alias_map[alias] = join.promote()
+        return queryset
+
+    def serialize(self, rows):
+        rows = list(rows)
+        data = super().serialize(rows)
+        expanded = self.expanded.items()
+        for row, item in zip(rows, data):
+            for relation, (fields, pk_index) in expanded:
+                if row[pk_index] is None:
+                    item[relation] = None
+                    continue
+                summary = {}
+                for index, name, convert in fields:
+                    value = row[index]
+                    summary[name] = value if convert is None or value is None else convert(value)
+                item[relation] = summary
+        return data
+
+
+appointment_rows = RowSerializer(Appointment)
+barber_rows = RowSerializer(Barber)
+service_rows = RowSerializer(Service)
+queue_rows = RowSerializer(Queue, extra=['position'])
+
+# Archive tables have the same columns, so their rows serialize identically
+archived_appointment_rows = RowSerializer(ArchivedAppointment)
+archived_queue_rows = RowSerializer(ArchivedQueue, extra=['position'])
+
+# Appointments with barber and service summaries instead of their ids
+APPOINTMENT_EXPANSIONS = {
+    'barber': ['id', 'name'],
+    'service': ['id', 'service_name', 'service_duration', 'service_price'],
+}
+expanded_appointment_rows = ExpandedRowSerializer(Appointment, APPOINTMENT_EXPANSIONS)
+expanded_archived_appointment_rows = ExpandedRowSerializer(ArchivedAppointment, APPOINTMENT_EXPANSIONS)
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Customer, Barber, Service, Appointment, Queue
+from .models import Customer, Barber, BarberWorkingHours, CalendarException, Service, Appointment, Queue
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,3 +31,30 @@ class QueueSerializer(serializers.ModelSerializer):
     class Meta:
         model = Queue
         fields = '__all__'
+
+class BarberWorkingHoursSerializer(serializers.ModelSerializer):
+    weekday = serializers.IntegerField(min_value=0, max_value=6)
+
+    class Meta:
+        model = BarberWorkingHours
+        fields = ['weekday', 'start', 'end']
+
+    def validate(self, data):
+        if data['start'] >= data['end']:
+            raise serializers.ValidationError("start must be before end")
+        return data
+
+class CalendarExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CalendarException
+        fields = ['id', 'barber', 'day', 'start', 'end', 'note']
+        # Duplicates are caught by the database constraints
+        validators = []
+
+    def validate(self, data):
+        start, end = data.get('start'), data.get('end')
+        if (start is None) != (end is None):
+            raise serializers.ValidationError("Give both start and end, or neither for a day off")
+        if start is not None and start >= end:
+            raise serializers.ValidationError("start must be before end")
+        return data
@@ -0,0 +1,97 @@
+"""
+Versioned cache of the free slots of one barber-day.
+
+A cached answer of schedule/<barber_id>/<date>/ depends on the barber's
+bookings that day, the working calendar and the service durations, so its
+key holds the current version of each: the barber-day's own version, bumped
+by every appointment write touching that barber and day (invalidate()),
+the working calendar's and the service catalog's. A write moves to new
+versions once it commits, before its response is sent, so a client never
+reads slots older than its own booking and no key is ever deleted.
+
+Cache misses are filled from 'default': a payload built from a lagging
+replica would be stored under the new version and served until the next
+write.
+"""
+import time
+from django.conf import settings
+from django.db import transaction
+from . import catalog_cache, working_calendar
+from .catalog_cache import get_cache, make_payload
+
+SLOTS_TIMEOUT = 60 * 60
+
+
+def version_key(barber_id, day):
+    return f"slots:{barber_id}:{day.isoformat()}:version"
+
+
+def version_keys(barber_id, day):
+    return [version_key(barber_id, day), working_calendar.VERSION_KEY, catalog_cache.version_key('services')]
+
+
+def payload_key(barber_id, day, service_id, versions):
+    return f"slots:{barber_id}:{day.isoformat()}:{service_id or '-'}:" + ":".join(str(v) for v in versions)
+
+
+def get_timeout():
+    return getattr(settings, 'SLOT_CACHE_TIMEOUT', SLOTS_TIMEOUT)
+
+
+def get_versions(barber_id, day):
+    """
+    Current versions the barber-day's slots depend on, read in one round trip.
+    """
+    cache = get_cache()
+    keys = version_keys(barber_id, day)
+    found = cache.get_many(keys)
+    return [
+        found[key] if key in found else cache.get_or_set(key, time.time_ns(), timeout=None)
+        for key in keys
+    ]
+
+
+def get_payload(barber_id, day, service_id, build):
+    """
+    Returns (data, etag) of the barber-day's free slots (for service_id, or
+    one slot), calling build() only when the current versions aren't cached
+    yet. Exceptions raised by build() are passed on and nothing is cached.
+    """
+    cache = get_cache()
+    key = payload_key(barber_id, day, service_id, get_versions(barber_id, day))
+    payload = cache.get(key)
+    if payload is None:
+        payload = make_payload(build())
+        cache.set(key, payload, timeout=get_timeout())
+    return payload
+
+
+async def aget_payload(barber_id, day, service_id, abuild):
+    """
+    Async get_payload, for async views; abuild is a coroutine function.
+    """
+    cache = get_cache()
+    keys = version_keys(barber_id, day)
+    found = await cache.aget_many(keys)
+    versions = [
+        found[key] if key in found else await cache.aget_or_set(key, time.time_ns(), timeout=None)
+        for key in keys
+    ]
+    key = payload_key(barber_id, day, service_id, versions)
+    payload = await cache.aget(key)
+    if payload is None:
+        payload = make_payload(await abuild())
+        await cache.aset(key, payload, timeout=get_timeout())
+    return payload
+
+
+def invalidate(keys):
+    """
+    Moves the (barber_id, day) pairs' slots to new versions once the current
+    transaction commits. Call it from every write that changes appointments.
+    """
+    keys = set(keys)
+    if keys:
+        transaction.on_commit(
+            lambda: get_cache().set_many({version_key(*key): time.time_ns() for key in keys}, timeout=None)
+        )
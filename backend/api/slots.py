@@ -0,0 +1,125 @@
+"""
+Slot availability engine.
+
+A barber's working day is compiled once into a DaySchedule: the slot start
+times as minute offsets from midnight, one bit per slot. Booked appointments
+are intervals [start, start + duration) that block every slot they overlap;
+free start times for a service are found with bit operations, and minutes are
+only turned into "HH:MM" strings for the response.
+"""
+from bisect import bisect_left
+from functools import lru_cache
+
+
+def to_minutes(value):
+    """
+    Minutes since midnight of a time or datetime.
+    """
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class BookedIntervals:
+    """
+    Sorted, merged booked intervals of one barber-day, for overlap checks.
+    """
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, intervals):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def overlaps(self, start, end):
+        # Only the last interval starting before 'end' can reach past 'start'
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
+
+
+class DaySchedule:
+    """
+    Slot layout of one working day: slot i covers
+    [offsets[i], offsets[i] + slot_duration) and is bit i of a mask.
+    """
+    __slots__ = ('start_minute', 'end_minute', 'step', 'offsets', 'full_mask', 'labels')
+
+    def __init__(self, start_minute, end_minute, slot_duration):
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+        self.step = max(slot_duration, 1)
+        self.offsets = tuple(range(start_minute, end_minute, self.step))
+        self.full_mask = (1 << len(self.offsets)) - 1
+        self.labels = tuple(format_minutes(minute) for minute in self.offsets)
+
+    def mask_overlapping(self, intervals):
+        """
+        Bitmask of the slots overlapping any of the (start, end) minute intervals.
+        """
+        mask = 0
+        count = len(self.offsets)
+        for start, end in intervals:
+            first = max(0, (start - self.start_minute) // self.step)
+            # Ceiling division: the first slot starting at or after 'end'
+            last = min(count, -((self.start_minute - end) // self.step))
+            if last > first:
+                mask |= ((1 << (last - first)) - 1) << first
+        return mask
+
+    def free_mask(self, booked_mask, duration=None):
+        """
+        Bitmask of the free slots. Given a duration in minutes, only the slots
+        where such a booking can start: every slot it covers is free and it
+        ends within working hours.
+        """
+        free = self.full_mask & ~booked_mask
+        if duration is None:
+            return free
+        fits = free
+        for shift in range(1, -(-duration // self.step)):
+            fits &= free >> shift
+        starts_in_hours = max(0, (self.end_minute - duration - self.start_minute) // self.step + 1)
+        return fits & ((1 << min(starts_in_hours, len(self.offsets))) - 1)
+
+    def iter_offsets(self, mask):
+        """
+        Minute offsets of the slots set in mask, in time order.
+        """
+        offsets = self.offsets
+        while mask:
+            low = mask & -mask
+            yield offsets[low.bit_length() - 1]
+            mask ^= low
+
+    def labels_for(self, mask):
+        """
+        "HH:MM" start times of the slots set in mask, in time order.
+        """
+        labels = self.labels
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(labels[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+
+@lru_cache(maxsize=256)
+def get_day_schedule(start_minute, end_minute, slot_duration):
+    return DaySchedule(start_minute, end_minute, slot_duration)
+
+
+def booking_interval(appointment_time, service_duration, slot_duration):
+    """
+    (start, end) minutes a booking occupies; bookings without a service
+    take one slot.
+    """
+    start = to_minutes(appointment_time)
+    return start, start + (service_duration or slot_duration)
@@ -0,0 +1,114 @@
+"""
+In-process per-route request statistics collected by RequestStatsMiddleware.
+
+Each worker process keeps its own registry, so the statistics describe the
+process that answers the request; both outputs carry its pid.
+"""
+import os
+import threading
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the wall-time histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteStats:
+    __slots__ = ('count', 'duration_sum', 'buckets', 'db_queries', 'db_duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration_sum = 0.0
+        # One slot per bucket plus the +Inf overflow; not cumulative
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.db_queries = 0
+        self.db_duration = 0.0
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avgMs": round(self.duration_sum / self.count * 1000, 3) if self.count else 0,
+            "p50Ms": self.quantile_ms(0.5),
+            "p95Ms": self.quantile_ms(0.95),
+            "p99Ms": self.quantile_ms(0.99),
+            "dbQueriesPerRequest": round(self.db_queries / self.count, 2) if self.count else 0,
+            "dbMsPerRequest": round(self.db_duration / self.count * 1000, 3) if self.count else 0,
+        }
+
+    def quantile_ms(self, q):
+        """
+        Upper bound of the histogram bucket holding the q-quantile (None past the last bucket).
+        """
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(DURATION_BUCKETS, self.buckets):
+            seen += count
+            if seen >= target and count:
+                return bound * 1000
+        return None
+
+
+class StatsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, method, route, duration, db_queries, db_duration):
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[method, route] = RouteStats()
+            stats.count += 1
+            stats.duration_sum += duration
+            stats.buckets[bisect_left(DURATION_BUCKETS, duration)] += 1
+            stats.db_queries += db_queries
+            stats.db_duration += db_duration
+
+    def snapshot(self):
+        with self._lock:
+            routes = {
+                f"{method} {route}": stats.as_dict()
+                for (method, route), stats in sorted(self._routes.items())
+            }
+        return {"pid": os.getpid(), "routes": routes}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render_prometheus(self):
+        """
+        Prometheus text exposition format of the sampled requests, labelled
+        with this process's pid.
+        """
+        lines = [
+            "# HELP barberqueue_request_duration_seconds Wall time of sampled API requests.",
+            "# TYPE barberqueue_request_duration_seconds histogram",
+        ]
+        counters = []
+        pid = os.getpid()
+        with self._lock:
+            routes = sorted(self._routes.items())
+            for (method, route), stats in routes:
+                labels = f'pid="{pid}",method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f'barberqueue_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'barberqueue_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+                lines.append(f'barberqueue_request_duration_seconds_sum{{{labels}}} {stats.duration_sum}')
+                lines.append(f'barberqueue_request_duration_seconds_count{{{labels}}} {stats.count}')
+                counters.append((labels, stats.db_queries, stats.db_duration))
+        lines += [
+            "# HELP barberqueue_db_queries_total SQL queries run by sampled API requests.",
+            "# TYPE barberqueue_db_queries_total counter",
+        ]
+        lines += [f"barberqueue_db_queries_total{{{labels}}} {queries}" for labels, queries, _ in counters]
+        lines += [
+            "# HELP barberqueue_db_duration_seconds_total Time spent in SQL by sampled API requests.",
+            "# TYPE barberqueue_db_duration_seconds_total counter",
+        ]
+        lines += [f"barberqueue_db_duration_seconds_total{{{labels}}} {duration}" for labels, _, duration in counters]
+        return "\n".join(lines) + "\n"
+
+
+registry = StatsRegistry()
@@ -0,0 +1,106 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import Appointment, AppointmentBarberDayCounter, AppointmentDayCounter, Barber
+from api.positions import rebuild_positions
+from api.working_calendar import EVERY_DAY
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AdminPositionTests(TestCase):
+    """
+    Appointment and barber changes made in the admin leave positions and
+    counters as a full rebuild would.
+    """
+
+    def setUp(self):
+        self.day = date.today() + timedelta(days=30)
+        self.barbers = [
+            Barber.objects.create(
+                name=f"Admin check {i}", working_hours_start=time(9), working_hours_end=time(17), available_days=EVERY_DAY
+            )
+            for i in range(2)
+        ]
+        client = APIClient()
+        self.ids = []
+        for hour, barber in zip(range(9, 15), self.barbers * 3):
+            response = client.post('/api/appointments/', {
+                "customerName": "Admin check", "customerEmail": "admin@example.com",
+                "appointmentTime": f"{self.day}T{hour:02d}:00:00", "barberId": barber.id, "service": 0
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.ids.append(response.data['id'])
+        self.request = RequestFactory().post('/admin/')
+        self.request.user = User.objects.create_superuser(username="admin-check")
+
+    def model_admin(self, model):
+        return admin.site._registry[model]
+
+    def snapshot(self):
+        return (
+            sorted(Appointment.objects.filter(status='pending').values_list('id', 'position')),
+            sorted(AppointmentDayCounter.objects.filter(pending__gt=0).values_list('day', 'pending')),
+            sorted(AppointmentBarberDayCounter.objects.filter(pending__gt=0).values_list('barber_id', 'day', 'pending')),
+        )
+
+    def assert_consistent(self):
+        maintained = self.snapshot()
+        self.assertEqual(rebuild_positions(), 0)
+        self.assertEqual(self.snapshot(), maintained)
+
+    def save(self, appointment_id, **changes):
+        appointment = Appointment.objects.get(id=appointment_id)
+        for field, value in changes.items():
+            setattr(appointment, field, value)
+        self.model_admin(Appointment).save_model(self.request, appointment, None, True)
+
+    def test_appointment_edits(self):
+        moved_day = self.day + timedelta(days=1)
+        edits = [
+            ("complete", self.ids[0], {'status': 'completed'}),
+            ("back to pending", self.ids[0], {'status': 'pending'}),
+            ("other barber", self.ids[1], {'barber': self.barbers[0]}),
+            ("other date", self.ids[2], {
+                'appointment_date': moved_day,
+                'appointment_time': datetime.combine(moved_day, time(9), tzinfo=dt_timezone.utc),
+            }),
+            ("cancel", self.ids[3], {'status': 'canceled'}),
+        ]
+        for label, appointment_id, changes in edits:
+            with self.subTest(label):
+                self.save(appointment_id, **changes)
+                self.assert_consistent()
+
+        appointment = Appointment.objects.get(id=self.ids[2])
+        self.assertEqual((appointment.appointment_date, appointment.position), (moved_day, 1))
+
+    def test_appointment_added(self):
+        appointment = Appointment(
+            customer_name="Admin check", customer_email="admin@example.com", barber=self.barbers[0],
+            appointment_time=datetime.combine(self.day, time(16), tzinfo=dt_timezone.utc), appointment_date=self.day
+        )
+        self.model_admin(Appointment).save_model(self.request, appointment, None, False)
+        self.assertEqual(appointment.position, len(self.ids) + 1)
+        self.assert_consistent()
+
+    def test_appointment_deletes(self):
+        appointment_admin = self.model_admin(Appointment)
+        appointment_admin.delete_model(self.request, Appointment.objects.get(id=self.ids[0]))
+        self.assert_consistent()
+        appointment_admin.delete_queryset(self.request, Appointment.objects.filter(id__in=self.ids[2:4]))
+        self.assert_consistent()
+        self.assertEqual(AppointmentDayCounter.objects.get(day=self.day).pending, len(self.ids) - 3)
+
+    def test_barber_deletes(self):
+        barber_admin = self.model_admin(Barber)
+        barber_admin.delete_model(self.request, self.barbers[0])
+        self.assert_consistent()
+        self.assertEqual(
+            sorted(Appointment.objects.values_list('position', flat=True)), list(range(1, len(self.ids) // 2 + 1))
+        )
+        barber_admin.delete_queryset(self.request, Barber.objects.filter(id=self.barbers[1].id))
+        self.assert_consistent()
+        self.assertFalse(AppointmentDayCounter.objects.filter(pending__gt=0).exists())
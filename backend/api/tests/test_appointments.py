@@ -0,0 +1,85 @@
+from datetime import date, time, timedelta
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import Appointment, Barber, Service
+from api.working_calendar import EVERY_DAY, WEEKDAYS
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BookingRulesTests(TestCase):
+    """
+    Bookings and reschedules must fit the barber's working hours and must
+    not overlap any slot another booking's service covers.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.day = date.today() + timedelta(days=30)
+        self.barber = Barber.objects.create(
+            name="Rules check", working_hours_start=time(9), working_hours_end=time(12), slot_duration=30,
+            available_days=EVERY_DAY
+        )
+        self.service = Service.objects.create(service_name="Long cut", service_duration=90)
+        self.client = APIClient()
+
+    def book(self, at, service=0, barber=None):
+        return self.client.post('/api/appointments/', {
+            "customerName": "Rules check", "customerEmail": "rules@example.com",
+            "appointmentTime": f"{self.day}T{at}:00", "barberId": (barber or self.barber).id, "service": service
+        }, format='json')
+
+    def reschedule(self, appointment_id, at):
+        return self.client.post(
+            f'/api/appointments/reschedule/{appointment_id}/', {"newAppointmentTime": f"{self.day}T{at}:00"},
+            format='json'
+        )
+
+    def test_long_service_blocks_following_slots(self):
+        long_cut = self.book("09:00", self.service.id)
+        self.assertEqual(long_cut.status_code, 201)
+        for at, expected in [("09:30", 409), ("10:00", 409), ("10:30", 201)]:
+            with self.subTest(at):
+                self.assertEqual(self.book(at).status_code, expected)
+        short = Appointment.objects.get(appointment_time__hour=10)
+
+        # Reschedules are checked the same way, in both directions
+        self.assertEqual(self.reschedule(short.id, "10:00").status_code, 409)
+        self.assertEqual(self.reschedule(long_cut.data['id'], "09:30").status_code, 409)
+        self.assertEqual(self.reschedule(short.id, "11:00").status_code, 200)
+        self.assertEqual(self.reschedule(long_cut.data['id'], "09:30").status_code, 200)
+
+    def test_working_hours(self):
+        off_day = Barber.objects.create(
+            name="Day off", working_hours_start=time(9), working_hours_end=time(12),
+            available_days=WEEKDAYS[(self.day.weekday() + 1) % 7]
+        )
+        for label, response, error in [
+            ("before opening", self.book("08:30"), "Barber is not working at this time"),
+            ("at closing", self.book("12:00"), "Barber is not working at this time"),
+            ("runs past closing", self.book("11:00", self.service.id), "Barber is not working at this time"),
+            ("day off", self.book("09:00", barber=off_day), "Barber is not working on this day"),
+        ]:
+            with self.subTest(label):
+                self.assertEqual((response.status_code, response.data['error']), (400, error))
+        self.assertFalse(Appointment.objects.exists())
+
+        booked = self.book("10:30", self.service.id)
+        self.assertEqual(booked.status_code, 201)
+        for at in ("08:00", "11:00"):
+            with self.subTest(reschedule=at):
+                response = self.reschedule(booked.data['id'], at)
+                self.assertEqual((response.status_code, response.data['error']), (400, "Barber is not working at this time"))
+        self.assertEqual(Appointment.objects.get().appointment_time.hour, 10)
+
+    def test_unknown_service(self):
+        for service in (999999, "cut", [1]):
+            with self.subTest(service=service):
+                response = self.book("09:00", service)
+                self.assertEqual((response.status_code, response.data['error']), (404, "Service not found"))
+        self.assertFalse(Appointment.objects.exists())
+
+        # No service books a single slot
+        self.assertEqual(self.book("09:00", None).status_code, 201)
+        self.assertEqual(self.book("09:30", "").status_code, 201)
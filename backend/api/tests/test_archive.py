@@ -0,0 +1,79 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from api.archive import archive_batch, archive_cutoff
+from api.models import Appointment, ArchivedAppointment, ArchivedQueue, Barber, Queue
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES, ARCHIVE_AFTER_DAYS=180)
+class ArchiveTests(TestCase):
+    """
+    archive_records moves finished rows past retention into the archive
+    tables or into per-batch files, and leaves everything else live.
+    """
+
+    def setUp(self):
+        barber = Barber.objects.create(name="Archive check")
+        old, recent = date.today() - timedelta(days=400), date.today() - timedelta(days=10)
+        self.expired = []
+        for i, (day, status) in enumerate([
+            (old, 'completed'), (old, 'canceled'), (old, 'completed'), (old, 'pending'), (recent, 'completed'),
+        ]):
+            appointment = Appointment.objects.create(
+                customer_name=f"Archive check {i}", customer_email="archive@example.com", barber=barber,
+                appointment_time=datetime.combine(day, time(9 + i), tzinfo=dt_timezone.utc), appointment_date=day,
+                status=status
+            )
+            if day == old and status != 'pending':
+                self.expired.append(appointment.id)
+        self.live = set(Appointment.objects.exclude(id__in=self.expired).values_list('id', flat=True))
+
+        entries = [Queue.objects.create(name=f"Archive check {i}") for i in range(3)]
+        Queue.objects.filter(id__in=[entries[0].id, entries[1].id]).update(status='completed', ticket_day=old)
+        self.expired_entries = [entries[0].id, entries[1].id]
+
+    def archive(self, **options):
+        call_command('archive_records', batch_size=2, stdout=StringIO(), **options)
+
+    def test_archive_tables(self):
+        self.archive()
+        self.assertEqual(set(Appointment.objects.values_list('id', flat=True)), self.live)
+        self.assertEqual(sorted(ArchivedAppointment.objects.values_list('id', flat=True)), self.expired)
+        self.assertEqual(sorted(ArchivedQueue.objects.values_list('id', flat=True)), self.expired_entries)
+        self.assertEqual(Queue.objects.count(), 1)
+
+        # Nothing is left to move on a second run
+        self.archive()
+        self.assertEqual(ArchivedAppointment.objects.count(), len(self.expired))
+
+    def test_archive_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.archive(to_dir=directory, only=['appointments'])
+            names = sorted(os.listdir(directory))
+            self.assertEqual(names, [
+                f"appointments-{self.expired[0]:012d}-{self.expired[1]:012d}.ndjson.gz",
+                f"appointments-{self.expired[2]:012d}-{self.expired[2]:012d}.ndjson.gz",
+            ])
+            archived = []
+            for name in names:
+                with gzip.open(os.path.join(directory, name), 'rt') as archive_file:
+                    archived += [json.loads(line)['id'] for line in archive_file]
+        self.assertEqual(archived, self.expired)
+        self.assertEqual(set(Appointment.objects.values_list('id', flat=True)), self.live)
+        self.assertFalse(ArchivedAppointment.objects.exists())
+        self.assertEqual(Queue.objects.count(), 3)
+
+    def test_rows_stay_live_until_their_file_is_in_place(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch('api.archive.os.replace', side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    archive_batch('appointments', archive_cutoff(), 2, directory)
+            self.assertEqual(os.listdir(directory), [])
+        self.assertEqual(Appointment.objects.filter(id__in=self.expired).count(), len(self.expired))
@@ -0,0 +1,82 @@
+import json
+from datetime import date, time, timedelta
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from api import views_async, views_barber, views_queue, views_schedule, views_service
+from api.models import Barber, Queue, Service
+from api.working_calendar import EVERY_DAY
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AsyncViewTests(TestCase):
+    """
+    The async read views answer every request as their sync counterparts
+    do, including authentication failures and errors.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.factory = RequestFactory()
+        self.day = date.today() + timedelta(days=30)
+        self.barber = Barber.objects.create(
+            name="Async check", working_hours_start=time(9), working_hours_end=time(11), available_days=EVERY_DAY
+        )
+        self.service = Service.objects.create(service_name="Async check", service_duration=60)
+        self.entries = [Queue.objects.create(name=f"Async check {i}") for i in range(3)]
+        self.token = str(AccessToken.for_user(User.objects.create_user(username="async-check")))
+
+    def views(self):
+        """
+        (sync view, async view, path, URL kwargs) of each async endpoint.
+        """
+        barber, day = self.barber.id, self.day.isoformat()
+        slots = {'barber_id': barber, 'date_str': day}
+        return [
+            (views_queue.get_queue_position_by_id, views_async.get_queue_position_by_id,
+             f"/api/queue/search/{self.entries[1].id}/", {'queueid': self.entries[1].id}),
+            (views_queue.get_queue_position_by_id, views_async.get_queue_position_by_id,
+             "/api/queue/search/999999/", {'queueid': 999999}),
+            (views_queue.get_all_queue_entries, views_async.get_all_queue_entries, "/api/queue/list/", {}),
+            (views_queue.get_all_queue_entries, views_async.get_all_queue_entries, "/api/queue/list/?limit=2", {}),
+            (views_queue.get_all_queue_entries, views_async.get_all_queue_entries, "/api/queue/list/?status=x", {}),
+            (views_schedule.get_available_slots, views_async.get_available_slots, f"/api/schedule/{barber}/{day}/", slots),
+            (views_schedule.get_available_slots, views_async.get_available_slots,
+             f"/api/schedule/{barber}/{day}/?service={self.service.id}", slots),
+            (views_schedule.get_available_slots, views_async.get_available_slots,
+             f"/api/schedule/{barber}/{day}/?service=999999", slots),
+            (views_schedule.get_available_slots, views_async.get_available_slots,
+             f"/api/schedule/999999/{day}/", {'barber_id': 999999, 'date_str': day}),
+            (views_schedule.get_available_slots, views_async.get_available_slots,
+             f"/api/schedule/{barber}/not-a-date/", {'barber_id': barber, 'date_str': 'not-a-date'}),
+            (views_barber.get_barbers, views_async.get_barbers, "/api/barbers/list/", {}),
+            (views_service.get_services, views_async.get_services, "/api/services/list/", {}),
+        ]
+
+    def answer(self, view, request, kwargs):
+        if iscoroutinefunction(view):
+            response = async_to_sync(view)(request, **kwargs)
+        else:
+            response = view(request, **kwargs).render()
+        body = json.loads(response.content) if response.content else None
+        headers = {name: response.get(name) for name in ('WWW-Authenticate', 'X-Next-Cursor', 'ETag')}
+        return response.status_code, body, headers
+
+    def test_same_responses(self):
+        for method, authorization in [
+            ('get', None), ('get', f"Bearer {self.token}"), ('get', "Bearer not-a-token"), ('post', None),
+        ]:
+            for sync_view, async_view, path, kwargs in self.views():
+                with self.subTest(path, method=method, authorization=authorization):
+                    headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+                    expected = self.answer(sync_view, getattr(self.factory, method)(path, **headers), kwargs)
+                    answered = self.answer(async_view, getattr(self.factory, method)(path, **headers), kwargs)
+                    self.assertEqual(answered, expected)
+
+    def test_authenticated_user(self):
+        request = self.factory.get("/api/barbers/list/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        async_to_sync(views_async.get_barbers)(request)
+        self.assertEqual(request.user.username, "async-check")
@@ -0,0 +1,69 @@
+import random
+from datetime import date, datetime, time, timedelta
+from rest_framework.test import APIClient
+from api.models import Appointment, AppointmentBarberDayCounter, AppointmentDayCounter, Barber
+from api.working_calendar import EVERY_DAY
+from .utils import ConcurrentTestCase
+
+
+class ConcurrentBookingTests(ConcurrentTestCase):
+    """
+    Concurrent bookings, then concurrent cancellations, at one barber-day:
+    no slot is double-booked and positions and counters stay gap-free.
+    """
+    bookings = 300
+    slots = 100
+    cancels = 25
+
+    def setUp(self):
+        super().setUp()
+        self.day = date.today() + timedelta(days=30)
+        self.barber = Barber.objects.create(
+            name="Stress test barber",
+            working_hours_start=time(0, 0),
+            working_hours_end=time(23, 55),
+            slot_duration=5,
+            available_days=EVERY_DAY
+        )
+
+    def book(self, appointment_time):
+        response = APIClient().post('/api/appointments/', {
+            "customerName": "Stress Test",
+            "customerEmail": "stress@example.com",
+            "appointmentTime": appointment_time,
+            "barberId": self.barber.id,
+            "service": 0
+        }, format='json')
+        return response.status_code
+
+    def cancel(self, appointment_id):
+        return APIClient().post(f'/api/appointments/cancel/{appointment_id}/').status_code
+
+    def assert_gap_free(self, pending):
+        positions = sorted(
+            Appointment.objects.filter(barber=self.barber, status='pending').values_list('position', flat=True)
+        )
+        self.assertEqual(positions, list(range(1, pending + 1)))
+        self.assertEqual(AppointmentDayCounter.objects.get(day=self.day).pending, pending)
+        self.assertEqual(AppointmentBarberDayCounter.objects.get(barber=self.barber, day=self.day).pending, pending)
+
+    def test_concurrent_bookings_and_cancellations(self):
+        start = datetime.combine(self.day, time(0, 0))
+        times = [
+            (start + timedelta(minutes=5 * random.randrange(self.slots))).isoformat()
+            for _ in range(self.bookings)
+        ]
+        codes = self.run_concurrently(self.book, times)
+
+        created = codes.count(201)
+        self.assertEqual(created + codes.count(409), len(codes), f"Unexpected status codes: {sorted(set(codes))}")
+        self.assertEqual(created, len(set(times)))
+        booked_times = list(Appointment.objects.filter(barber=self.barber).values_list('appointment_time', flat=True))
+        self.assertEqual(len(booked_times), created)
+        self.assertEqual(len(set(booked_times)), len(booked_times), "A start time was booked more than once")
+        self.assert_gap_free(created)
+
+        booked_ids = list(Appointment.objects.filter(barber=self.barber).values_list('id', flat=True))
+        cancel_ids = random.sample(booked_ids, min(self.cancels, len(booked_ids)))
+        self.assertEqual(self.run_concurrently(self.cancel, cancel_ids), [200] * len(cancel_ids))
+        self.assert_gap_free(created - len(cancel_ids))
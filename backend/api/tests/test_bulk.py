@@ -0,0 +1,87 @@
+from datetime import date, time, timedelta
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.bulk import MAX_BULK_IDS
+from api.models import Appointment, AppointmentBarberDayCounter, AppointmentDayCounter, Barber
+from api.positions import rebuild_positions
+from api.working_calendar import EVERY_DAY
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BulkStatusTests(TestCase):
+    """
+    The bulk complete/cancel endpoints answer per id, cap the ids per
+    request, and free slots and positions like single cancellations do.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.day = date.today() + timedelta(days=30)
+        self.barber = Barber.objects.create(
+            name="Bulk check", working_hours_start=time(9), working_hours_end=time(11), slot_duration=30,
+            available_days=EVERY_DAY
+        )
+        self.client = APIClient()
+        self.appointments = [self.book(at) for at in ("09:00", "09:30", "10:00")]
+        self.entries = [
+            self.client.post('/api/queue/', {"name": f"Bulk check {i}"}, format='json').data['id'] for i in range(3)
+        ]
+
+    def book(self, at):
+        response = self.client.post('/api/appointments/', {
+            "customerName": "Bulk check", "customerEmail": "bulk@example.com",
+            "appointmentTime": f"{self.day}T{at}:00", "barberId": self.barber.id, "service": 0
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def bulk(self, path, ids):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(path, {"ids": ids}, format='json')
+
+    def test_found_and_not_found(self):
+        for path, found in [
+            ('/api/appointments/bulk/complete/', self.appointments[0]),
+            ('/api/queue/bulk/complete/', self.entries[0]),
+        ]:
+            with self.subTest(path):
+                response = self.bulk(path, [999999, found, 999999])
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data['results'], [
+                    {"id": 999999, "status": "not_found"}, {"id": found, "status": "completed"},
+                ])
+        self.assertEqual(Appointment.objects.get(id=self.appointments[0]).status, 'completed')
+        self.assertEqual(Appointment.objects.filter(status='pending').count(), 2)
+
+    def test_bad_requests(self):
+        most = list(range(1, MAX_BULK_IDS + 1))
+        for path in ('/api/appointments/bulk/cancel/', '/api/queue/bulk/cancel/'):
+            with self.subTest(path):
+                self.assertEqual(self.bulk(path, most).status_code, 200)
+                response = self.bulk(path, most + [MAX_BULK_IDS + 1])
+                self.assertEqual(
+                    (response.status_code, response.data['error']), (400, f"At most {MAX_BULK_IDS} ids per request")
+                )
+                for ids in ([], "1,2", [1, "2"], [True]):
+                    self.assertEqual(self.bulk(path, ids).status_code, 400)
+                self.assertEqual(self.bulk(path.replace('cancel', 'archive'), [1]).status_code, 404)
+
+    def test_cancel_frees_slots_and_positions(self):
+        slots = f'/api/schedule/{self.barber.id}/{self.day}/'
+        self.assertEqual(self.client.get(slots).data['availableSlots'], ["10:30"])
+
+        self.bulk('/api/appointments/bulk/cancel/', self.appointments[:2])
+        self.assertEqual(self.client.get(slots).data['availableSlots'], ["09:00", "09:30", "10:30"])
+        self.assertEqual(Appointment.objects.get(id=self.appointments[2]).position, 1)
+        self.assertEqual(AppointmentDayCounter.objects.get(day=self.day).pending, 1)
+        self.assertEqual(AppointmentBarberDayCounter.objects.get(barber=self.barber, day=self.day).pending, 1)
+        self.assertEqual(rebuild_positions(), 0)
+
+        # The freed slot can be booked again, at the back of the queue
+        rebooked = self.book("09:00")
+        self.assertEqual(Appointment.objects.get(id=rebooked).position, 2)
+
+        self.bulk('/api/queue/bulk/cancel/', self.entries[:2])
+        self.assertEqual(self.client.get(f'/api/queue/search/{self.entries[2]}/').data['position'], 1)
@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import Barber
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class WorkingHoursTests(TestCase):
+    """
+    Weekly hours keep the Barber fields they replaced summarizing them.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.barber = Barber.objects.create(name="Calendar check")
+        self.admin = User.objects.create_user(username="calendar-admin", is_staff=True)
+        self.client = APIClient()
+
+    def test_set_working_hours_updates_the_barber_fields(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.put(f'/api/barbers/{self.barber.id}/calendar/hours/', [
+            {"weekday": 1, "start": "10:00", "end": "18:00"},
+            {"weekday": 5, "start": "08:00", "end": "12:00"},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+
+        listed = next(barber for barber in self.client.get('/api/barbers/list/').json() if barber['id'] == self.barber.id)
+        self.assertEqual(
+            (listed['available_days'], listed['working_hours_start'], listed['working_hours_end']),
+            ("Tuesday,Saturday", "08:00:00", "18:00:00")
+        )
+
+    def test_admin_makes_the_replaced_fields_read_only(self):
+        self.admin.is_superuser = True
+        self.admin.save()
+        self.client.force_login(self.admin)
+        path = f'/admin/api/barber/{self.barber.id}/change/'
+        self.assertContains(self.client.get(path), 'name="available_days"')
+
+        self.barber.working_hours.create(weekday=0, start="09:00", end="17:00")
+        self.assertNotContains(self.client.get(path), 'name="available_days"')
@@ -0,0 +1,81 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from api.models import Barber, Service
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES, CATALOG_CACHE_ALIAS='default')
+class CatalogCacheTests(TestCase):
+    """
+    The barber and service catalogs answer conditional GETs from the cache,
+    and every API and admin write serves the next GET a new version.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.barber = Barber.objects.create(name="Catalog check")
+        self.service = Service.objects.create(service_name="Catalog check", service_duration=30)
+        self.client = APIClient()
+        self.request = RequestFactory().post('/admin/')
+        self.request.user = User.objects.create_superuser(username="catalog-admin")
+
+    def names(self, path):
+        key = 'name' if 'barbers' in path else 'service_name'
+        return [row[key] for row in self.client.get(path).json()]
+
+    def test_conditional_gets(self):
+        for path in ('/api/barbers/list/', '/api/services/list/'):
+            with self.subTest(path):
+                first = self.client.get(path)
+                self.assertEqual(first.status_code, 200)
+                self.assertEqual(first['Cache-Control'], 'no-cache')
+                with CaptureQueriesContext(connection) as captured:
+                    again = self.client.get(path, HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual((again.status_code, again.content, len(captured.captured_queries)), (304, b'', 0))
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def assert_changed(self, path, write):
+        """
+        Runs write() and checks that the catalog's ETag changed with it.
+        """
+        etag = self.client.get(path)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def rename_in_admin(self, obj, field, value):
+        setattr(obj, field, value)
+        admin.site._registry[type(obj)].save_model(self.request, obj, None, True)
+
+    def test_barber_writes(self):
+        barber_admin = admin.site._registry[Barber]
+        writes = [
+            ("api add", lambda: self.client.post('/api/barbers/add/', {"name": "Added"}, format='json')),
+            ("admin rename", lambda: self.rename_in_admin(self.barber, 'name', "Renamed")),
+            ("admin add", lambda: barber_admin.save_model(self.request, Barber(name="Admin added"), None, False)),
+            ("admin delete", lambda: barber_admin.delete_model(self.request, Barber.objects.get(name="Added"))),
+            ("admin bulk delete", lambda: barber_admin.delete_queryset(
+                self.request, Barber.objects.filter(name="Admin added"))),
+        ]
+        for label, write in writes:
+            with self.subTest(label):
+                self.assert_changed('/api/barbers/list/', write)
+        self.assertEqual(self.names('/api/barbers/list/'), ["Renamed"])
+
+    def test_service_writes(self):
+        writes = [
+            ("api update", lambda: self.client.put(
+                f'/api/services/update/{self.service.id}/', {"service_duration": 45}, format='json')),
+            ("admin rename", lambda: self.rename_in_admin(self.service, 'service_name', "Renamed")),
+        ]
+        for label, write in writes:
+            with self.subTest(label):
+                self.assert_changed('/api/services/list/', write)
+        self.assertEqual(self.names('/api/services/list/'), ["Renamed"])
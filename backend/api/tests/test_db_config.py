@@ -0,0 +1,62 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+from barberqueue.db_config import database_settings
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    """
+    database_settings maps the DB_* environment variables to DATABASES and
+    rejects values it can't read.
+    """
+
+    def test_defaults(self):
+        default = database_settings({})['default']
+        self.assertEqual((default['NAME'], default['HOST'], default['PORT']), ('barberqueue_db', 'localhost', '5432'))
+        self.assertEqual(default['CONN_MAX_AGE'], 60)
+        self.assertIs(default['CONN_HEALTH_CHECKS'], True)
+        self.assertEqual(default['OPTIONS'], {})
+        self.assertEqual(list(database_settings({})), ['default'])
+
+    def test_persistent_connections(self):
+        for environ, max_age, health_checks in [
+            ({'DB_CONN_MAX_AGE': '0'}, 0, True),
+            ({'DB_CONN_MAX_AGE': ' 300 ', 'DB_CONN_HEALTH_CHECKS': 'off'}, 300, False),
+            ({'DB_CONN_MAX_AGE': '', 'DB_CONN_HEALTH_CHECKS': 'No'}, 60, False),
+            ({'DB_CONN_HEALTH_CHECKS': 'YES'}, 60, True),
+        ]:
+            with self.subTest(environ):
+                default = database_settings(environ)['default']
+                self.assertEqual((default['CONN_MAX_AGE'], default['CONN_HEALTH_CHECKS']), (max_age, health_checks))
+
+    def test_pool(self):
+        default = database_settings({'DB_POOL': 'true', 'DB_CONN_MAX_AGE': '300'})['default']
+        self.assertEqual(default['OPTIONS'], {'pool': {'min_size': 2, 'max_size': 10, 'timeout': 10}})
+        self.assertEqual(default['CONN_MAX_AGE'], 0)
+
+        default = database_settings({
+            'DB_POOL': '1', 'DB_POOL_MIN_SIZE': '4', 'DB_POOL_MAX_SIZE': '20', 'DB_POOL_TIMEOUT': '5',
+        })['default']
+        self.assertEqual(default['OPTIONS']['pool'], {'min_size': 4, 'max_size': 20, 'timeout': 5})
+
+        # Pool sizes are ignored without DB_POOL
+        self.assertEqual(database_settings({'DB_POOL': 'off', 'DB_POOL_MAX_SIZE': '20'})['default']['OPTIONS'], {})
+
+    def test_replica(self):
+        databases = database_settings({'DB_REPLICA_HOST': 'replica.internal', 'DB_POOL': 'on', 'DB_PORT': '6432'})
+        replica = databases['replica']
+        self.assertEqual((replica['HOST'], replica['PORT']), ('replica.internal', '6432'))
+        self.assertEqual(replica['TEST'], {'MIRROR': 'default'})
+        self.assertEqual(replica['OPTIONS'], databases['default']['OPTIONS'])
+        self.assertIsNot(replica['OPTIONS'], databases['default']['OPTIONS'])
+        self.assertEqual(database_settings({'DB_REPLICA_HOST': 'r', 'DB_REPLICA_PORT': '5433'})['replica']['PORT'], '5433')
+
+    def test_invalid_values(self):
+        for environ, message in [
+            ({'DB_CONN_MAX_AGE': 'forever'}, "DB_CONN_MAX_AGE must be an integer"),
+            ({'DB_CONN_HEALTH_CHECKS': 'maybe'}, "DB_CONN_HEALTH_CHECKS must be one of"),
+            ({'DB_POOL': '2'}, "DB_POOL must be one of"),
+            ({'DB_POOL': 'on', 'DB_POOL_TIMEOUT': '1.5'}, "DB_POOL_TIMEOUT must be an integer"),
+        ]:
+            with self.subTest(environ):
+                with self.assertRaisesMessage(ImproperlyConfigured, message):
+                    database_settings(environ)
@@ -0,0 +1,105 @@
+import io
+import json
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.imports import run_import
+from api.models import Appointment, AppointmentDayCounter, Barber, Service
+from .utils import TEST_CACHES
+
+
+def ndjson(records):
+    return io.BytesIO("".join(json.dumps(record) + "\n" for record in records).encode())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ImportTests(TestCase):
+    """
+    Imports report bad rows without stopping, resolve barbers and services
+    by id or name, and keep checking double bookings across chunks.
+    """
+
+    def setUp(self):
+        self.day = date.today() + timedelta(days=30)
+        self.barber = Barber.objects.create(name="Import check")
+        self.service = Service.objects.create(service_name="Import cut", service_duration=60)
+
+    def booking(self, hour, **fields):
+        return {
+            "customer_name": "Import check", "customer_email": "import@example.com",
+            "barber": self.barber.name, "appointment_time": f"{self.day}T{hour:02d}:00:00Z", **fields,
+        }
+
+    def test_row_errors(self):
+        stream = io.BytesIO(b"name,experience\nFirst,2\n,3\nThird,x\nFourth,\n")
+        report = run_import('barbers', stream, 'csv')
+        self.assertEqual((report['imported'], report['failed']), (2, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3])
+        self.assertIn('name', report['errors'][0]['errors'])
+        self.assertIn('experience', report['errors'][1]['errors'])
+        self.assertEqual(Barber.objects.get(name="Fourth").experience, 0)
+
+    def test_malformed_ndjson_lines_are_row_errors(self):
+        stream = io.BytesIO(b'{"name": "First"}\n{"name": \n\n["not an object"]\n{"name": "Last"}\n')
+        report = run_import('barbers', stream, 'ndjson', chunk_size=1)
+        self.assertEqual((report['imported'], report['failed']), (2, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3])
+        self.assertIn("Invalid JSON", report['errors'][0]['errors']['non_field_errors'][0])
+        self.assertNotIn('error', report)
+
+    def test_unreadable_input_keeps_earlier_chunks(self):
+        rows = "".join(f"Barber {i}\n" for i in range(500))
+        stream = io.BytesIO(b"name\n" + rows.encode() + b"\xff\xfe broken\n")
+        report = run_import('barbers', stream, 'csv', chunk_size=100)
+        self.assertIn("Could not read the csv input", report['error'])
+        self.assertEqual(report['imported'], Barber.objects.filter(name__startswith="Barber ").count())
+        self.assertGreater(report['imported'], 0)
+
+    def test_lookups_by_id_or_name(self):
+        report = run_import('appointments', ndjson([
+            self.booking(9, service=self.service.service_name),
+            self.booking(11, barber=self.barber.id, service=self.service.id),
+            self.booking(13, barber="Nobody"),
+            self.booking(14, service="Nothing"),
+        ]), 'ndjson')
+        self.assertEqual((report['imported'], report['failed']), (2, 2))
+        self.assertEqual(report['errors'][0]['errors'], {'barber': ['No barber matches "Nobody".']})
+        self.assertEqual(report['errors'][1]['errors'], {'service': ['No service matches "Nothing".']})
+        self.assertEqual(
+            set(Appointment.objects.values_list('barber_id', 'service_id')), {(self.barber.id, self.service.id)}
+        )
+
+    def test_chunks(self):
+        # The 60-minute service at 10:00 blocks 10:30, which comes in a later chunk
+        records = [self.booking(hour) for hour in (9, 11, 12)]
+        records += [self.booking(10, service=self.service.id), {"customer_name": "No barber"}]
+        records += [self.booking(10, appointment_time=f"{self.day}T10:30:00Z"), self.booking(15)]
+        report = run_import('appointments', ndjson(records), 'ndjson', chunk_size=2)
+        self.assertEqual((report['imported'], report['failed']), (5, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [5, 6])
+        self.assertEqual(report['errors'][1]['errors'], {"appointment_time": ["Barber is already booked at this time"]})
+
+        # Pending bookings are numbered in import order across chunks
+        positions = Appointment.objects.order_by('id').values_list('position', flat=True)
+        self.assertEqual(list(positions), [1, 2, 3, 4, 5])
+        self.assertEqual(AppointmentDayCounter.objects.get(day=self.day).pending, 5)
+
+    def test_dry_run(self):
+        report = run_import('appointments', ndjson([self.booking(9), self.booking(9)]), 'ndjson', dry_run=True)
+        self.assertEqual((report['imported'], report['failed']), (1, 1))
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_endpoint(self):
+        client = APIClient()
+        path = '/api/barbers/import/ndjson/'
+        body = b'{"name": "Over HTTP"}\n'
+        self.assertEqual(client.post(path, body, content_type='application/x-ndjson').status_code, 401)
+
+        client.force_authenticate(User.objects.create_user(username="import-admin", is_staff=True))
+        response = client.post(path, body, content_type='application/x-ndjson')
+        self.assertEqual((response.status_code, response.data['imported']), (200, 1))
+        response = client.post('/api/barbers/import/json/', b'{"name": "Not an array"}', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data['imported'], response.data['failed']), (0, 0))
+        self.assertIn("array of objects", response.data['error'])
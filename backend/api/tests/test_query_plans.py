@@ -0,0 +1,115 @@
+import re
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from api.models import Appointment, Barber, Queue, Service
+from api.working_calendar import EVERY_DAY, get_calendars
+from .utils import TEST_CACHES
+
+# Catalog listings return whole tables, so scanning them is expected
+CATALOG_TABLES = {'api_barber', 'api_service'}
+
+
+@override_settings(CACHES=TEST_CACHES, CATALOG_CACHE_ALIAS='default')
+class QueryPlanTests(TestCase):
+    """
+    Query-plan regression test for the hot endpoints: each must stay within
+    its query budget, and EXPLAIN must show no full table scan.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        if connection.vendor == 'postgresql':
+            # Tiny seeded tables would otherwise always be sequentially scanned
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        self.seeded = self.seed()
+
+    def seed(self):
+        day = date.today() + timedelta(days=30)
+        barbers = [
+            Barber.objects.create(
+                name=f"Plan check {i}", working_hours_start=time(9), working_hours_end=time(17), available_days=EVERY_DAY
+            )
+            for i in range(3)
+        ]
+        # Compiling the working calendars reads whole tables, once per calendar
+        # version rather than per request; keep it out of the budgets
+        get_calendars()
+        service = Service.objects.create(service_name="Plan check", service_duration=30)
+        for barber in barbers:
+            for slot in range(8):
+                appointment_time = datetime.combine(day, time(9 + slot), tzinfo=dt_timezone.utc)
+                appointment = Appointment.objects.create(
+                    customer_name="Plan check", customer_email="plan@example.com", barber=barber,
+                    service=service, appointment_time=appointment_time, appointment_date=day,
+                    status='pending' if slot % 2 else 'scheduled', position=slot
+                )
+        entries = [Queue.objects.create(name=f"Plan check {i}") for i in range(20)]
+        return {
+            'day': day.isoformat(), 'barber': barbers[0].id, 'service': service.id,
+            'entry': entries[-1].id, 'appointment': appointment.id,
+            'empty_day': (day + timedelta(days=1)).isoformat(),
+        }
+
+    def checks(self):
+        """
+        (label, method, path, data, query budget) for each hot endpoint, in
+        the order they are called.
+        """
+        seeded = self.seeded
+        day, barber, entry = seeded['day'], seeded['barber'], seeded['entry']
+        return [
+            ("queue position", 'get', f"/api/queue/search/{entry}/", None, 2),
+            ("queue list", 'get', "/api/queue/list/?status=pending&limit=5", None, 1),
+            ("queue check-in", 'post', "/api/queue/", {"name": "Plan check"}, 3),
+            ("available slots", 'get', f"/api/schedule/{barber}/{day}/", None, 2),
+            ("available slots (cached)", 'get', f"/api/schedule/{barber}/{day}/", None, 0),
+            ("available slots for a service", 'get', f"/api/schedule/{barber}/{day}/?service={seeded['service']}", None, 3),
+            ("availability search", 'get', f"/api/schedule/search/?start={day}&next=5", None, 2),
+            ("appointments by date", 'get', f"/api/appointments/{day}/", None, 1),
+            ("appointment list, expanded", 'get',
+             f"/api/appointments/list/?start={day}&end={day}&barber={barber}&expand=1&limit=5", None, 1),
+            ("book appointment", 'post', "/api/appointments/", {
+                "customerName": "Plan check", "customerEmail": "plan@example.com",
+                "appointmentTime": f"{day}T16:30:00", "barberId": barber, "service": seeded['service']
+            }, 8),
+            ("cancel appointment", 'post', f"/api/appointments/cancel/{seeded['appointment']}/", None, 7),
+            ("barber timetable", 'get', f"/api/schedule/{barber}/{day}/timetable/", None, 1),
+            ("barber timetable (first read)", 'get', f"/api/schedule/{barber}/{seeded['empty_day']}/timetable/", None, 4),
+            ("barber catalog (cold)", 'get', "/api/barbers/list/", None, 1),
+            ("barber catalog (warm)", 'get', "/api/barbers/list/", None, 0),
+            ("service catalog (cold)", 'get', "/api/services/list/", None, 1),
+            ("service catalog (warm)", 'get', "/api/services/list/", None, 0),
+        ]
+
+    def test_hot_endpoints(self):
+        client = APIClient()
+        for label, method, path, data, budget in self.checks():
+            with self.subTest(label):
+                with CaptureQueriesContext(connection) as captured:
+                    response = getattr(client, method)(path, data, format='json')
+                self.assertLess(response.status_code, 400, f"{path} returned {response.status_code}")
+
+                queries = [
+                    q['sql'] for q in captured.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))
+                ]
+                self.assertLessEqual(len(queries), budget, "\n".join(queries))
+                for sql in queries:
+                    scanned = [table for table in self.full_scans(sql) if table not in CATALOG_TABLES]
+                    self.assertEqual(scanned, [], f"full scan in {sql}")
+
+    def full_scans(self, sql):
+        if not sql.startswith('SELECT'):
+            return []
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plan = "\n".join(row[-1] for row in cursor.fetchall())
+                return re.findall(r'SCAN (api_\w+)(?! USING)', plan)
+            cursor.execute("EXPLAIN " + sql)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            return re.findall(r'Seq Scan on (api_\w+)', plan)
@@ -0,0 +1,71 @@
+import time
+from unittest import mock
+from rest_framework.test import APIClient
+from api import views_queue
+from api.models import Queue
+from .utils import ConcurrentTestCase
+
+
+class ConcurrentCheckInTests(ConcurrentTestCase):
+    """
+    Walk-ins checking in at the same time get unique, consecutive tickets
+    and positions that follow ticket order.
+    """
+    checkins = 120
+
+    def check_in(self, name):
+        response = APIClient().post('/api/queue/', {"name": name}, format='json')
+        return response.data if response.status_code == 201 else {}
+
+    def test_concurrent_check_ins(self):
+        results = self.run_concurrently(self.check_in, [f"Stress check-in {i}" for i in range(self.checkins)])
+        self.assertTrue(all(results), "Some check-ins failed")
+
+        results.sort(key=lambda result: result['ticket'])
+        tickets = [result['ticket'] for result in results]
+        self.assertEqual(tickets, list(range(tickets[0], tickets[0] + len(results))))
+
+        # Positions seen at check-in must rise with the ticket: a later ticket
+        # can never have been told it is ahead of an earlier one
+        positions = [result['position'] for result in results]
+        self.assertEqual(positions, sorted(set(positions)))
+
+
+class ConcurrentLeaveTests(ConcurrentTestCase):
+    """
+    Requests racing to take the same entry out of the queue publish 'left'
+    once, for the request that actually took it out.
+    """
+    requests = 16
+
+    def setUp(self):
+        super().setUp()
+        Queue.objects.create(name="Ahead")
+        self.entry = Queue.objects.create(name="Leaving")
+        patcher = mock.patch('api.views_queue.publish_queue_event')
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_left_once(self, codes):
+        self.assertEqual(set(codes), {200})
+        published = [call.args for call in self.publish.call_args_list if call.args[2]]
+        self.assertEqual(published, [('left', self.entry.id, 2)])
+
+    def test_concurrent_completes(self):
+        def slow_pending_ahead_of(queue_entry):
+            # Widen the window between reading the entry and writing it
+            time.sleep(0.05)
+            return pending_ahead_of(queue_entry)
+
+        def complete(_):
+            return APIClient().post(f'/api/queue/complete/{self.entry.id}/').status_code
+
+        pending_ahead_of = views_queue.pending_ahead_of
+        with mock.patch('api.views_queue.pending_ahead_of', slow_pending_ahead_of):
+            self.assert_left_once(self.run_concurrently(complete, range(self.requests)))
+        self.assertEqual(Queue.objects.get(id=self.entry.id).status, 'completed')
+
+    def test_concurrent_bulk_cancels(self):
+        def cancel(_):
+            return APIClient().post('/api/queue/bulk/cancel/', {"ids": [self.entry.id]}, format='json').status_code
+        self.assert_left_once(self.run_concurrently(cancel, range(self.requests)))
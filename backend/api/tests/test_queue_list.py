@@ -0,0 +1,66 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import Queue
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class QueueListTests(TestCase):
+    """
+    The queue list, unpaginated for clients that send no limit or cursor,
+    and paged by cursor with positions that carry across pages.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        # Every third entry is done: pending, pending, completed, pending, ...
+        self.entries = [Queue.objects.create(name=f"List check {i}") for i in range(10)]
+        for entry in self.entries[2::3]:
+            entry.status = 'completed'
+            entry.save(update_fields=['status'])
+
+    def pages(self, query):
+        """
+        Follows X-Next-Cursor from the first page; returns the pages' rows.
+        """
+        pages, path = [], f"/api/queue/list/?{query}"
+        while True:
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            cursor = response.get('X-Next-Cursor')
+            if not cursor:
+                return pages
+            path = f"/api/queue/list/?{query}&cursor={cursor}"
+
+    def test_full_list_without_limit_or_cursor(self):
+        response = self.client.get("/api/queue/list/")
+        self.assertNotIn('X-Next-Cursor', response)
+        pending = [entry.id for entry in self.entries if entry.status == 'pending']
+        completed = [entry.id for entry in self.entries if entry.status == 'completed']
+        rows = response.json()
+        self.assertEqual([row['id'] for row in rows], pending + completed)
+        self.assertEqual([row['position'] for row in rows], list(range(1, len(pending) + 1)) + [0] * len(completed))
+
+    def test_cursor_round_trip(self):
+        pages = self.pages("limit=3")
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        self.assertEqual([row['id'] for page in pages for row in page], [entry.id for entry in self.entries])
+
+    def test_positions_carry_across_pages(self):
+        rows = [row for page in self.pages("limit=4") for row in page]
+        expected, position = [], 0
+        for entry in self.entries:
+            position += entry.status == 'pending'
+            expected.append(position if entry.status == 'pending' else 0)
+        self.assertEqual([row['position'] for row in rows], expected)
+
+    def test_status_filter(self):
+        rows = [row for page in self.pages("status=pending&limit=2") for row in page]
+        self.assertEqual([row['id'] for row in rows], [entry.id for entry in self.entries if entry.status == 'pending'])
+        self.assertEqual([row['position'] for row in rows], list(range(1, len(rows) + 1)))
+
+        rows = self.client.get("/api/queue/list/?status=completed").json()
+        self.assertEqual({row['status'] for row in rows}, {'completed'})
+        self.assertEqual({row['position'] for row in rows}, {0})
+        self.assertEqual(self.client.get("/api/queue/list/?status=waiting").status_code, 400)
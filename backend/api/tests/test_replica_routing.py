@@ -0,0 +1,135 @@
+import time
+from datetime import date, time as dt_time, timedelta
+from unittest import skipUnless
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from api.db_router import ReplicaRouter, ReplicaRoutingMiddleware, read_alias, reads_from_replica, replica_alias
+from api.models import Barber, Service
+from api.working_calendar import EVERY_DAY, get_calendars
+from .utils import TEST_CACHES
+
+PIN_SECONDS = 1
+
+
+def separate_replica():
+    """
+    Whether the settings have a replica that is a database of its own in
+    tests, like the SQLite pair of barberqueue.settings_replica, rather than
+    a mirror of 'default'.
+    """
+    alias = replica_alias()
+    return alias is not None and not settings.DATABASES[alias].get('TEST', {}).get('MIRROR')
+
+
+@override_settings(CACHES=TEST_CACHES, READ_REPLICA_ALIAS=DEFAULT_DB_ALIAS, REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    """
+    Routing decisions of the middleware and router, with 'default' standing
+    in for the replica.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.factory = RequestFactory()
+        self.seen = []
+        self.middleware = ReplicaRoutingMiddleware(lambda request: self.seen.append(read_alias.get()))
+        self.replica_view = reads_from_replica(lambda request: None)
+
+    def handle(self, method, view, address='10.0.0.1'):
+        request = getattr(self.factory, method)('/', REMOTE_ADDR=address)
+        self.middleware.process_view(request, view, (), {})
+        self.middleware(request)
+        return self.seen[-1]
+
+    def test_marked_views_read_the_replica(self):
+        self.assertEqual(self.handle('get', self.replica_view), DEFAULT_DB_ALIAS)
+        self.assertIsNone(self.handle('get', lambda request: None))
+        self.assertIsNone(read_alias.get())
+
+    def test_writes_pin_the_client_to_default(self):
+        self.handle('post', self.replica_view)
+        self.assertIsNone(self.handle('get', self.replica_view))
+        self.assertEqual(self.handle('get', self.replica_view, address='10.0.0.2'), DEFAULT_DB_ALIAS)
+
+    def test_router(self):
+        router = ReplicaRouter()
+        token = read_alias.set('replica')
+        try:
+            self.assertEqual(router.db_for_read(Barber), 'replica')
+            self.assertEqual(router.db_for_write(Barber), DEFAULT_DB_ALIAS)
+        finally:
+            read_alias.reset(token)
+        self.assertEqual(router.db_for_read(Barber), DEFAULT_DB_ALIAS)
+
+
+@skipUnless(separate_replica(), "needs a separate replica database, e.g. --settings=barberqueue.settings_replica")
+@override_settings(CACHES=TEST_CACHES, REPLICA_PIN_CACHE_ALIAS='default', REPLICA_PIN_SECONDS=PIN_SECONDS)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Which database each endpoint reads from, with a replica that nothing is
+    replicated to, so every read's source is visible.
+    """
+    databases = '__all__'
+
+    def setUp(self):
+        caches['default'].clear()
+        self.alias = replica_alias()
+        self.day = (date.today() + timedelta(days=30)).isoformat()
+        self.barber = Barber.objects.create(
+            name="Routing check", working_hours_start=dt_time(9), working_hours_end=dt_time(17), available_days=EVERY_DAY
+        )
+        # The working calendars are compiled from 'default', once per version
+        get_calendars()
+        Service.objects.create(service_name="Routing check", service_duration=30)
+        self.writer = APIClient(REMOTE_ADDR='10.0.0.1')
+        self.reader = APIClient(REMOTE_ADDR='10.0.0.2')
+
+    def request(self, client, method, path, data=None):
+        """
+        Returns the response and the set of databases the request read from.
+        """
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary:
+            with CaptureQueriesContext(connections[self.alias]) as replica:
+                response = getattr(client, method)(path, data, format='json')
+        used = {name for name, queries in ((DEFAULT_DB_ALIAS, primary), (self.alias, replica)) if len(queries)}
+        return response, used
+
+    def test_read_only_endpoints_read_the_replica(self):
+        for path in [
+            '/api/queue/list/',
+            f'/api/schedule/search/?barbers={self.barber.id}&start={self.day}',
+            f'/api/appointments/{self.day}/',
+        ]:
+            with self.subTest(path):
+                self.assertEqual(self.request(self.reader, 'get', path)[1], {self.alias})
+        self.assertEqual(self.request(self.reader, 'get', '/api/appointments/999999999/')[1], {DEFAULT_DB_ALIAS})
+
+    def test_slot_cache_is_filled_from_default(self):
+        # Cached slots must not be built from a lagging replica
+        path = f'/api/schedule/{self.barber.id}/{self.day}/'
+        self.assertEqual(self.request(self.reader, 'get', path)[1], {DEFAULT_DB_ALIAS})
+        self.assertEqual(self.request(self.reader, 'get', path)[1], set())
+
+    def test_timetables_are_built_from_default(self):
+        path = f'/api/schedule/{self.barber.id}/{self.day}/timetable/'
+        response, used = self.request(self.reader, 'get', path)
+        self.assertEqual((response.status_code, used), (200, {DEFAULT_DB_ALIAS}))
+
+    def test_writer_reads_its_own_writes_until_the_pin_expires(self):
+        response, used = self.request(self.writer, 'post', '/api/queue/', {'name': "Routing check"})
+        self.assertEqual((response.status_code, used), (201, {DEFAULT_DB_ALIAS}))
+        path = f"/api/queue/search/{response.data['id']}/"
+
+        # The new entry exists on 'default' only, so only a pinned client can find it
+        response, used = self.request(self.writer, 'get', path)
+        self.assertEqual((response.status_code, used), (200, {DEFAULT_DB_ALIAS}))
+        response, used = self.request(self.reader, 'get', path)
+        self.assertEqual((response.status_code, used), (404, {self.alias}))
+
+        time.sleep(PIN_SECONDS + 0.1)
+        response, used = self.request(self.writer, 'get', path)
+        self.assertEqual((response.status_code, used), (404, {self.alias}))
@@ -0,0 +1,40 @@
+from datetime import date, datetime, time, timezone as dt_timezone
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import ArchivedAppointment, Barber, Service
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ExpandedRowTests(TestCase):
+    """
+    Expanded barber and service summaries of archived appointments whose
+    barber or service has since been deleted.
+    """
+
+    def setUp(self):
+        self.day = date(2024, 3, 1)
+        self.barber = Barber.objects.create(name="Still here")
+        self.service = Service.objects.create(service_name="cut", service_duration=30)
+
+    def archive(self, appointment_id, barber_id, service_id):
+        ArchivedAppointment.objects.create(
+            id=appointment_id, customer_name="Archived", customer_email="archived@example.com",
+            barber_id=barber_id, service_id=service_id, status='completed',
+            appointment_time=datetime.combine(self.day, time(10), tzinfo=dt_timezone.utc),
+            appointment_date=self.day, created_at=datetime(2024, 2, 1, tzinfo=dt_timezone.utc)
+        )
+
+    def test_missing_related_rows_expand_to_null(self):
+        self.archive(1, self.barber.id, self.service.id)
+        self.archive(2, 424242, 424242)
+        self.archive(3, self.barber.id, None)
+
+        response = APIClient().get(f'/api/appointments/{self.day}/?include_archived=1&expand=1')
+        self.assertEqual(response.status_code, 200)
+        rows = {row['id']: row for row in response.json()}
+        self.assertEqual(sorted(rows), [1, 2, 3])
+        self.assertEqual(rows[1]['barber'], {"id": self.barber.id, "name": "Still here"})
+        self.assertEqual(rows[1]['service']['service_name'], "cut")
+        self.assertEqual((rows[2]['barber'], rows[2]['service']), (None, None))
+        self.assertIsNone(rows[3]['service'])
@@ -0,0 +1,149 @@
+from datetime import date, time, timedelta
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from api.models import Appointment, Barber, Service
+from api.views_appointment import delete_appointment
+from api.working_calendar import EVERY_DAY
+from .utils import TEST_CACHES
+
+# Cache settings that build every response from the database
+UNCACHED = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+@override_settings(CACHES=TEST_CACHES, CATALOG_CACHE_ALIAS='default')
+class SlotCacheTests(TestCase):
+    """
+    The per barber-day slot cache is never served stale: after each kind of
+    appointment and calendar write, every cached answer matches one built
+    from the database, and writes to one barber leave another's cached
+    slots alone.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.day = date.today() + timedelta(days=30)
+        self.next_day = self.day + timedelta(days=1)
+        self.barber, self.other = (
+            Barber.objects.create(
+                name=f"Slot cache check {i}", working_hours_start=time(9), working_hours_end=time(17),
+                slot_duration=30, available_days=EVERY_DAY
+            ).id
+            for i in range(2)
+        )
+        self.service = Service.objects.create(service_name="Slot cache check", service_duration=30).id
+        self.admin = User.objects.create_superuser(username="slot-cache-check")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        # For the admin site, which authenticates by session
+        self.client.force_login(self.admin)
+        self.watched = [
+            f"/api/schedule/{self.barber}/{self.day}/",
+            f"/api/schedule/{self.barber}/{self.day}/?service={self.service}",
+            f"/api/schedule/{self.barber}/{self.next_day}/",
+        ]
+        self.untouched = f"/api/schedule/{self.other}/{self.day}/"
+        self.booked = {}
+
+    def book(self, name, hour):
+        response = self.client.post("/api/appointments/", {
+            "customerName": "Slot cache check", "customerEmail": "slots@example.com",
+            "appointmentTime": f"{self.day}T{hour:02d}:00:00", "barberId": self.barber, "service": self.service,
+        }, format='json')
+        if response.status_code == 201:
+            self.booked[name] = response.data['id']
+        return response
+
+    def delete(self, name):
+        # DELETE appointments/<id>/ is routed to get_single_appointment,
+        # which shares its URL pattern, so call the view itself
+        request = APIRequestFactory().delete(f"/api/appointments/{self.booked[name]}/")
+        force_authenticate(request, self.admin)
+        return delete_appointment(request, appointment_id=self.booked[name])
+
+    def admin_change(self, name, **changes):
+        appointment = Appointment.objects.get(id=self.booked[name])
+        fields = {
+            "customer_name": appointment.customer_name, "customer_email": appointment.customer_email,
+            "barber": appointment.barber_id, "service": appointment.service_id or "",
+            "appointment_time_0": str(appointment.appointment_date),
+            "appointment_time_1": appointment.appointment_time.strftime("%H:%M:%S"),
+            "appointment_date": str(appointment.appointment_date), "status": appointment.status,
+        }
+        fields.update(changes)
+        response = self.client.post(f"/admin/api/appointment/{appointment.id}/change/", fields)
+        # The admin answers an invalid form with 200 and the form again
+        self.assertEqual(response.status_code, 302)
+        return response
+
+    def admin_delete(self, name):
+        response = self.client.post(f"/admin/api/appointment/{self.booked[name]}/delete/", {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        return response
+
+    def writes(self):
+        """
+        (label, write) pairs, run in order; each returns the write's response.
+        """
+        client, booked, day, next_day = self.client, self.booked, self.day, self.next_day
+        return [
+            ("create", lambda: self.book('a', 10)),
+            ("reschedule to another date", lambda: client.post(
+                f"/api/appointments/reschedule/{booked['a']}/", {"newAppointmentTime": f"{next_day}T11:00:00"}, format='json')),
+            ("create again", lambda: self.book('b', 12)),
+            ("cancel", lambda: client.post(f"/api/appointments/cancel/{booked['b']}/")),
+            ("create to complete", lambda: self.book('c', 13)),
+            ("complete", lambda: client.post(f"/api/appointments/complete/{booked['c']}/")),
+            ("create to delete", lambda: self.book('d', 14)),
+            ("delete", lambda: self.delete('d')),
+            ("create another", lambda: self.book('e', 15)),
+            ("bulk cancel", lambda: client.post("/api/appointments/bulk/cancel/", {"ids": [booked['e']]}, format='json')),
+            ("create to edit in the admin", lambda: self.book('f', 16)),
+            ("admin move", lambda: self.admin_change('f', appointment_time_1="14:00:00")),
+            ("admin cancel", lambda: self.admin_change('f', status='canceled')),
+            ("create to delete in the admin", lambda: self.book('g', 16)),
+            ("admin delete", lambda: self.admin_delete('g')),
+            ("reschedule back", lambda: client.post(
+                f"/api/appointments/reschedule/{booked['a']}/", {"newAppointmentTime": f"{day}T09:00:00"}, format='json')),
+            ("day off", lambda: client.post(
+                "/api/calendar/exceptions/", {"barber": self.barber, "day": str(next_day)}, format='json')),
+            ("longer service", lambda: client.put(
+                f"/api/services/update/{self.service}/", {"service_duration": 90}, format='json')),
+        ]
+
+    def test_cached_reads_skip_the_database(self):
+        for path in self.watched + [self.untouched]:
+            with self.subTest(path):
+                etag = self.client.get(path)['ETag']
+                with CaptureQueriesContext(connection) as captured:
+                    again = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual((again.status_code, len(captured.captured_queries)), (304, 0))
+
+    def test_writes_never_leave_stale_slots(self):
+        self.client.get(self.untouched)
+        for label, write in self.writes():
+            before = {path: self.client.get(path) for path in self.watched}
+            # The new versions are published once the write commits
+            with self.captureOnCommitCallbacks(execute=True):
+                response = write()
+            self.assertLess(response.status_code, 400, f"{label}: the write returned {response.status_code}")
+
+            for path in self.watched:
+                with self.subTest(label, path=path):
+                    cached = self.client.get(path)
+                    with override_settings(CACHES=UNCACHED):
+                        fresh = self.client.get(path)
+                    self.assertEqual(cached.json(), fresh.json())
+                    # A client holding the ETag of slots that have changed gets them again
+                    if fresh.json() != before[path].json():
+                        revalidated = self.client.get(path, HTTP_IF_NONE_MATCH=before[path]['ETag'])
+                        self.assertEqual(revalidated.status_code, 200)
+
+            if label not in ("day off", "longer service"):
+                with self.subTest(label, path=self.untouched):
+                    with CaptureQueriesContext(connection) as captured:
+                        self.client.get(self.untouched)
+                    self.assertEqual(len(captured.captured_queries), 0, f"only barber {self.barber} changed")
@@ -0,0 +1,82 @@
+import os
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from api.middleware import RequestStatsMiddleware
+from api.models import Barber
+from api.stats import registry
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES, REQUEST_STATS_SAMPLE_RATE=1.0)
+class RequestStatsTests(TestCase):
+    """
+    RequestStatsMiddleware records a sample of API requests per route, and
+    only admins can read the statistics.
+    """
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.admin = User.objects.create_user(username="stats-admin", is_staff=True)
+
+    def stats(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_admin_only(self):
+        client = APIClient()
+        for path in ('/api/stats/', '/api/metrics/'):
+            with self.subTest(path):
+                client.force_authenticate(None)
+                self.assertEqual(client.get(path).status_code, 401)
+                client.force_authenticate(User.objects.get_or_create(username="stats-customer")[0])
+                self.assertEqual(client.get(path).status_code, 403)
+
+    def test_requests_are_recorded_per_route(self):
+        barber = Barber.objects.create(name="Stats check")
+        client = APIClient()
+        for day in ('2030-01-07', '2030-01-08'):
+            client.get(f'/api/schedule/{barber.id}/{day}/timetable/')
+        client.get('/admin/login/')
+
+        stats = self.stats()
+        self.assertEqual(stats['pid'], os.getpid())
+        routes = stats['routes']
+        self.assertNotIn('GET admin/login/', routes)
+        timetable = routes['GET api/schedule/<int:barber_id>/<str:date_str>/timetable/']
+        self.assertEqual(timetable['count'], 2)
+        self.assertGreater(timetable['dbQueriesPerRequest'], 0)
+
+        client.force_authenticate(self.admin)
+        metrics = client.get('/api/metrics/').content.decode()
+        self.assertIn(
+            f'barberqueue_request_duration_seconds_count{{pid="{os.getpid()}",method="GET",'
+            f'route="api/schedule/<int:barber_id>/<str:date_str>/timetable/"}} 2',
+            metrics
+        )
+
+    def test_sampling(self):
+        request = RequestFactory().get('/api/barbers/list/')
+        for rate, draw, recorded in [(0.5, 0.3, True), (0.5, 0.7, False), (0.0, 0.0, False), (1.0, 0.99, True)]:
+            with self.subTest(rate=rate, draw=draw):
+                registry.reset()
+                with override_settings(REQUEST_STATS_SAMPLE_RATE=rate):
+                    middleware = RequestStatsMiddleware(lambda request: HttpResponse())
+                with mock.patch('api.middleware.random.random', return_value=draw):
+                    middleware(request)
+                self.assertEqual(bool(registry.snapshot()['routes']), recorded)
+
+    def test_async_requests(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = RequestStatsMiddleware(get_response)
+        async_to_sync(middleware)(RequestFactory().get('/api/barbers/list/'))
+        self.assertEqual(registry.snapshot()['routes']['GET unmatched']['count'], 1)
@@ -0,0 +1,97 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from api.models import Appointment, Barber, BarberDayTimetable, Service
+from api.working_calendar import EVERY_DAY
+from .utils import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ServiceTimetableTests(TestCase):
+    """
+    Stored timetables follow changes to the services of their bookings.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.day = date.today() + timedelta(days=30)
+        self.barber = Barber.objects.create(
+            name="Timetable check", working_hours_start=time(9), working_hours_end=time(12), available_days=EVERY_DAY
+        )
+        self.service = Service.objects.create(service_name="cut", service_duration=30)
+        Appointment.objects.create(
+            customer_name="Timetable check", customer_email="timetable@example.com", barber=self.barber,
+            service=self.service, appointment_time=datetime.combine(self.day, time(9), tzinfo=dt_timezone.utc),
+            appointment_date=self.day, status='scheduled'
+        )
+        self.client = APIClient()
+        self.path = f'/api/schedule/{self.barber.id}/{self.day}/timetable/'
+        # Stores the timetable
+        self.assertEqual(self.client.get(self.path).data['free_slots'][0], "09:30")
+
+    def test_service_update_refreshes_timetables(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(f'/api/services/update/{self.service.id}/', {"service_duration": 90}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(BarberDayTimetable.objects.filter(barber=self.barber, day=self.day).exists())
+        timetable = self.client.get(self.path).data
+        self.assertEqual(timetable['appointments'][0]['end'], "10:30")
+        self.assertEqual(timetable['free_slots'][0], "10:30")
+
+    def test_service_delete_refreshes_timetables(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/services/{self.service.id}/')
+        self.assertEqual(response.status_code, 200)
+        entry = self.client.get(self.path).data['appointments'][0]
+        self.assertEqual((entry['service_id'], entry['service_name']), (None, None))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TimetableStorageTests(TestCase):
+    """
+    Only days with bookings get a stored timetable; the admin keeps stored
+    timetables current.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.day = date.today() + timedelta(days=30)
+        self.barber = Barber.objects.create(
+            name="Timetable storage", working_hours_start=time(9), working_hours_end=time(12), available_days=EVERY_DAY
+        )
+        self.client = APIClient()
+        self.path = f'/api/schedule/{self.barber.id}/{self.day}/timetable/'
+
+    def book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/appointments/', {
+                "customerName": "Timetable storage", "customerEmail": "timetable@example.com",
+                "appointmentTime": f"{self.day}T09:00:00", "barberId": self.barber.id, "service": 0
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def test_unbooked_days_are_not_stored(self):
+        for days_ahead in (30, 3650):
+            path = f'/api/schedule/{self.barber.id}/{date.today() + timedelta(days=days_ahead)}/timetable/'
+            self.assertEqual(self.client.get(path).data['free_slots'][0], "09:00")
+        self.assertFalse(BarberDayTimetable.objects.exists())
+
+        # The cached empty day is not served once it has a booking
+        self.book()
+        self.assertEqual(self.client.get(self.path).data['free_slots'][0], "09:30")
+        self.assertTrue(BarberDayTimetable.objects.filter(barber=self.barber, day=self.day).exists())
+
+    def test_admin_edits_refresh_timetables(self):
+        appointment = Appointment.objects.get(id=self.book())
+        self.assertEqual(len(self.client.get(self.path).data['appointments']), 1)
+
+        request = RequestFactory().post('/admin/')
+        request.user = User.objects.create_superuser(username="timetable-admin")
+        appointment.status = 'canceled'
+        admin.site._registry[Appointment].save_model(request, appointment, None, True)
+        timetable = self.client.get(self.path).data
+        self.assertEqual((timetable['appointments'], timetable['free_slots'][0]), ([], "09:00"))
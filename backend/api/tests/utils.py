@@ -0,0 +1,59 @@
+"""
+Helpers shared by the api tests.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import caches
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+# Tests run in one process, whatever cache the settings point at
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-tests',
+    }
+}
+
+
+def concurrent_writes_supported():
+    """
+    Whether threads can each open their own connection to the test database
+    and write concurrently: Postgres, or an SQLite file (not the in-memory
+    test database) that takes its write lock when a transaction begins, as
+    settings_bench configures.
+    """
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        options = connection.settings_dict.get('OPTIONS', {})
+        return not connection.is_in_memory_db() and options.get('transaction_mode') == 'IMMEDIATE'
+    return False
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConcurrentTestCase(TransactionTestCase):
+    """
+    Test case for requests fired from several threads at once. Each thread
+    uses its own database connection, so the rows are committed for real and
+    the tables are flushed after each test.
+    """
+    threads = 16
+
+    def setUp(self):
+        if not concurrent_writes_supported():
+            self.skipTest("needs a test database that takes concurrent writes")
+        caches['default'].clear()
+
+    def run_concurrently(self, function, arguments):
+        """
+        Calls function on each argument from a pool of threads, closing each
+        call's database connection, and returns the results in order.
+        """
+        def call(argument):
+            try:
+                return function(argument)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            return list(pool.map(call, arguments))
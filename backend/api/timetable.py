@@ -0,0 +1,188 @@
+"""
+Front-desk timetables of one barber's day, kept in BarberDayTimetable.
+
+A timetable lists the day's bookings (with customer and service) and the
+free slot start times, the way the front-desk screen shows them. Every
+appointment write calls refresh_timetables() for the (barber_id, day) pairs
+it touched, in its own transaction and under lock_booking_date(), so a
+stored timetable always matches the committed appointments. Days no write
+has touched yet are built on first read, and so are days whose working
+hours changed and days listing a service that was edited or deleted:
+calendar and service writes drop their stored timetables. Built days with
+bookings are stored; days without any are only cached, under the versions
+of api.slot_cache, so reading arbitrary dates doesn't add rows.
+
+Positions are left out on purpose: they are numbered per date across all
+barbers, so they change with other barbers' bookings.
+"""
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Q
+from . import catalog_cache, slot_cache
+from .catalog_cache import get_cache
+from .models import Appointment, Barber, BarberDayTimetable
+from .slots import booking_interval, format_minutes
+from .working_calendar import calendar_for
+
+ACTIVE_STATUSES = ('pending', 'scheduled')
+
+
+def timetable_entry(appointment, slot_duration):
+    service = appointment.service
+    start, end = booking_interval(
+        appointment.appointment_time, service.service_duration if service else None, slot_duration
+    )
+    return {
+        "id": appointment.id,
+        "start": format_minutes(start),
+        "end": format_minutes(end),
+        "status": appointment.status,
+        "customer_name": appointment.customer_name,
+        "customer_email": appointment.customer_email,
+        "phone_no": appointment.phone_no,
+        "service_id": service.id if service else None,
+        "service_name": service.service_name if service else None,
+    }
+
+
+def timetable_data(barber, day, appointments):
+    """
+    Timetable payload of the barber's day from its appointments (with
+    their service loaded), in time order. On a day off, working_hours is
+    None and there are no free slots; bookings made before the day was
+    taken off are still listed.
+    """
+    schedule = calendar_for(barber).schedule_on(day)
+    if schedule is None:
+        working_hours, free_slots = None, []
+    else:
+        booked_mask = schedule.mask_overlapping(
+            booking_interval(a.appointment_time, a.service.service_duration if a.service else None, barber.slot_duration)
+            for a in appointments if a.status in ACTIVE_STATUSES
+        )
+        working_hours = {"start": format_minutes(schedule.start_minute), "end": format_minutes(schedule.end_minute)}
+        free_slots = schedule.labels_for(schedule.free_mask(booked_mask))
+    return {
+        "barber": {"id": barber.id, "name": barber.name},
+        "date": day.isoformat(),
+        "working_hours": working_hours,
+        "appointments": [timetable_entry(a, barber.slot_duration) for a in appointments],
+        "free_slots": free_slots,
+    }
+
+
+def build_timetables(keys):
+    """
+    BarberDayTimetable instances for the (barber_id, day) pairs, from one
+    query over their appointments, plus one for the barbers of days without
+    any. Pairs of deleted barbers are skipped.
+    """
+    keys = set(keys)
+    if not keys:
+        return []
+    match = Q()
+    for barber_id, day in keys:
+        match |= Q(barber_id=barber_id, appointment_date=day)
+    by_key = defaultdict(list)
+    barbers = {}
+    appointments = (
+        Appointment.objects.filter(match).exclude(status='canceled')
+        .select_related('barber', 'service').order_by('appointment_time', 'id')
+    )
+    for appointment in appointments:
+        by_key[appointment.barber_id, appointment.appointment_date].append(appointment)
+        barbers[appointment.barber_id] = appointment.barber
+
+    missing = {barber_id for barber_id, _ in keys} - barbers.keys()
+    if missing:
+        barbers.update(Barber.objects.in_bulk(missing))
+    return [
+        BarberDayTimetable(barber_id=barber_id, day=day, data=timetable_data(barbers[barber_id], day, by_key[barber_id, day]))
+        for barber_id, day in sorted(keys)
+        if barber_id in barbers
+    ]
+
+
+def refresh_timetables(keys):
+    """
+    Rebuilds the timetables of the (barber_id, day) pairs with one upsert.
+    Call it in the writing transaction, after the appointments changed.
+    """
+    timetables = build_timetables(keys)
+    if timetables:
+        BarberDayTimetable.objects.bulk_create(
+            timetables, update_conflicts=True,
+            unique_fields=['barber', 'day'], update_fields=['data', 'built_at']
+        )
+
+
+def cache_key(barber_id, day):
+    """
+    Cache key of an unbooked day's timetable, under the versions its free
+    slots and barber summary depend on.
+    """
+    versions = slot_cache.get_versions(barber_id, day) + [catalog_cache.get_version('barbers')]
+    return f"timetable:{barber_id}:{day.isoformat()}:" + ":".join(str(v) for v in versions)
+
+
+def get_timetable(barber_id, day):
+    """
+    The stored timetable payload. Days no write has touched yet are built
+    from 'default': stored when they have bookings, only cached otherwise.
+    Returns None for an unknown barber.
+    """
+    data = BarberDayTimetable.objects.filter(barber_id=barber_id, day=day).values_list('data', flat=True).first()
+    if data is not None:
+        return data
+    cache = get_cache()
+    key = cache_key(barber_id, day)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    timetables = build_timetables([(barber_id, day)])
+    if not timetables:
+        return None
+    timetable = timetables[0]
+    if timetable.data['appointments']:
+        # A write that committed meanwhile stored a newer timetable; keep that one
+        BarberDayTimetable.objects.bulk_create(timetables, ignore_conflicts=True)
+    else:
+        # The first booking moves the day to a new slot version
+        cache.set(key, timetable.data, timeout=slot_cache.get_timeout())
+    return timetable.data
+
+
+def drop_timetables(barber_id=None, day=None):
+    """
+    Deletes the stored timetables of a barber, of a date, or of both, so
+    they are rebuilt with the current working calendar on their next read.
+    """
+    timetables = BarberDayTimetable.objects.all()
+    if barber_id is not None:
+        timetables = timetables.filter(barber_id=barber_id)
+    if day is not None:
+        timetables = timetables.filter(day=day)
+    timetables.delete()
+
+
+def drop_service_timetables(service_id):
+    """
+    Drops the stored timetables listing a booking of the service once the
+    current transaction commits, so they are rebuilt with its new name and
+    duration. Call it before deleting the service, which clears it from its
+    appointments.
+    """
+    keys = list(
+        Appointment.objects.filter(service_id=service_id).exclude(status='canceled')
+        .values_list('barber_id', 'appointment_date').distinct()
+    )
+    if not keys:
+        return
+    # Matching the barbers and dates separately may drop a few more
+    # timetables than needed; they are rebuilt on their next read
+    barber_ids = {barber_id for barber_id, _ in keys}
+    days = {day for _, day in keys}
+    transaction.on_commit(
+        lambda: BarberDayTimetable.objects.filter(barber_id__in=barber_ids, day__in=days).delete()
+    )
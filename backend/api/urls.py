@@ -1,20 +1,38 @@
+from django.conf import settings
 from django.urls import path
+from . import views_async
 from .views_auth import signup, login_view, update_profile, check_auth
 from .views_barber import add_barber, get_barbers, delete_barber
+from .views_calendar import (
+    get_barber_calendar, set_working_hours, create_calendar_exception, delete_calendar_exception
+)
 from .views_queue import (
     create_queue_entry, get_all_queue_entries, get_queue_position_by_id,
-    remove_from_queue, complete_queue_entry, cancel_queue_entry
+    remove_from_queue, complete_queue_entry, cancel_queue_entry, queue_events,
+    bulk_update_queue_entries
 )
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView
 )
-from .views_schedule import get_available_slots
+from .views_schedule import get_available_slots, get_barber_timetable, search_available_slots
 from .views_appointment import (
     create_appointment, cancel_appointment, reschedule_appointment,
-    complete_appointment, delete_appointment, get_appointments_by_date, get_single_appointment
+    complete_appointment, delete_appointment, get_appointments_by_date, get_single_appointment,
+    bulk_update_appointments, list_appointments
 )
 from .views_service import create_service, get_services, delete_service, update_service
+from .views_stats import get_request_stats, get_metrics
+from .views_export import export_appointments, export_queue
+from .views_import import import_appointments, import_barbers, import_services
+
+# Under ASGI, serve the read-heavy polling endpoints with the async ORM views
+if getattr(settings, 'ASYNC_READ_VIEWS', False):
+    get_barbers = views_async.get_barbers
+    get_services = views_async.get_services
+    get_all_queue_entries = views_async.get_all_queue_entries
+    get_queue_position_by_id = views_async.get_queue_position_by_id
+    get_available_slots = views_async.get_available_slots
 
 urlpatterns = [
     # Auth
@@ -30,26 +48,42 @@ urlpatterns = [
     path('barbers/add/', add_barber, name='add_barber'),   # POST for adding a barber
     path('barbers/list/', get_barbers, name='get_barbers'), 
     path('barbers/<int:barber_id>/', delete_barber, name='delete_barber'),  # DELETE
+    path('barbers/import/<str:import_format>/', import_barbers, name='import_barbers'),  # POST
+    path('barbers/<int:barber_id>/calendar/', get_barber_calendar, name='get_barber_calendar'),  # GET
+    path('barbers/<int:barber_id>/calendar/hours/', set_working_hours, name='set_working_hours'),  # PUT
+
+    # Working calendar
+    path('calendar/exceptions/', create_calendar_exception, name='create_calendar_exception'),  # POST
+    path('calendar/exceptions/<int:exception_id>/', delete_calendar_exception, name='delete_calendar_exception'),  # DELETE
 
     # Queue
     path('queue/', create_queue_entry, name='create_queue_entry'),  # POST
     path('queue/list/', get_all_queue_entries, name='get_all_queue_entries'),  # GET
+    path('queue/events/', queue_events, name='queue_events'),  # GET (SSE)
     path('queue/search/<int:queueid>/', get_queue_position_by_id, name='get_queue_position_by_id'),
     path('queue/complete/<int:queue_id>/', complete_queue_entry, name='complete_queue_entry'),
     path('queue/cancel/<int:queue_id>/', cancel_queue_entry, name='cancel_queue_entry'),
     path('queue/<int:queue_id>/', remove_from_queue, name='remove_from_queue'),
+    path('queue/bulk/<str:action>/', bulk_update_queue_entries, name='bulk_update_queue_entries'),  # POST
+    path('queue/export/<str:export_format>/', export_queue, name='export_queue'),  # GET (streamed)
 
     # Schedule
+    path('schedule/search/', search_available_slots, name='search_available_slots'),  # GET
     path('schedule/<int:barber_id>/<str:date_str>/', get_available_slots, name='get_available_slots'),
+    path('schedule/<int:barber_id>/<str:date_str>/timetable/', get_barber_timetable, name='get_barber_timetable'),  # GET
 
     # Appointments
     path('appointments/', create_appointment, name='create_appointment'),  # POST
+    path('appointments/list/', list_appointments, name='list_appointments'),  # GET
     # by id
     path('appointments/<int:appointment_id>/', get_single_appointment, name='get_single_appointment'),
     path('appointments/cancel/<int:appointment_id>/', cancel_appointment, name='cancel_appointment'),
     path('appointments/reschedule/<int:appointment_id>/', reschedule_appointment, name='reschedule_appointment'),
     path('appointments/complete/<int:appointment_id>/', complete_appointment, name='complete_appointment'),
     path('appointments/<int:appointment_id>/', delete_appointment, name='delete_appointment'),  # DELETE
+    path('appointments/bulk/<str:action>/', bulk_update_appointments, name='bulk_update_appointments'),  # POST
+    path('appointments/export/<str:export_format>/', export_appointments, name='export_appointments'),  # GET (streamed)
+    path('appointments/import/<str:import_format>/', import_appointments, name='import_appointments'),  # POST
     path('appointments/<str:date_str>/', get_appointments_by_date, name='get_appointments_by_date'),  # GET
 
 
@@ -58,5 +92,10 @@ urlpatterns = [
     path('services/list/', get_services, name='get_services'),  # GET
     path('services/<int:service_id>/', delete_service, name='delete_service'),  # DELETE
     path('services/update/<int:service_id>/', update_service, name='update_service'),  # PUT
+    path('services/import/<str:import_format>/', import_services, name='import_services'),  # POST
+
+    # Instrumentation
+    path('stats/', get_request_stats, name='get_request_stats'),  # GET
+    path('metrics/', get_metrics, name='get_metrics'),  # GET (Prometheus)
 
 ]
@@ -2,17 +2,108 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from datetime import datetime
-from .models import Appointment, Barber, Service
+import base64
+from datetime import date, datetime, timezone as dt_timezone
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from . import slot_cache
+from .archive import include_archived
+from .bulk import bulk_set_status, parse_ids
+from .db_router import reads_from_replica
+from .exports import export_queryset
+from .models import Appointment, ArchivedAppointment, Barber, Service
+from .positions import release_positions, take_position
+from .row_serializers import (
+    appointment_rows, archived_appointment_rows, expanded_appointment_rows, expanded_archived_appointment_rows
+)
 from .serializers import AppointmentSerializer
+from .slots import BookedIntervals, booking_interval
+from .timetable import refresh_timetables
+from .working_calendar import calendar_for
 
-# Helper function to calculate position for a given date
-def calculate_position(appointment_date):
-    # Count how many appointments for that date are in 'pending' status
-    return Appointment.objects.filter(
-        appointment_date=appointment_date,
-        status='pending'
-    ).count() + 1
+# Namespace of the advisory locks taken by lock_booking_date
+BOOKING_LOCK_NAMESPACE = 4242
+
+# Bulk endpoint actions and the status they set
+BULK_ACTIONS = {'complete': 'completed', 'cancel': 'canceled'}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Helper function to serialize bookings for a date until the transaction ends.
+# Positions are numbered per date, so the lock covers the whole day.
+# Take row locks (lock_appointment) before date locks, and date locks in
+# date order, so concurrent requests can't deadlock.
+def lock_booking_date(appointment_date):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)",
+                [BOOKING_LOCK_NAMESPACE, appointment_date.toordinal()]
+            )
+    # SQLite has no row locks: give its DATABASES entry
+    # OPTIONS={'transaction_mode': 'IMMEDIATE'} so every transaction holds the
+    # database write lock from the start
+
+# Helper function to lock an appointment row until the transaction ends
+def lock_appointment(appointment_id):
+    return Appointment.objects.select_for_update(of=('self',)).select_related('barber', 'service').get(id=appointment_id)
+
+# Helper function to change an appointment's status, releasing its position
+# when it leaves the pending queue. Raises Appointment.DoesNotExist.
+def set_appointment_status(appointment_id, new_status):
+    with transaction.atomic():
+        appointment = lock_appointment(appointment_id)
+        lock_booking_date(appointment.appointment_date)
+        was_pending = appointment.status == 'pending'
+        appointment.status = new_status
+        appointment.save(update_fields=['status'])
+        if was_pending and new_status != 'pending':
+            release_positions([(appointment.appointment_date, appointment.barber_id, appointment.position)])
+        refresh_timetables([(appointment.barber_id, appointment.appointment_date)])
+        slot_cache.invalidate([(appointment.barber_id, appointment.appointment_date)])
+
+# Helper function to check a booking against the barber's other bookings that day
+def has_conflict(barber, dt_obj, service_duration, exclude_id=None):
+    if timezone.is_aware(dt_obj):
+        # Stored appointment times are read back in UTC
+        dt_obj = dt_obj.astimezone(dt_timezone.utc)
+    booked = Appointment.objects.filter(
+        barber=barber,
+        appointment_date=dt_obj.date(),
+        status__in=['pending', 'scheduled']
+    ).exclude(id=exclude_id).values_list('appointment_time', 'service__service_duration')
+    intervals = BookedIntervals(
+        booking_interval(appointment_time, duration, barber.slot_duration)
+        for appointment_time, duration in booked
+    )
+    return intervals.overlaps(*booking_interval(dt_obj, service_duration, barber.slot_duration))
+
+# Helper function to check a booking against the barber's working hours that
+# day. Returns the error to answer with, or None when the barber works for the
+# whole booking.
+def working_hours_error(barber, dt_obj, service_duration):
+    schedule = calendar_for(barber).schedule_on(dt_obj.date())
+    if schedule is None:
+        return "Barber is not working on this day"
+    if timezone.is_aware(dt_obj):
+        dt_obj = dt_obj.astimezone(dt_timezone.utc)
+    start, end = booking_interval(dt_obj, service_duration, schedule.step)
+    if start < schedule.start_minute or end > schedule.end_minute:
+        return "Barber is not working at this time"
+    return None
+
+# Helper function to look up the service a booking asks for. No service (or
+# 0) books a single slot. Raises Service.DoesNotExist for an unknown id.
+def requested_service(data):
+    service_id = data.get('service')
+    if not service_id:
+        return None
+    try:
+        return Service.objects.get(id=int(service_id))
+    except (TypeError, ValueError):
+        raise Service.DoesNotExist
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -34,27 +125,44 @@ def create_appointment(request):
         return Response({"error": "Barber not found"}, status=status.HTTP_404_NOT_FOUND)
 
     try:
-        service = Service.objects.get(id=data['service'])
+        service = requested_service(data)
     except Service.DoesNotExist:
-        service = None  # optional
+        return Response({"error": "Service not found"}, status=status.HTTP_404_NOT_FOUND)
 
     appointment_time_str = data['appointmentTime']  # e.g. "2025-03-12T10:00:00"
     # parse the date from that
     dt_obj = datetime.fromisoformat(appointment_time_str)
     appointment_date = dt_obj.date()
+    service_duration = service.service_duration if service else None
+    error = working_hours_error(barber, dt_obj, service_duration)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
 
-    position = calculate_position(appointment_date)
-    
-    appointment = Appointment.objects.create(
-        customer_name=data['customerName'],
-        customer_email=data['customerEmail'],
-        appointment_time=dt_obj,
-        appointment_date=appointment_date,
-        barber=barber,
-        service=service,
-        status='pending',
-        position=position
-    )
+    try:
+        with transaction.atomic():
+            lock_booking_date(appointment_date)
+
+            # Reject bookings overlapping any slot the barber's other bookings cover
+            if has_conflict(barber, dt_obj, service_duration):
+                return Response({"error": "Barber is already booked at this time"}, status=status.HTTP_409_CONFLICT)
+
+            position = take_position(appointment_date, barber.id)
+
+            appointment = Appointment.objects.create(
+                customer_name=data['customerName'],
+                customer_email=data['customerEmail'],
+                appointment_time=dt_obj,
+                appointment_date=appointment_date,
+                barber=barber,
+                service=service,
+                status='pending',
+                position=position
+            )
+            refresh_timetables([(barber.id, appointment_date)])
+            slot_cache.invalidate([(barber.id, appointment_date)])
+    except IntegrityError:
+        # Unique active (barber, appointment_time) constraint caught a double booking
+        return Response({"error": "Barber is already booked at this time"}, status=status.HTTP_409_CONFLICT)
     
     return Response({
         "id": appointment.id,
@@ -70,9 +178,7 @@ def cancel_appointment(request, appointment_id):
     POST /api/appointments/cancel/<id>
     """
     try:
-        appointment = Appointment.objects.get(id=appointment_id)
-        appointment.status = 'canceled'
-        appointment.save()
+        set_appointment_status(appointment_id, 'canceled')
         return Response({"message": "Appointment canceled successfully"}, status=status.HTTP_200_OK)
     except Appointment.DoesNotExist:
         return Response({"error": "Appointment not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -85,11 +191,6 @@ def reschedule_appointment(request, appointment_id):
     Expects: { "newAppointmentTime": "2025-03-20T09:00:00" }
     """
     data = request.data
-    try:
-        appointment = Appointment.objects.get(id=appointment_id)
-    except Appointment.DoesNotExist:
-        return Response({"error": "Appointment not found"}, status=status.HTTP_404_NOT_FOUND)
-    
     new_time_str = data['newAppointmentTime']
     try:
         dt_obj = datetime.strptime(new_time_str, "%Y-%m-%dT%H:%M:%S")
@@ -97,12 +198,38 @@ def reschedule_appointment(request, appointment_id):
         return Response({"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
     new_date = dt_obj.date()
 
-    new_position = calculate_position(new_date)
+    try:
+        with transaction.atomic():
+            try:
+                appointment = lock_appointment(appointment_id)
+            except Appointment.DoesNotExist:
+                return Response({"error": "Appointment not found"}, status=status.HTTP_404_NOT_FOUND)
+            service_duration = appointment.service.service_duration if appointment.service else None
+            error = working_hours_error(appointment.barber, dt_obj, service_duration)
+            if error:
+                return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+            old_date = appointment.appointment_date
+            for day in sorted({old_date, new_date}):
+                lock_booking_date(day)
+
+            if has_conflict(appointment.barber, dt_obj, service_duration, exclude_id=appointment.id):
+                return Response({"error": "Barber is already booked at this time"}, status=status.HTTP_409_CONFLICT)
 
-    appointment.appointment_time = dt_obj
-    appointment.appointment_date = new_date
-    appointment.position = new_position
-    appointment.save()
+            # A rescheduled pending appointment goes to the back of its new date
+            released = (old_date, appointment.barber_id, appointment.position)
+            if appointment.status == 'pending':
+                appointment.position = take_position(new_date, appointment.barber_id)
+
+            appointment.appointment_time = dt_obj
+            appointment.appointment_date = new_date
+            appointment.save()
+            if appointment.status == 'pending':
+                release_positions([released])
+            touched = [(appointment.barber_id, old_date), (appointment.barber_id, new_date)]
+            refresh_timetables(touched)
+            slot_cache.invalidate(touched)
+    except IntegrityError:
+        return Response({"error": "Barber is already booked at this time"}, status=status.HTTP_409_CONFLICT)
 
     return Response({"message": "Appointment rescheduled successfully"}, status=status.HTTP_200_OK)
 
@@ -113,13 +240,41 @@ def complete_appointment(request, appointment_id):
     POST /api/appointments/complete/<id>
     """
     try:
-        appointment = Appointment.objects.get(id=appointment_id)
-        appointment.status = 'completed'
-        appointment.save()
+        set_appointment_status(appointment_id, 'completed')
         return Response({"message": "Appointment marked as completed"}, status=status.HTTP_200_OK)
     except Appointment.DoesNotExist:
         return Response({"error": "Appointment not found"}, status=status.HTTP_404_NOT_FOUND)
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def bulk_update_appointments(request, action):
+    """
+    POST /api/appointments/bulk/<complete|cancel>
+    Expects: { "ids": [1, 2, 3] }
+    Returns {"results": [{"id": 1, "status": "completed"}, {"id": 2, "status": "not_found"}]}
+    """
+    new_status = BULK_ACTIONS.get(action)
+    if new_status is None:
+        return Response({"error": "Unknown action"}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        ids = parse_ids(request.data)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        locked = list(
+            Appointment.objects.select_for_update().filter(id__in=ids).order_by('id')
+            .values_list('appointment_date', 'barber_id', 'position', 'status')
+        )
+        for day in sorted({row[0] for row in locked}):
+            lock_booking_date(day)
+        results = bulk_set_status(Appointment, ids, new_status)
+        release_positions(row[:3] for row in locked if row[3] == 'pending')
+        touched = [(barber_id, day) for day, barber_id, _, _ in locked]
+        refresh_timetables(touched)
+        slot_cache.invalidate(touched)
+    return Response({"results": results}, status=status.HTTP_200_OK)
+
 @api_view(['DELETE'])
 @permission_classes([AllowAny])
 def delete_appointment(request, appointment_id):
@@ -127,41 +282,121 @@ def delete_appointment(request, appointment_id):
     DELETE /api/appointments/<id>
     """
     try:
-        appointment = Appointment.objects.get(id=appointment_id)
-        appointment.delete()
+        with transaction.atomic():
+            appointment = lock_appointment(appointment_id)
+            lock_booking_date(appointment.appointment_date)
+            appointment.delete()
+            if appointment.status == 'pending':
+                release_positions([(appointment.appointment_date, appointment.barber_id, appointment.position)])
+            refresh_timetables([(appointment.barber_id, appointment.appointment_date)])
+            slot_cache.invalidate([(appointment.barber_id, appointment.appointment_date)])
         return Response({"message": "Appointment deleted successfully"}, status=status.HTTP_200_OK)
     except Appointment.DoesNotExist:
         return Response({"error": "Appointment not found"}, status=status.HTTP_404_NOT_FOUND)
 
+# Helper function: whether a request asked for barber and service summaries with ?expand=1
+def expand_requested(params):
+    return params.get('expand') in ('1', 'true')
+
+# Helper function to encode the list position after an appointment
+def encode_appointment_cursor(appointment_date, appointment_time, appointment_id):
+    raw = f"{appointment_date.isoformat()}|{appointment_time.isoformat()}|{appointment_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+# Helper function returning the filter for appointments after a cursor, in
+# list order (date, time, id). Raises ValueError for a malformed cursor.
+def after_appointment_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_str, time_str, appointment_id = raw.split('|')
+        day, at, appointment_id = date.fromisoformat(date_str), datetime.fromisoformat(time_str), int(appointment_id)
+    except (UnicodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    return (
+        Q(appointment_date__gt=day)
+        | Q(appointment_date=day, appointment_time__gt=at)
+        | Q(appointment_date=day, appointment_time=at, id__gt=appointment_id)
+    )
+
+@reads_from_replica
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def list_appointments(request):
+    """
+    GET /api/appointments/list?start=YYYY-MM-DD&end=YYYY-MM-DD&barber=<id>&status=pending,scheduled&expand=1&limit=100&cursor=<cursor>
+    Returns one page of appointments in date and time order, from a single
+    query. With expand=1, 'barber' and 'service' hold summaries of the barber
+    and service instead of their ids. The cursor for the next page is
+    returned in the X-Next-Cursor header (absent on the last page).
+    """
+    params = request.query_params
+    try:
+        limit = max(1, min(int(params.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE))
+    except ValueError:
+        return Response({"error": "Invalid limit"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        # Same start / end / barber / status filters and order as the exports
+        appointments = export_queryset('appointments', params)
+        if params.get('cursor'):
+            appointments = appointments.filter(after_appointment_cursor(params['cursor']))
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = expanded_appointment_rows if expand_requested(params) else appointment_rows
+    page = list(rows.values(appointments)[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_cursor = encode_appointment_cursor(
+            rows.get(last, 'appointment_date'), rows.get(last, 'appointment_time'), rows.get(last, 'id')
+        )
+
+    response = Response(rows.serialize(page), status=status.HTTP_200_OK)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
+@reads_from_replica
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_appointments_by_date(request, date_str):
     """
-    GET /api/appointments/<YYYY-MM-DD>
+    GET /api/appointments/<YYYY-MM-DD>?include_archived=1&expand=1
     """
     try:
         date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         return Response({"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
     
-    appointments = Appointment.objects.filter(appointment_date=date_obj)
-    if not appointments.exists():
+    # Serialized straight from the rows; an empty result means no appointments
+    if expand_requested(request.query_params):
+        rows, archived_rows = expanded_appointment_rows, expanded_archived_appointment_rows
+    else:
+        rows, archived_rows = appointment_rows, archived_appointment_rows
+    appointments = rows.data(Appointment.objects.filter(appointment_date=date_obj))
+    if include_archived(request.query_params):
+        appointments += archived_rows.data(ArchivedAppointment.objects.filter(appointment_date=date_obj))
+    if not appointments:
         return Response({"message": "No appointments found for this date"}, status=status.HTTP_404_NOT_FOUND)
 
-    serializer = AppointmentSerializer(appointments, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(appointments, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_single_appointment(request, appointment_id):
     """
-    GET /api/appointments/<id>
+    GET /api/appointments/<id>?include_archived=1
     """
     try:
         appointment = Appointment.objects.get(id=appointment_id)
         serializer = AppointmentSerializer(appointment)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Appointment.DoesNotExist:
+        if include_archived(request.query_params):
+            archived = archived_appointment_rows.data(ArchivedAppointment.objects.filter(id=appointment_id))
+            if archived:
+                return Response(archived[0], status=status.HTTP_200_OK)
         return Response({"error": "Appointment not found"}, status=status.HTTP_404_NOT_FOUND)
     
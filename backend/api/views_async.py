@@ -0,0 +1,202 @@
+"""
+Async (ASGI-native) versions of the read-heavy polling endpoints.
+
+They return the same payloads as their sync counterparts but use Django's
+async ORM, so one ASGI worker can hold many concurrent pollers instead of
+tying up a thread per request. api/urls.py routes the read endpoints here
+when settings.ASYNC_READ_VIEWS is on.
+
+DRF's views are sync only, so async_api_view gives these the parts of
+@api_view they need: the configured authentication (SimpleJWT) and DRF's
+{"detail": ...} error responses.
+"""
+from datetime import datetime
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import aget_object_or_404
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+from . import catalog_cache, slot_cache
+from .archive import include_archived
+from .db_router import reads_from_replica
+from .models import Barber, Queue, Service
+from .row_serializers import archived_queue_rows, barber_rows, queue_rows, service_rows
+from .views_queue import (
+    archived_page_query, full_list_queries, full_list_requested, merge_archived_page, parse_queue_list_params,
+    pending_before_cursor, queue_page_query, queue_position_data, serialize_queue_page
+)
+from .views_schedule import booked_intervals_query, free_slot_labels, requested_service_id
+from .working_calendar import acalendar_for
+
+# DRF's @api_view(['GET']) answers HEAD too
+ALLOWED_METHODS = ('GET', 'HEAD')
+
+
+def async_api_view(view):
+    """
+    Wraps an async GET view like @api_view(['GET']) with the AllowAny
+    permission: a request with invalid credentials or another method gets
+    the same response as from the sync views, and request.user is set.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            if request.method not in ALLOWED_METHODS:
+                raise exceptions.MethodNotAllowed(request.method)
+            await sync_to_async(authenticate)(request)
+            return await view(request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            return exception_response(request, exc)
+    return wrapper
+
+
+def authenticators():
+    return [authenticator() for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+
+def authenticate(request):
+    """
+    Sets request.user from the request's credentials, as DRF does when a
+    view starts. Raises AuthenticationFailed for invalid ones.
+    """
+    request.user = Request(request, authenticators=authenticators()).user
+
+
+def exception_response(request, exc):
+    """
+    DRF's response to an exception raised in a view, as a JsonResponse.
+    """
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        # As APIView.handle_exception: 401 with the scheme to use, else 403
+        configured = authenticators()
+        header = configured[0].authenticate_header(request) if configured else None
+        if header:
+            exc.auth_header = header
+        else:
+            exc.status_code = 403
+    response = exception_handler(exc, {'request': request})
+    json_response = JsonResponse(response.data, status=response.status_code)
+    for header in ('WWW-Authenticate', 'Retry-After'):
+        if header in response:
+            json_response[header] = response[header]
+    if isinstance(exc, exceptions.MethodNotAllowed):
+        json_response['Allow'] = ', '.join(ALLOWED_METHODS)
+    return json_response
+
+
+def error_response(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+@reads_from_replica
+@async_api_view
+async def get_queue_position_by_id(request, queueid):
+    """
+    GET /api/queue/search/<queueid>?include_archived=1
+    """
+    try:
+        data = await sync_to_async(queue_position_data)(queueid, include_archived(request.GET))
+    except Queue.DoesNotExist:
+        return error_response("Queue entry not found", 404)
+    return JsonResponse(data)
+
+
+@reads_from_replica
+@async_api_view
+async def get_all_queue_entries(request):
+    """
+    GET /api/queue/list?status=pending,completed&limit=100&cursor=<cursor>&include_archived=1
+    """
+    try:
+        statuses, limit, cursor = parse_queue_list_params(request.GET)
+    except ValueError as exc:
+        return error_response(str(exc), 400)
+
+    if full_list_requested(request.GET):
+        rows = []
+        for query in full_list_queries(statuses, include_archived(request.GET)):
+            rows.extend([row async for row in query])
+        return JsonResponse(queue_rows.serialize(rows), safe=False)
+
+    offset_query = pending_before_cursor(statuses, cursor)
+    offset = await offset_query.acount() if offset_query is not None else 0
+
+    page = [row async for row in queue_rows.values(queue_page_query(statuses, cursor, offset))[:limit + 1]]
+    if include_archived(request.GET):
+        archived_query = archived_queue_rows.values(archived_page_query(statuses, cursor))[:limit + 1]
+        page = merge_archived_page(page, [row async for row in archived_query], limit)
+    serialized, next_cursor = serialize_queue_page(page, limit)
+
+    response = JsonResponse(serialized, safe=False)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@async_api_view
+async def get_available_slots(request, barber_id, date_str):
+    """
+    GET /api/schedule/<barber_id>/<YYYY-MM-DD>?service=<id>
+    """
+    try:
+        appointment_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return error_response("Invalid date format", 400)
+
+    async def build():
+        barber = await aget_object_or_404(Barber, id=barber_id)
+        duration = None
+        if service_id:
+            duration = await Service.objects.values_list('service_duration', flat=True).aget(id=service_id)
+        schedule = (await acalendar_for(barber)).schedule_on(appointment_date)
+        booked = [row async for row in booked_intervals_query(barber, appointment_date)] if schedule else []
+        return {"availableSlots": free_slot_labels(schedule, booked, duration)}
+
+    try:
+        service_id = requested_service_id(request.GET)
+        data, etag = await slot_cache.aget_payload(barber_id, appointment_date, service_id, build)
+    except Service.DoesNotExist:
+        return error_response("Service not found", 404)
+    return conditional_response(request, data, etag)
+
+
+def conditional_response(request, data, etag):
+    if catalog_cache.etag_matches(request, etag):
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse(data, safe=False)
+    response['ETag'] = f'"{etag}"'
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+async def catalog_response(request, name, abuild):
+    data, etag = await catalog_cache.aget_payload(name, abuild)
+    return conditional_response(request, data, etag)
+
+
+@async_api_view
+async def get_barbers(request):
+    """
+    GET /api/barbers
+    """
+    async def build():
+        rows = [row async for row in barber_rows.values(Barber.objects.order_by('created_at'))]
+        return barber_rows.serialize(rows)
+
+    return await catalog_response(request, 'barbers', build)
+
+
+@async_api_view
+async def get_services(request):
+    """
+    GET /api/services
+    """
+    async def build():
+        rows = [row async for row in service_rows.values(Service.objects.order_by('id'))]
+        return service_rows.serialize(rows)
+
+    return await catalog_response(request, 'services', build)
@@ -2,8 +2,13 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
+from . import catalog_cache, working_calendar
 from .models import Barber
+from .positions import pending_days, rebuild_positions
+from .row_serializers import barber_rows
 from .serializers import BarberSerializer
+from .views_appointment import lock_booking_date
 
 @api_view(['POST'])
 @permission_classes([AllowAny])  # only admin can add
@@ -15,6 +20,8 @@ def add_barber(request):
     serializer = BarberSerializer(data=request.data)
     if serializer.is_valid():
         barber = serializer.save()
+        catalog_cache.invalidate('barbers')
+        working_calendar.invalidate()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -24,9 +31,11 @@ def get_barbers(request):
     """
     GET /api/barbers
     """
-    barbers = Barber.objects.all().order_by('created_at')
-    serializer = BarberSerializer(barbers, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    def build():
+        return barber_rows.data(Barber.objects.order_by('created_at'))
+
+    # Served from the versioned catalog cache, with ETag / If-None-Match support
+    return catalog_cache.catalog_response(request, 'barbers', build)
 
 @api_view(['DELETE'])
 @permission_classes([AllowAny])  # only admin can delete
@@ -35,8 +44,17 @@ def delete_barber(request, barber_id):
     DELETE /api/barbers/<barber_id>
     """
     try:
-        barber = Barber.objects.get(id=barber_id)
-        barber.delete()
+        with transaction.atomic():
+            barber = Barber.objects.get(id=barber_id)
+            # Its appointments are deleted with it: renumber the dates where
+            # it had pending ones
+            days = sorted(pending_days(barber.id))
+            for day in days:
+                lock_booking_date(day)
+            barber.delete()
+            rebuild_positions(days)
+        catalog_cache.invalidate('barbers')
+        working_calendar.invalidate()
         return Response(status=status.HTTP_204_NO_CONTENT)
     except Barber.DoesNotExist:
         return Response({"error": "Barber not found"}, status=status.HTTP_404_NOT_FOUND)
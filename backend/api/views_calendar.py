@@ -0,0 +1,138 @@
+from datetime import datetime
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+from rest_framework import status
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from . import catalog_cache, working_calendar
+from .models import Barber, BarberWorkingHours, CalendarException
+from .serializers import BarberWorkingHoursSerializer, CalendarExceptionSerializer
+from .slots import format_minutes
+from .timetable import drop_timetables
+
+# Helper function to publish a calendar change once it commits: every process
+# recompiles its calendars, then the stored timetables it affects are dropped
+# (after the new version is out, so they are rebuilt with the new hours)
+def calendar_changed(barber_id=None, day=None):
+    working_calendar.invalidate()
+    transaction.on_commit(lambda: drop_timetables(barber_id, day))
+
+# Helper function to keep the Barber fields the weekly hours replaced
+# (available_days, working_hours_start / _end) summarizing them, as the
+# barber list and the admin still show them
+def sync_legacy_fields(barber_id):
+    rows = BarberWorkingHours.objects.filter(barber_id=barber_id).values_list('weekday', 'start', 'end')
+    hours = {weekday: (start, end) for weekday, start, end in rows}
+    if hours:
+        Barber.objects.filter(id=barber_id).update(**working_calendar.legacy_summary(hours))
+        catalog_cache.invalidate('barbers')
+
+# Helper function: "HH:MM" hours of a DaySchedule, or None on a day off
+def schedule_hours(schedule):
+    if schedule is None:
+        return None
+    return {"start": format_minutes(schedule.start_minute), "end": format_minutes(schedule.end_minute)}
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_barber_calendar(request, barber_id):
+    """
+    GET /api/barbers/<barber_id>/calendar?start=YYYY-MM-DD
+    The barber's weekly hours (null on days off) and the dates from 'start'
+    (default today) on that differ from them, as the slot engine sees them.
+    """
+    try:
+        barber = Barber.objects.get(id=barber_id)
+    except Barber.DoesNotExist:
+        return Response({"error": "Barber not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        if request.query_params.get('start'):
+            start = datetime.strptime(request.query_params['start'], "%Y-%m-%d").date()
+        else:
+            start = timezone.now().date()
+    except ValueError:
+        return Response({"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
+
+    calendar = working_calendar.calendar_for(barber)
+    return Response({
+        "barberId": barber.id,
+        "weekly": {
+            name: schedule_hours(schedule)
+            for name, schedule in zip(working_calendar.WEEKDAYS, calendar.weekly)
+        },
+        "exceptions": [
+            {"date": day.isoformat(), "hours": schedule_hours(schedule)}
+            for day, schedule in sorted(calendar.exceptions.items(), key=lambda item: item[0])
+            if day >= start
+        ],
+    }, status=status.HTTP_200_OK)
+
+@api_view(['PUT'])
+@permission_classes([IsAdminUser])
+def set_working_hours(request, barber_id):
+    """
+    PUT /api/barbers/<barber_id>/calendar/hours
+    Expects: [{"weekday": 0, "start": "09:00", "end": "17:00"}, ...]
+    (0 = Monday). Replaces the barber's weekly hours; weekdays left out
+    become days off. The barber's available_days and working_hours_start /
+    _end are updated to summarize them.
+    """
+    try:
+        barber = Barber.objects.get(id=barber_id)
+    except Barber.DoesNotExist:
+        return Response({"error": "Barber not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = BarberWorkingHoursSerializer(data=request.data, many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    weekdays = [row['weekday'] for row in serializer.validated_data]
+    if not weekdays:
+        # A barber without weekly rows falls back to available_days
+        return Response({"error": "Give the hours of at least one weekday"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(set(weekdays)) != len(weekdays):
+        return Response({"error": "Each weekday can be given once"}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        BarberWorkingHours.objects.filter(barber=barber).delete()
+        BarberWorkingHours.objects.bulk_create(
+            BarberWorkingHours(barber=barber, **row) for row in serializer.validated_data
+        )
+        sync_legacy_fields(barber.id)
+        calendar_changed(barber_id=barber.id)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def create_calendar_exception(request):
+    """
+    POST /api/calendar/exceptions
+    Expects: {"barber": 1, "day": "2025-12-24", "start": "09:00", "end": "13:00", "note": "..."}
+    Leave out 'barber' for the whole shop, and 'start' / 'end' for a day off.
+    """
+    serializer = CalendarExceptionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        with transaction.atomic():
+            exception = serializer.save()
+            calendar_changed(barber_id=exception.barber_id, day=exception.day)
+    except IntegrityError:
+        return Response({"error": "That date already has an exception"}, status=status.HTTP_409_CONFLICT)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+@api_view(['DELETE'])
+@permission_classes([IsAdminUser])
+def delete_calendar_exception(request, exception_id):
+    """
+    DELETE /api/calendar/exceptions/<exception_id>
+    """
+    with transaction.atomic():
+        try:
+            exception = CalendarException.objects.get(id=exception_id)
+        except CalendarException.DoesNotExist:
+            return Response({"error": "Calendar exception not found"}, status=status.HTTP_404_NOT_FOUND)
+        exception.delete()
+        calendar_changed(barber_id=exception.barber_id, day=exception.day)
+    return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,53 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework import status
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from .archive import include_archived
+from .exports import CONTENT_TYPES, export_queryset, stream_export
+
+# Helper function to pull a sync iterator from an async one, chunk by chunk.
+# Django would otherwise read a sync iterator whole before serving it over ASGI.
+async def iterate_in_thread(iterator):
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(iterator, None)) is not None:
+        yield chunk
+
+# Helper function shared by the export endpoints
+def export_response(request, dataset, export_format):
+    if export_format not in CONTENT_TYPES:
+        return Response({"error": "Unknown export format"}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        queryset = export_queryset(dataset, request.query_params)
+        archived_queryset = None
+        if include_archived(request.query_params):
+            archived_queryset = export_queryset(dataset, request.query_params, archived=True)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    chunks = stream_export(dataset, queryset, export_format, archived_queryset=archived_queryset)
+    if isinstance(request._request, ASGIRequest):
+        chunks = iterate_in_thread(chunks)
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{export_format}"'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_appointments(request, export_format):
+    """
+    GET /api/appointments/export/<csv|ndjson>?start=YYYY-MM-DD&end=YYYY-MM-DD&barber=<id>&status=completed,canceled&include_archived=1
+    Streams matching appointments in date and time order.
+    """
+    return export_response(request, 'appointments', export_format)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_queue(request, export_format):
+    """
+    GET /api/queue/export/<csv|ndjson>?start=YYYY-MM-DD&end=YYYY-MM-DD&status=completed&include_archived=1
+    Streams matching queue entries in ticket order.
+    """
+    return export_response(request, 'queue', export_format)
@@ -0,0 +1,59 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework import status
+from .imports import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, MAX_CHUNK_SIZE, run_import
+
+# Helper function shared by the import endpoints. The records come from the
+# multipart 'file' field or, for any other content type, the raw request body.
+def import_response(request, dataset, import_format):
+    if import_format not in IMPORT_FORMATS:
+        return Response({"error": "Unknown import format"}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        chunk_size = int(request.query_params.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except ValueError:
+        return Response({"error": "Invalid chunk_size"}, status=status.HTTP_400_BAD_REQUEST)
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    dry_run = request.query_params.get('dry_run') in ('1', 'true')
+
+    if request.content_type.startswith('multipart/form-data'):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Missing 'file'"}, status=status.HTTP_400_BAD_REQUEST)
+        stream = upload.file
+    else:
+        stream = request.stream
+    if stream is None:
+        return Response({"error": "Empty request body"}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Unreadable input still reports the chunks imported before it
+    report = run_import(dataset, stream, import_format, chunk_size, dry_run)
+    if 'error' in report:
+        return Response(report, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def import_barbers(request, import_format):
+    """
+    POST /api/barbers/import/<csv|json|ndjson>?chunk_size=500&dry_run=1
+    Returns {"imported": 10, "failed": 1, "errors": [{"row": 3, "errors": {"name": ["This field is required."]}}]}
+    """
+    return import_response(request, 'barbers', import_format)
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def import_services(request, import_format):
+    """
+    POST /api/services/import/<csv|json|ndjson>?chunk_size=500&dry_run=1
+    """
+    return import_response(request, 'services', import_format)
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def import_appointments(request, import_format):
+    """
+    POST /api/appointments/import/<csv|json|ndjson>?chunk_size=500&dry_run=1
+    'barber' and 'service' may be given by id or by name.
+    """
+    return import_response(request, 'appointments', import_format)
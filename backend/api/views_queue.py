@@ -2,9 +2,63 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+import base64
+import heapq
+from datetime import date
+from itertools import islice
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from .models import Queue
-from .serializers import QueueSerializer
+from .archive import include_archived
+from .bulk import bulk_set_status, parse_ids
+from .db_router import reads_from_replica
+from .events import publish_queue_event, stream_queue_events
+from .models import ArchivedQueue, Queue
+from .row_serializers import archived_queue_rows, queue_rows
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Bulk endpoint actions and the status they set
+BULK_ACTIONS = {'complete': 'completed', 'cancel': 'canceled'}
+
+# Helpers to filter entries whose ticket comes before / after a given ticket
+def ticket_before(ticket_day, ticket_number):
+    return Q(ticket_day__lt=ticket_day) | Q(ticket_day=ticket_day, ticket_number__lt=ticket_number)
+
+def ticket_after(ticket_day, ticket_number):
+    return Q(ticket_day__gt=ticket_day) | Q(ticket_day=ticket_day, ticket_number__gt=ticket_number)
+
+# Helper query: pending entries holding an earlier ticket than queue_entry;
+# served by the (status, ticket_day, ticket_number) index
+def pending_ahead_of(queue_entry):
+    return Queue.objects.filter(
+        ticket_before(queue_entry.ticket_day, queue_entry.ticket_number),
+        status='pending'
+    )
+
+# Helper function to calculate the position of a pending queue entry
+def calculate_queue_position(queue_entry):
+    if queue_entry.status != 'pending':
+        return 0
+    return pending_ahead_of(queue_entry).count() + 1
+
+def encode_cursor(ticket_day, ticket_number):
+    raw = f"{ticket_day.isoformat()}|{ticket_number}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """
+    Returns the (ticket_day, ticket_number) pair encoded in a cursor, or raises ValueError.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        ticket_day_str, ticket_number = raw.split('|')
+        return date.fromisoformat(ticket_day_str), int(ticket_number)
+    except (UnicodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -23,80 +77,213 @@ def create_queue_entry(request):
     if status_value not in valid_statuses:
         status_value = 'pending'
     
+    # Saving takes the next ticket of the day from an atomic counter
     queue_entry = Queue.objects.create(
         name=name,
         status=status_value
     )
     
     # Compute position if status is pending
-    position = 0
-    if queue_entry.status == 'pending':
-        pending_entries = Queue.objects.filter(status='pending').order_by('created_at')
-        # position is index in the sorted list
-        for idx, entry in enumerate(pending_entries, start=1):
-            if entry.id == queue_entry.id:
-                position = idx
-                break
+    position = calculate_queue_position(queue_entry)
+    publish_queue_event('joined', queue_entry.id, position)
     
-    return Response({"id": queue_entry.id, "position": position}, status=status.HTTP_201_CREATED)
+    return Response(
+        {"id": queue_entry.id, "ticket": queue_entry.ticket_number, "position": position},
+        status=status.HTTP_201_CREATED
+    )
 
+@reads_from_replica
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_all_queue_entries(request):
     """
-    GET /api/queue
-    Returns all queue entries, with positions computed for 'pending' ones.
+    GET /api/queue/list?status=pending,completed&limit=100&cursor=<cursor>&include_archived=1
+    Returns one page of queue entries in ticket order, with positions
+    computed for 'pending' ones. The cursor for the next page is returned in
+    the X-Next-Cursor header (absent on the last page). Archived entries are
+    only listed with include_archived.
+    Without limit and cursor, returns every entry as before pagination:
+    pending ones first, then the others.
     """
-    all_entries = Queue.objects.all()
-    pending_entries = []
-    other_entries = []
+    try:
+        statuses, limit, cursor = parse_queue_list_params(request.query_params)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-    for entry in all_entries:
-        if entry.status == 'pending':
-            pending_entries.append(entry)
-        else:
-            other_entries.append(entry)
-    
-    # Sort pending by created_at
-    pending_entries.sort(key=lambda x: x.created_at)
-    
-    # Assign positions
-    pending_serialized = []
-    for idx, entry in enumerate(pending_entries, start=1):
-        ser = QueueSerializer(entry).data
-        ser['position'] = idx
-        pending_serialized.append(ser)
-    
-    # For non-pending, position = 0
-    other_serialized = []
-    for entry in other_entries:
-        ser = QueueSerializer(entry).data
-        ser['position'] = 0
-        other_serialized.append(ser)
-    
-    # Combine
-    combined = pending_serialized + other_serialized
-    return Response(combined, status=status.HTTP_200_OK)
+    if full_list_requested(request.query_params):
+        rows = []
+        for query in full_list_queries(statuses, include_archived(request.query_params)):
+            rows.extend(query)
+        return Response(queue_rows.serialize(rows), status=status.HTTP_200_OK)
+
+    # Pending entries before the cursor offset the positions on this page
+    offset_query = pending_before_cursor(statuses, cursor)
+    offset = offset_query.count() if offset_query is not None else 0
+
+    page = list(queue_rows.values(queue_page_query(statuses, cursor, offset))[:limit + 1])
+    if include_archived(request.query_params):
+        archived_page = list(archived_queue_rows.values(archived_page_query(statuses, cursor))[:limit + 1])
+        page = merge_archived_page(page, archived_page, limit)
+    serialized, next_cursor = serialize_queue_page(page, limit)
+
+    response = Response(serialized, status=status.HTTP_200_OK)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
 
+def parse_queue_list_params(params):
+    """
+    Returns (statuses, limit, cursor) from the queue list query parameters,
+    where cursor is a (ticket_day, ticket_number) pair or None.
+    Raises ValueError with a client-facing message.
+    """
+    valid_statuses = [choice for choice, _ in Queue.STATUS_CHOICES]
+    statuses = [value for value in params.get('status', '').split(',') if value]
+    if any(value not in valid_statuses for value in statuses):
+        raise ValueError("Invalid status")
+
+    try:
+        limit = int(params.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("Invalid limit")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    cursor = params.get('cursor')
+    return statuses, limit, decode_cursor(cursor) if cursor else None
+
+# Helper function: whether a client asked for the unpaginated list, as the
+# ones written before pagination do by sending neither limit nor cursor
+def full_list_requested(params):
+    return 'limit' not in params and 'cursor' not in params
+
+def full_list_queries(statuses, archived):
+    """
+    Row queries of the unpaginated list, in response order: pending entries
+    in ticket order (positions 1, 2, ...), then the other live entries and,
+    when 'archived', the archived ones, in ticket order with position 0.
+    """
+    statuses = statuses or [choice for choice, _ in Queue.STATUS_CHOICES]
+    others = [value for value in statuses if value != 'pending']
+    queries = []
+    if 'pending' in statuses:
+        queries.append(queue_rows.values(queue_page_query(['pending'], None, 0)))
+    if others:
+        queries.append(queue_rows.values(queue_page_query(others, None, 0)))
+        if archived:
+            queries.append(archived_queue_rows.values(archived_page_query(others, None)))
+    return queries
+
+def pending_before_cursor(statuses, cursor):
+    """
+    Query counting the pending entries up to and including the cursor, or
+    None when no offset is needed.
+    """
+    if cursor is None or (statuses and 'pending' not in statuses):
+        return None
+    ticket_day, ticket_number = cursor
+    return Queue.objects.filter(ticket_before(ticket_day, ticket_number + 1), status='pending')
+
+def queue_page_query(statuses, cursor, offset):
+    entries = Queue.objects.all()
+    if statuses:
+        entries = entries.filter(status__in=statuses)
+    if cursor is not None:
+        entries = entries.filter(ticket_after(*cursor))
+
+    # Number pending rows inside the database with a running count in page
+    # order, so the window streams alongside the index scan; others get 0
+    pending_count = Window(
+        Sum(Case(When(status='pending', then=Value(1)), default=Value(0))),
+        order_by=[F('ticket_day').asc(), F('ticket_number').asc()],
+    )
+    return entries.annotate(
+        position=Case(
+            When(status='pending', then=pending_count + Value(offset)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    ).order_by('ticket_day', 'ticket_number')
+
+def archived_page_query(statuses, cursor):
+    """
+    Archived entries for a list page; they are never pending, so they don't
+    change the positions of live entries.
+    """
+    entries = ArchivedQueue.objects.annotate(position=Value(0))
+    if statuses:
+        entries = entries.filter(status__in=statuses)
+    if cursor is not None:
+        entries = entries.filter(ticket_after(*cursor))
+    return entries.order_by('ticket_day', 'ticket_number')
+
+def merge_archived_page(page, archived_page, limit):
+    """
+    Merges live and archived rows of a page in ticket order, keeping limit + 1.
+    """
+    ticket_day, ticket_number = queue_rows.index['ticket_day'], queue_rows.index['ticket_number']
+    merged = heapq.merge(page, archived_page, key=lambda row: (row[ticket_day], row[ticket_number]))
+    return list(islice(merged, limit + 1))
+
+def serialize_queue_page(page, limit):
+    """
+    Serializes up to 'limit' rows of a page fetched with limit + 1 rows of
+    queue_rows.values(queue_page_query(...)).
+    Returns (data, next_cursor), next_cursor being None on the last page.
+    """
+    has_next = len(page) > limit
+    page = page[:limit]
+
+    next_cursor = None
+    if has_next:
+        last = page[-1]
+        next_cursor = encode_cursor(queue_rows.get(last, 'ticket_day'), queue_rows.get(last, 'ticket_number'))
+    return queue_rows.serialize(page), next_cursor
+
+@reads_from_replica
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_queue_position_by_id(request, queueid):
     """
-    GET /api/queue/search/<queueid>
+    GET /api/queue/search/<queueid>?include_archived=1
     """
     try:
-        queue_entry = Queue.objects.get(id=queueid)
+        data = queue_position_data(queueid, include_archived(request.query_params))
     except Queue.DoesNotExist:
         return Response({"error": "Queue entry not found"}, status=status.HTTP_404_NOT_FOUND)
-    
-    position = 0
-    if queue_entry.status == 'pending':
-        pending_entries = Queue.objects.filter(status='pending').order_by('created_at')
-        for idx, entry in enumerate(pending_entries, start=1):
-            if entry.id == queue_entry.id:
-                position = idx
-                break
-    return Response({"id": queue_entry.id, "position": position}, status=status.HTTP_200_OK)
+    return Response(data, status=status.HTTP_200_OK)
+
+# Helper function: {"id", "ticket", "position"} of a queue entry, looking at
+# the archived entries too when 'archived'. Shared with the async view.
+# Raises Queue.DoesNotExist.
+def queue_position_data(queueid, archived=False):
+    try:
+        queue_entry = Queue.objects.get(id=queueid)
+    except Queue.DoesNotExist:
+        entry = ArchivedQueue.objects.filter(id=queueid).first() if archived else None
+        if entry is None:
+            raise
+        return {"id": entry.id, "ticket": entry.ticket_number, "position": 0}
+    return {"id": queue_entry.id, "ticket": queue_entry.ticket_number, "position": calculate_queue_position(queue_entry)}
+
+# Helper function to take an entry out of the queue, setting new_status or
+# deleting it when new_status is None. The row is locked and moved out of
+# 'pending' by a conditional write, so when requests race on the same entry
+# only the one that actually took it out of the queue publishes 'left'.
+# Raises Queue.DoesNotExist.
+def leave_queue(queue_id, new_status):
+    with transaction.atomic():
+        queue_entry = Queue.objects.select_for_update().get(id=queue_id)
+        entry = Queue.objects.filter(id=queue_id)
+        if new_status is None:
+            left = entry.filter(status='pending').delete()[0]
+            if not left:
+                entry.delete()
+        else:
+            left = entry.filter(status='pending').update(status=new_status)
+            if not left:
+                entry.update(status=new_status)
+        position = pending_ahead_of(queue_entry).count() + 1 if left else 0
+        publish_queue_event('left', queue_id, position)
 
 @api_view(['DELETE'])
 @permission_classes([AllowAny])
@@ -105,8 +292,7 @@ def remove_from_queue(request, queue_id):
     DELETE /api/queue/<id>
     """
     try:
-        queue_entry = Queue.objects.get(id=queue_id)
-        queue_entry.delete()
+        leave_queue(queue_id, None)
         return Response({"message": "Queue entry removed"}, status=status.HTTP_200_OK)
     except Queue.DoesNotExist:
         return Response({"error": "Queue entry not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -118,9 +304,7 @@ def complete_queue_entry(request, queue_id):
     POST /api/queue/complete/<id>
     """
     try:
-        queue_entry = Queue.objects.get(id=queue_id)
-        queue_entry.status = 'completed'
-        queue_entry.save()
+        leave_queue(queue_id, 'completed')
         return Response({"message": "Queue entry completed"}, status=status.HTTP_200_OK)
     except Queue.DoesNotExist:
         return Response({"error": "Queue entry not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -132,9 +316,57 @@ def cancel_queue_entry(request, queue_id):
     POST /api/queue/cancel/<id>
     """
     try:
-        queue_entry = Queue.objects.get(id=queue_id)
-        queue_entry.status = 'canceled'
-        queue_entry.save()
+        leave_queue(queue_id, 'canceled')
         return Response({"message": "Queue entry canceled"}, status=status.HTTP_200_OK)
     except Queue.DoesNotExist:
         return Response({"error": "Queue entry not found"}, status=status.HTTP_404_NOT_FOUND)
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def bulk_update_queue_entries(request, action):
+    """
+    POST /api/queue/bulk/<complete|cancel>
+    Expects: { "ids": [1, 2, 3] }
+    Returns {"results": [{"id": 1, "status": "completed"}, {"id": 2, "status": "not_found"}]}
+    """
+    new_status = BULK_ACTIONS.get(action)
+    if new_status is None:
+        return Response({"error": "Unknown action"}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        ids = parse_ids(request.data)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        # Lock the rows first, so a concurrent request for the same entries
+        # waits and then no longer finds them pending
+        list(Queue.objects.select_for_update().filter(id__in=ids).order_by('id').values_list('id', flat=True))
+        # Positions of the pending entries leaving the queue, in one query
+        earlier_pending = Queue.objects.filter(
+            Q(ticket_day__lt=OuterRef('ticket_day')) |
+            Q(ticket_day=OuterRef('ticket_day'), ticket_number__lt=OuterRef('ticket_number')),
+            status='pending'
+        ).order_by().values('status').annotate(count=Count('id')).values('count')
+        leaving = Queue.objects.filter(id__in=ids, status='pending').annotate(
+            position=Coalesce(Subquery(earlier_pending), 0) + 1
+        ).values_list('id', 'position')
+        # Latest position first, so each event is still valid after the ones before it
+        for entry_id, position in sorted(leaving, key=lambda row: -row[1]):
+            publish_queue_event('left', entry_id, position)
+
+        results = bulk_set_status(Queue, ids, new_status)
+    return Response({"results": results}, status=status.HTTP_200_OK)
+
+async def queue_events(request):
+    """
+    GET /api/queue/events
+    Server-Sent Events stream of queue changes, e.g.
+    event: left
+    data: {"type": "left", "id": 12, "position": 3}
+    A client at a later position than a 'left' event moves up by one.
+    Needs an ASGI server (barberqueue.asgi) to hold connections open.
+    """
+    response = StreamingHttpResponse(stream_queue_events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
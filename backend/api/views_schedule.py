@@ -1,50 +1,239 @@
+import heapq
+from collections import defaultdict
 from datetime import datetime, timedelta
+from itertools import islice
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import AllowAny
-from .models import Barber, Appointment
+from django.utils import timezone
+from . import slot_cache
+from .catalog_cache import conditional_response
+from .db_router import reads_from_replica
+from .models import Barber, Appointment, Service
+from .slots import booking_interval, format_minutes, to_minutes
+from .timetable import get_timetable
+from .working_calendar import calendar_for
+
+MAX_SEARCH_DAYS = 31
+MAX_NEXT_SLOTS = 100
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_available_slots(request, barber_id, date_str):
     """
-    GET /api/schedule/<barber_id>/<YYYY-MM-DD>
+    GET /api/schedule/<barber_id>/<YYYY-MM-DD>?service=<id>
+    With a service, only start times where the whole service fits are returned.
+    Served from the per barber-day slot cache, with ETag / If-None-Match support.
     """
+    # Convert date_str (YYYY-MM-DD) to a date
     try:
+        appointment_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return Response({"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
+
+    def build():
         barber = get_object_or_404(Barber, id=barber_id)
-    except Barber.DoesNotExist:
-        return Response({"error": "Barber not found"}, status=status.HTTP_404_NOT_FOUND)
+        duration = requested_duration(request)
 
-    # Convert date_str (YYYY-MM-DD) to a date
+        # The barber's hours that day from the compiled working calendar; no
+        # slots (and no bookings to load) on a day off
+        schedule = calendar_for(barber).schedule_on(appointment_date)
+        booked = booked_intervals_query(barber, appointment_date) if schedule else ()
+        return {"availableSlots": free_slot_labels(schedule, booked, duration)}
+
+    # Rebuilt only after a write to this barber-day (api.slot_cache); errors
+    # aren't cached
     try:
-        appointment_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        service_id = requested_service_id(request.query_params)
+        data, etag = slot_cache.get_payload(barber_id, appointment_date, service_id, build)
+    except Service.DoesNotExist:
+        return Response({"error": "Service not found"}, status=status.HTTP_404_NOT_FOUND)
+    return conditional_response(request, data, etag)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_barber_timetable(request, barber_id, date_str):
+    """
+    GET /api/schedule/<barber_id>/<YYYY-MM-DD>/timetable
+    The barber's whole day for the front desk: bookings (with customer and
+    service) in time order, and the free slot start times.
+    """
+    try:
+        day = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         return Response({"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Generate all possible slots
-    slots = generate_time_slots(
-        date_str,
-        barber.working_hours_start.strftime("%H:%M"),
-        barber.working_hours_end.strftime("%H:%M"),
-        barber.slot_duration
-    )
+    # Precomputed and kept current by the appointment writes (api.timetable);
+    # days built on read come from 'default', not a lagging replica
+    timetable = get_timetable(barber_id, day)
+    if timetable is None:
+        return Response({"error": "Barber not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(timetable, status=status.HTTP_200_OK)
 
-    # Get all appointments for that barber on the given date, with status pending or scheduled
-    appointments = Appointment.objects.filter(
+def booked_intervals_query(barber, appointment_date):
+    """
+    (appointment_time, service_duration) of the barber's active bookings that day.
+    """
+    return Appointment.objects.filter(
         barber=barber,
         appointment_date=appointment_date,
         status__in=['pending', 'scheduled']
+    ).values_list('appointment_time', 'service__service_duration')
+
+def free_slot_labels(schedule, booked, duration=None):
+    """
+    "HH:MM" start times of the day's DaySchedule (None on a day off) left
+    free by the booked (appointment_time, service_duration) rows.
+    """
+    if schedule is None:
+        return []
+
+    # Block every slot a booking covers and keep the start times where the
+    # requested service fits; strings are only built for the response
+    booked_mask = schedule.mask_overlapping(
+        booking_interval(appointment_time, service_duration, schedule.step)
+        for appointment_time, service_duration in booked
     )
+    return schedule.labels_for(schedule.free_mask(booked_mask, duration))
 
-    # Collect the times (HH:MM) that are booked
-    booked_slots = {appt.appointment_time.strftime("%H:%M") for appt in appointments}
+def requested_service_id(params):
+    """
+    The ?service=<id> of a slot request as an int, or None.
+    Raises Service.DoesNotExist when it can't be a service id.
+    """
+    value = params.get('service')
+    if not value:
+        return None
+    if not value.isdigit():
+        raise Service.DoesNotExist
+    return int(value)
+
+def requested_duration(request):
+    """
+    Duration in minutes of the service given by ?service=<id>, or None.
+    Raises Service.DoesNotExist for an unknown service.
+    """
+    service_id = requested_service_id(request.query_params)
+    if service_id is None:
+        return None
+    return Service.objects.values_list('service_duration', flat=True).get(id=service_id)
+
+def load_booked_masks(schedules, start_date, end_date):
+    """
+    Booked-slot bitmasks keyed by (barber_id, date) for the DaySchedules keyed
+    by (barber_id, date) over a date range, loaded with a single query.
+    """
+    masks = defaultdict(int)
+    booked = Appointment.objects.filter(
+        barber_id__in={barber_id for barber_id, _ in schedules},
+        appointment_date__range=(start_date, end_date),
+        status__in=['pending', 'scheduled']
+    ).values_list('barber_id', 'appointment_date', 'appointment_time', 'service__service_duration')
+    for barber_id, appointment_date, appointment_time, service_duration in booked:
+        schedule = schedules.get((barber_id, appointment_date))
+        if schedule is None:
+            # Bookings left on a day the barber no longer works
+            continue
+        interval = booking_interval(appointment_time, service_duration, schedule.step)
+        masks[barber_id, appointment_date] |= schedule.mask_overlapping((interval,))
+    return masks
+
+@reads_from_replica
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_available_slots(request):
+    """
+    GET /api/schedule/search?barbers=1,2&start=YYYY-MM-DD&end=YYYY-MM-DD
+    Returns available slots per barber per day over the date range.
+    With ?service=<id>, only start times where that service fits are returned.
+    With ?next=K, returns instead the next K free slots across the barbers,
+    earliest first, starting from 'start' (default today) within the range.
+    'barbers' defaults to all barbers, 'end' to 'start' (or 'start' plus
+    MAX_SEARCH_DAYS - 1 days when 'next' is given).
+    """
+    params = request.query_params
+    try:
+        barber_ids = [int(value) for value in params.get('barbers', '').split(',') if value]
+        if params.get('start'):
+            start_date = datetime.strptime(params['start'], "%Y-%m-%d").date()
+        else:
+            start_date = timezone.now().date()
+        next_count = int(params['next']) if params.get('next') else None
+        if params.get('end'):
+            end_date = datetime.strptime(params['end'], "%Y-%m-%d").date()
+        elif next_count is not None:
+            end_date = start_date + timedelta(days=MAX_SEARCH_DAYS - 1)
+        else:
+            end_date = start_date
+    except ValueError:
+        return Response({"error": "Invalid search parameters"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        duration = requested_duration(request)
+    except Service.DoesNotExist:
+        return Response({"error": "Service not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    if end_date < start_date or (end_date - start_date).days >= MAX_SEARCH_DAYS:
+        return Response(
+            {"error": f"Date range must cover 1 to {MAX_SEARCH_DAYS} days"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-    # Filter out the booked slots
-    available_slots = [slot for slot in slots if slot not in booked_slots]
+    barbers = Barber.objects.all().order_by('id')
+    if barber_ids:
+        barbers = barbers.filter(id__in=barber_ids)
+    dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    # Each barber's hours per day from the compiled working calendars; days
+    # off have no schedule
+    schedules = {}
+    for barber in barbers:
+        calendar = calendar_for(barber)
+        for day in dates:
+            schedule = calendar.schedule_on(day)
+            if schedule is not None:
+                schedules[barber.id, day] = schedule
+    masks = load_booked_masks(schedules, start_date, end_date)
 
-    return Response({"availableSlots": available_slots}, status=status.HTTP_200_OK)
+    if next_count is None:
+        availability = [
+            {
+                "barberId": barber.id,
+                "date": day.isoformat(),
+                "availableSlots": free_labels(schedules.get((barber.id, day)), masks[barber.id, day], duration),
+            }
+            for barber in barbers
+            for day in dates
+        ]
+        return Response({"availability": availability}, status=status.HTTP_200_OK)
+
+    # Merge each barber-day's free slots (already in time order) and take the first K
+    now = timezone.now()
+    now_minutes = to_minutes(now)
+
+    def free_slots(barber_id, day, schedule):
+        for minute in schedule.iter_offsets(schedule.free_mask(masks[barber_id, day], duration)):
+            if day > now.date() or (day == now.date() and minute >= now_minutes):
+                yield (day, minute, barber_id)
+
+    merged = heapq.merge(*(
+        free_slots(barber_id, day, schedule)
+        for (barber_id, day), schedule in schedules.items()
+    ))
+    next_slots = [
+        {"barberId": barber_id, "date": day.isoformat(), "time": format_minutes(minute)}
+        for day, minute, barber_id in islice(merged, max(0, min(next_count, MAX_NEXT_SLOTS)))
+    ]
+    return Response({"nextSlots": next_slots}, status=status.HTTP_200_OK)
+
+def free_labels(schedule, booked_mask, duration):
+    """
+    "HH:MM" free start times of a DaySchedule, or none on a day off.
+    """
+    if schedule is None:
+        return []
+    return schedule.labels_for(schedule.free_mask(booked_mask, duration))
 
 def generate_time_slots(date_str, start_time, end_time, slot_duration):
     """
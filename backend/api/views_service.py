@@ -1,8 +1,12 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
+from . import catalog_cache
 from .models import Service
+from .row_serializers import service_rows
 from .serializers import ServiceSerializer
+from .timetable import drop_service_timetables
 
 @api_view(['POST'])
 def create_service(request):
@@ -19,6 +23,7 @@ def create_service(request):
     serializer = ServiceSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save()
+        catalog_cache.invalidate('services')
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -27,9 +32,11 @@ def get_services(request):
     """
     Retrieve a list of all Services.
     """
-    services = Service.objects.all().order_by('id')
-    serializer = ServiceSerializer(services, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    def build():
+        return service_rows.data(Service.objects.order_by('id'))
+
+    # Served from the versioned catalog cache, with ETag / If-None-Match support
+    return catalog_cache.catalog_response(request, 'services', build)
 
 @api_view(['DELETE'])
 def delete_service(request, service_id):
@@ -41,7 +48,11 @@ def delete_service(request, service_id):
     except Service.DoesNotExist:
         return Response({"error": "Service not found"}, status=status.HTTP_404_NOT_FOUND)
     
-    service.delete()
+    with transaction.atomic():
+        # Read the affected timetables before deleting clears the service
+        drop_service_timetables(service.id)
+        service.delete()
+        catalog_cache.invalidate('services')
     return Response({"message": "Service deleted successfully"}, status=status.HTTP_200_OK)
 
 @api_view(['PUT'])
@@ -57,6 +68,9 @@ def update_service(request, service_id):
     
     serializer = ServiceSerializer(service, data=request.data, partial=True)
     if serializer.is_valid():
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+            drop_service_timetables(service.id)
+            catalog_cache.invalidate('services')
         return Response(serializer.data, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
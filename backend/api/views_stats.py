@@ -0,0 +1,25 @@
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework import status
+from .stats import registry
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_request_stats(request):
+    """
+    GET /api/stats
+    Per-route latency and database cost of the API requests sampled by this
+    worker process: {"pid": 1234, "routes": {"GET api/queue/list/": {...}}}
+    """
+    return Response(registry.snapshot(), status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_metrics(request):
+    """
+    GET /api/metrics
+    The same statistics in the Prometheus text format.
+    """
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4')
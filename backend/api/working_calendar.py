@@ -0,0 +1,187 @@
+"""
+Working calendar: when each barber works on a given date.
+
+The calendar is stored normalized, as weekly hours (BarberWorkingHours) and
+holidays or one-off changes per date (CalendarException, per barber or for
+the whole shop). compile_calendars() turns it into one WorkingCalendar per
+barber: a DaySchedule (or None for a day off) per weekday, plus a dict of
+the dates that differ. "Does barber X work on date D, and when?" is then a
+dict lookup and a tuple index.
+
+The compiled calendars are kept per process under a version stored in the
+shared cache; calendar writes call invalidate(), which moves every process
+to a new version once the transaction commits, so each recompiles on its
+next lookup.
+"""
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, transaction
+from .catalog_cache import get_cache
+from .models import Barber, BarberWorkingHours, CalendarException
+from .slots import get_day_schedule, to_minutes
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+# Barber.available_days value of a barber working every day
+EVERY_DAY = ','.join(WEEKDAYS)
+
+VERSION_KEY = 'calendar:version'
+
+_compiled = (None, {})
+_compile_lock = threading.Lock()
+
+
+class WorkingCalendar:
+    """
+    One barber's compiled calendar: 'weekly' holds the DaySchedule of each
+    weekday (None on days off) and 'exceptions' the DaySchedule (or None)
+    of each date that differs from its weekday.
+    """
+    __slots__ = ('weekly', 'exceptions')
+
+    def __init__(self, weekly, exceptions):
+        self.weekly = weekly
+        self.exceptions = exceptions
+
+    def schedule_on(self, day):
+        """
+        DaySchedule of the barber's hours on that date, or None when the
+        barber doesn't work then.
+        """
+        if day in self.exceptions:
+            return self.exceptions[day]
+        return self.weekly[day.weekday()]
+
+    def works_on(self, day):
+        return self.schedule_on(day) is not None
+
+
+def legacy_weekly_hours(working_hours_start, working_hours_end, available_days):
+    """
+    {weekday: (start, end)} minutes from the Barber fields, for barbers
+    without BarberWorkingHours rows. Unknown day names are ignored.
+    """
+    hours = (to_minutes(working_hours_start), to_minutes(working_hours_end))
+    names = {name.strip().lower() for name in (available_days or '').split(',')}
+    return {weekday: hours for weekday, name in enumerate(WEEKDAYS) if name.lower() in names}
+
+
+def legacy_summary(weekly_hours):
+    """
+    Barber field values summarizing {weekday: (start, end)} times: the days
+    worked, the earliest start and the latest end. The reverse of
+    legacy_weekly_hours() when every day has the same hours.
+    """
+    return {
+        'available_days': ','.join(WEEKDAYS[weekday] for weekday in sorted(weekly_hours)),
+        'working_hours_start': min(start for start, _ in weekly_hours.values()),
+        'working_hours_end': max(end for _, end in weekly_hours.values()),
+    }
+
+
+def compile_calendar(weekly_hours, exceptions, slot_duration):
+    """
+    WorkingCalendar from {weekday: (start, end)} and {date: (start, end) or None}
+    minutes.
+    """
+    def schedule(hours):
+        return get_day_schedule(*hours, slot_duration) if hours is not None else None
+
+    return WorkingCalendar(
+        tuple(schedule(weekly_hours.get(weekday)) for weekday in range(7)),
+        {day: schedule(hours) for day, hours in exceptions.items()},
+    )
+
+
+def exception_hours(start, end):
+    return (to_minutes(start), to_minutes(end)) if start is not None and end is not None else None
+
+
+def compile_calendars():
+    """
+    WorkingCalendar of every barber, keyed by barber id, from three queries.
+    Reads the primary database, so a freshly invalidated calendar can't be
+    compiled from a lagging replica.
+    """
+    weekly = {}
+    for barber_id, weekday, start, end in BarberWorkingHours.objects.using(DEFAULT_DB_ALIAS).values_list(
+        'barber_id', 'weekday', 'start', 'end'
+    ):
+        weekly.setdefault(barber_id, {})[weekday] = (to_minutes(start), to_minutes(end))
+
+    shop_exceptions = {}
+    barber_exceptions = {}
+    for barber_id, day, start, end in CalendarException.objects.using(DEFAULT_DB_ALIAS).values_list(
+        'barber_id', 'day', 'start', 'end'
+    ):
+        target = shop_exceptions if barber_id is None else barber_exceptions.setdefault(barber_id, {})
+        target[day] = exception_hours(start, end)
+
+    calendars = {}
+    for barber_id, start, end, available_days, slot_duration in Barber.objects.using(DEFAULT_DB_ALIAS).values_list(
+        'id', 'working_hours_start', 'working_hours_end', 'available_days', 'slot_duration'
+    ):
+        hours = weekly.get(barber_id)
+        if hours is None:
+            hours = legacy_weekly_hours(start, end, available_days)
+        # A barber's own exception wins over the shop's for the same date
+        exceptions = {**shop_exceptions, **barber_exceptions.get(barber_id, {})}
+        calendars[barber_id] = compile_calendar(hours, exceptions, slot_duration)
+    return calendars
+
+
+def get_version():
+    return get_cache().get_or_set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def calendars_for_version(version):
+    global _compiled
+    compiled_version, calendars = _compiled
+    if compiled_version == version:
+        return calendars
+    with _compile_lock:
+        compiled_version, calendars = _compiled
+        if compiled_version != version:
+            calendars = compile_calendars()
+            _compiled = (version, calendars)
+    return calendars
+
+
+def get_calendars():
+    """
+    The compiled calendars of the current version, compiled on first use.
+    """
+    return calendars_for_version(get_version())
+
+
+def fallback_calendar(barber):
+    # A barber created after the calendars were compiled without invalidating them
+    return compile_calendar(
+        legacy_weekly_hours(barber.working_hours_start, barber.working_hours_end, barber.available_days),
+        {}, barber.slot_duration
+    )
+
+
+def calendar_for(barber):
+    """
+    The WorkingCalendar of a Barber instance.
+    """
+    calendar = get_calendars().get(barber.id)
+    return calendar if calendar is not None else fallback_calendar(barber)
+
+
+async def acalendar_for(barber):
+    """
+    Async calendar_for, for async views.
+    """
+    version = await get_cache().aget_or_set(VERSION_KEY, time.time_ns(), timeout=None)
+    calendars = _compiled[1] if _compiled[0] == version else await sync_to_async(calendars_for_version)(version)
+    calendar = calendars.get(barber.id)
+    return calendar if calendar is not None else fallback_calendar(barber)
+
+
+def invalidate():
+    """
+    Moves the calendars to a new version once the current transaction commits.
+    """
+    transaction.on_commit(lambda: get_cache().set(VERSION_KEY, time.time_ns(), timeout=None))
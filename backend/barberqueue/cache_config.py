@@ -0,0 +1,48 @@
+"""
+Cache settings read from the environment, like db_config does for the
+database:
+
+    CACHE_URL
+        The 'default' cache. The barber and service catalogs, the available
+        slots, the working calendar versions and the replica pins live
+        there, so every worker must see the same cache:
+        redis://host:port/db (or rediss://) for Redis (default
+        redis://localhost:6379/1), memcached://host:port[,host:port] for
+        Memcached (needs pymemcache). locmem:// keeps a cache per process,
+        which only suits a single worker; the api.E001 check reports it.
+    CACHE_KEY_PREFIX
+        Prefix of every key, when several deployments share one server.
+"""
+import os
+from django.core.exceptions import ImproperlyConfigured
+
+DEFAULT_CACHE_URL = 'redis://localhost:6379/1'
+
+BACKENDS = {
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+def cache_settings(environ=os.environ):
+    """
+    CACHES from the environment; unset variables keep the development
+    default of a local Redis.
+    """
+    url = environ.get('CACHE_URL', '').strip() or DEFAULT_CACHE_URL
+    scheme, _, location = url.partition('://')
+    if scheme not in BACKENDS:
+        raise ImproperlyConfigured(f"CACHE_URL must start with {', '.join(name + '://' for name in BACKENDS)}")
+
+    default = {'BACKEND': BACKENDS[scheme]}
+    if scheme in ('redis', 'rediss'):
+        default['LOCATION'] = url
+    elif scheme == 'memcached':
+        default['LOCATION'] = location.split(',')
+    else:
+        default['LOCATION'] = location
+    if environ.get('CACHE_KEY_PREFIX'):
+        default['KEY_PREFIX'] = environ['CACHE_KEY_PREFIX']
+    return {'default': default}
@@ -0,0 +1,86 @@
+"""
+Database settings read from the environment, so each deployment can tune
+connection handling without editing settings.py:
+
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+        Connection parameters of the primary database.
+    DB_CONN_MAX_AGE
+        Seconds a connection is kept open for later requests (default 60);
+        0 opens a new connection for every request.
+    DB_CONN_HEALTH_CHECKS
+        Ping a persistent connection before reusing it (default on), so a
+        connection dropped by the server doesn't fail the next request.
+    DB_POOL
+        Use psycopg 3's connection pool instead of persistent connections
+        (default off). Pool connections are shared between the threads of a
+        process, which suits ASGI, where persistent connections don't help.
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+        Connections kept open, the most the pool opens, and seconds a
+        request waits for a free connection before failing.
+    DB_REPLICA_HOST, DB_REPLICA_PORT
+        Adds a 'replica' database for the read-only endpoints (api.db_router).
+"""
+import os
+from django.core.exceptions import ImproperlyConfigured
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+def env_bool(environ, name, default):
+    value = environ.get(name, '').strip().lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ImproperlyConfigured(f"{name} must be one of {', '.join(TRUE_VALUES + FALSE_VALUES)}")
+
+
+def env_int(environ, name, default):
+    value = environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f"{name} must be an integer")
+
+
+def database_settings(environ=os.environ):
+    """
+    DATABASES from the environment; unset variables keep the development
+    defaults of a local 'barberqueue_db'.
+    """
+    default = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': environ.get('DB_NAME', 'barberqueue_db'),
+        'USER': environ.get('DB_USER', 'postgres'),
+        'PASSWORD': environ.get('DB_PASSWORD', '00oo00oo'),
+        'HOST': environ.get('DB_HOST', 'localhost'),
+        'PORT': environ.get('DB_PORT', '5432'),
+        'CONN_MAX_AGE': env_int(environ, 'DB_CONN_MAX_AGE', 60),
+        'CONN_HEALTH_CHECKS': env_bool(environ, 'DB_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': {},
+    }
+    if env_bool(environ, 'DB_POOL', False):
+        default['OPTIONS']['pool'] = {
+            'min_size': env_int(environ, 'DB_POOL_MIN_SIZE', 2),
+            'max_size': env_int(environ, 'DB_POOL_MAX_SIZE', 10),
+            'timeout': env_int(environ, 'DB_POOL_TIMEOUT', 10),
+        }
+        # The pool keeps connections open itself; Django refuses both at once
+        default['CONN_MAX_AGE'] = 0
+
+    databases = {'default': default}
+    if environ.get('DB_REPLICA_HOST'):
+        databases['replica'] = {
+            **default,
+            'OPTIONS': {**default['OPTIONS']},
+            'HOST': environ['DB_REPLICA_HOST'],
+            'PORT': environ.get('DB_REPLICA_PORT', default['PORT']),
+            # Tests see the replica as an alias of 'default'
+            'TEST': {'MIRROR': 'default'},
+        }
+    return databases
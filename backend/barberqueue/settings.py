@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+from .cache_config import cache_settings
+from .db_config import database_settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,6 +32,8 @@ ALLOWED_HOSTS = []
 
 # CORS settings allow all origins
 CORS_ALLOW_ALL_ORIGINS = True
+# Let browser clients read the queue list pagination cursor and catalog ETags
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'ETag']
 
 
 
@@ -53,9 +57,18 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # orjson-backed, same output as rest_framework.renderers.JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 MIDDLEWARE = [
+    # First, so its wall time covers the rest of the middleware too
+    'api.middleware.RequestStatsMiddleware',
+    # Picks the read database before any view touches the ORM
+    'api.db_router.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -66,6 +79,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Share of /api/ requests measured by RequestStatsMiddleware (0.0 - 1.0)
+REQUEST_STATS_SAMPLE_RATE = 0.1
+
 ROOT_URLCONF = 'barberqueue.urls'
 
 TEMPLATES = [
@@ -90,16 +106,43 @@ WSGI_APPLICATION = 'barberqueue.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'barberqueue_db',
-        'USER': 'postgres',
-        'PASSWORD': '00oo00oo',
-        'HOST': 'localhost',
-        'PORT': '5432',
-    }
-}
+# Connection parameters, persistent connections and pooling come from DB_*
+# environment variables; see barberqueue/db_config.py for the full list
+DATABASES = database_settings()
+
+# The read-only polling endpoints (queue list and position, slots,
+# appointments by date) read from READ_REPLICA_ALIAS when DATABASES has an
+# entry for it, e.g. a streaming replica of 'default' set with DB_REPLICA_HOST
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+READ_REPLICA_ALIAS = 'replica'
+# Seconds a client keeps reading from 'default' after it writes, so it sees
+# its own changes while the replica catches up. Pins live in this cache, which
+# must be shared between workers.
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_CACHE_ALIAS = 'default'
+
+# The cache server comes from CACHE_URL (a local Redis by default); see
+# barberqueue/cache_config.py. It holds the barber and service catalogs, the
+# available slots and the working calendar versions (CATALOG_CACHE_ALIAS), so
+# it must be shared between workers; the api.E001 check reports one that isn't.
+CACHES = cache_settings()
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = 60 * 60
+# Seconds a barber-day's free slots stay cached (in CATALOG_CACHE_ALIAS);
+# appointment writes move them to a new version right away
+SLOT_CACHE_TIMEOUT = 60 * 60
+
+# Serve the read-heavy endpoints (queue position and list, slots, catalogs)
+# with async views. Turn on when deployed with barberqueue.asgi.
+ASYNC_READ_VIEWS = False
+
+# Completed and canceled appointments and queue entries older than this many
+# days are moved to the archive by `manage.py archive_records`
+ARCHIVE_AFTER_DAYS = 180
+
+# Pub/sub backend for the queue events stream. Use 'api.events.RedisBroker'
+# (with QUEUE_EVENTS_REDIS_URL) when running more than one ASGI worker.
+QUEUE_EVENTS_BACKEND = 'api.events.InMemoryBroker'
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=60),
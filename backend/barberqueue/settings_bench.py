@@ -0,0 +1,36 @@
+"""
+Settings for running the benchmark harness and the tests against a local
+SQLite database:
+
+    python manage.py migrate --settings=barberqueue.settings_bench
+    python manage.py benchmark_api --settings=barberqueue.settings_bench
+    python manage.py test api --settings=barberqueue.settings_bench
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['localhost']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'bench.sqlite3',
+        'OPTIONS': {
+            # Serialize writers up front so concurrent bookings don't fail mid-transaction
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 30,
+        },
+        # A file rather than memory, so the concurrency tests' threads share it
+        'TEST': {'NAME': BASE_DIR / 'test_bench.sqlite3'},
+    }
+}
+
+# One process, so a per-process cache is enough
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+SILENCED_SYSTEM_CHECKS = ['api.E001', 'api.E002']
@@ -0,0 +1,20 @@
+"""
+Settings for testing read-replica routing locally, with two SQLite databases
+standing in for the primary and its replica (nothing is replicated between
+them, which makes every read's source visible):
+
+    python manage.py test api --settings=barberqueue.settings_replica
+"""
+
+from .settings_bench import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'primary.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+    },
+}